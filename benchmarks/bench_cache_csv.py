@@ -0,0 +1,34 @@
+"""Carga de CSV: texto (frío) vs. caché Feather mapeada (tibio), completa y de dos columnas.
+
+Uso:
+    python benchmarks/bench_cache_csv.py [archivo.csv ...]
+"""
+
+import glob, os, sys, tempfile, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from modelo import cache_csv
+from modelo.lector_csv import cargar_csv, leer_columnas
+
+
+def segundos(funcion) -> float:
+    t0 = time.perf_counter()
+    funcion()
+    return time.perf_counter() - t0
+
+
+if __name__ == "__main__":
+    if not cache_csv.disponible():
+        sys.exit("pyarrow no está instalado: la caché columnar está desactivada.")
+    rutas = sys.argv[1:] or sorted(glob.glob(os.path.join(os.path.dirname(__file__), "..",
+                                                          "datos", "*.csv")))
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_csv.DIR_CACHE = tmp          # no toca la caché real
+        print(f"{'archivo':45s} {'frío':>8s} {'tibio':>8s} {'2 col.':>8s}")
+        for ruta in rutas:
+            x, y = leer_columnas(ruta)[-2:]
+            frio = segundos(lambda: cargar_csv(ruta))            # parsea y guarda en caché
+            tibio = segundos(lambda: cargar_csv(ruta))
+            dos = segundos(lambda: cargar_csv(ruta, columnas=[x, y]))
+            print(f"{os.path.basename(ruta)[:45]:45s} {frio * 1000:7.1f}ms {tibio * 1000:7.1f}ms "
+                  f"{dos * 1000:7.1f}ms")
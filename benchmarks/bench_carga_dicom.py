@@ -0,0 +1,79 @@
+"""Compara la carga DICOM anterior (doble lectura, serial) con modelo.cargador_dicom.
+
+Uso:
+    python benchmarks/bench_carga_dicom.py [carpeta_dicom] [repeticiones]
+"""
+
+import os, sys, time
+
+import numpy as np
+import pydicom
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from modelo import cache_volumenes
+from modelo.cargador_dicom import archivos_dicom, cargar_volumen
+
+
+def carga_original(carpeta: str) -> np.ndarray:
+    """Copia del cargador que tenía vista_dicom3d antes de compartir el módulo."""
+    paths = archivos_dicom(carpeta)
+    slices = [
+        pydicom.dcmread(p) for p in paths
+        if (_ := pydicom.dcmread(p)) and
+           (hasattr(_, "ImagePositionPatient") or hasattr(_, "InstanceNumber"))
+    ]
+    try:
+        slices.sort(key=lambda s: float(s.ImagePositionPatient[2]))
+    except AttributeError:
+        slices.sort(key=lambda s: int(s.InstanceNumber))
+    vol = np.stack([s.pixel_array for s in slices]).astype(np.float32)
+    vol = (vol - vol.min()) / (np.ptp(vol) + 1e-5) * 255
+    return vol.astype(np.uint8)
+
+
+def tiempo_primer_corte(carpeta: str) -> float:
+    """Segundos desde que empieza la carga hasta que el primer corte está disponible."""
+    t0 = time.perf_counter()
+    marcas = []
+    cargar_volumen(carpeta, usar_cache=False, progreso=lambda i, corte, hechos, total:
+                   marcas.append(time.perf_counter() - t0) if hechos == 1 else None)
+    return marcas[0]
+
+
+def sin_cache(carpeta: str) -> np.ndarray:
+    return cargar_volumen(carpeta, usar_cache=False)
+
+
+def con_cache(carpeta: str) -> np.ndarray:
+    return cargar_volumen(carpeta, usar_cache=True)
+
+
+def medir(funcion, carpeta: str, repeticiones: int):
+    tiempos = []
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        vol = funcion(carpeta)
+        tiempos.append(time.perf_counter() - t0)
+    return min(tiempos), vol
+
+
+if __name__ == "__main__":
+    carpeta = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(__file__), "..", "DICOM")
+    repeticiones = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    t_orig, vol_orig = medir(carga_original, carpeta, repeticiones)
+    t_nuevo, vol_nuevo = medir(sin_cache, carpeta, repeticiones)
+
+    # Caché en disco: primera carga (escribe la entrada) vs. reapertura memmap
+    t_cache_fria, _ = medir(con_cache, carpeta, 1)
+    t_cache_caliente, vol_cache = medir(con_cache, carpeta, repeticiones)
+
+    print(f"Volumen: {vol_nuevo.shape} {vol_nuevo.dtype}")
+    print(f"Original : {t_orig * 1000:8.1f} ms")
+    print(f"Nuevo    : {t_nuevo * 1000:8.1f} ms")
+    print(f"Speedup  : {t_orig / t_nuevo:8.2f}x")
+    print(f"Caché fría   : {t_cache_fria * 1000:8.1f} ms")
+    print(f"Caché memmap : {t_cache_caliente * 1000:8.1f} ms  (dir: {os.path.abspath(cache_volumenes.DIR_CACHE)})")
+    print(f"Primer corte (nuevo): {tiempo_primer_corte(carpeta) * 1000:8.1f} ms")
+    print("Diferencia máxima:", int(np.abs(vol_orig.astype(np.int16) - vol_nuevo).max()),
+          "| caché:", int(np.abs(vol_cache.astype(np.int16) - vol_nuevo).max()))
@@ -0,0 +1,35 @@
+"""Costo de extraer (y dejar contiguo) un corte por plano: con salto vs. VolumenOrtogonal.
+
+Uso:
+    python benchmarks/bench_cortes_ortogonales.py [z y x]
+"""
+
+import os, sys, time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from modelo.volumen_ortogonal import VolumenOrtogonal
+
+
+def medir(extraer, n: int) -> float:
+    t0 = time.perf_counter()
+    for i in range(n):
+        np.ascontiguousarray(extraer(i % n))
+    return (time.perf_counter() - t0) / n * 1000
+
+
+if __name__ == "__main__":
+    forma = tuple(int(v) for v in sys.argv[1:4]) if len(sys.argv) >= 4 else (500, 512, 512)
+    vol = np.random.default_rng(0).integers(0, 256, size=forma, dtype=np.uint8)
+
+    orto = VolumenOrtogonal(vol)
+    t0 = time.perf_counter()
+    orto.preparar()
+    print(f"Volumen {vol.shape}: copias {orto.ejes_copia} en {time.perf_counter() - t0:.2f} s")
+
+    for eje, nombre in enumerate(("axial", "coronal", "sagital")):
+        n = vol.shape[eje]
+        con_salto = medir(lambda i: vol[(slice(None),) * eje + (i,)], n)
+        contiguo = medir(lambda i: orto.corte(eje, i), n)
+        print(f"{nombre:8s}: con salto {con_salto:6.3f} ms | ortogonal {contiguo:6.3f} ms")
@@ -0,0 +1,56 @@
+"""Estadísticos por canal y época: bucle por época vs. pasada vectorizada por bloques.
+
+Genera un .mat v7.3 (HDF5) sintético de canales × muestras × épocas y mide
+analizar_epocas leyendo del disco por bloques, frente a un bucle de Python
+que recorre época por época y canal por canal con la señal ya en memoria.
+
+Uso:
+    python benchmarks/bench_epocas.py [canales] [muestras] [epocas]
+"""
+
+import os, sys, tempfile, time
+
+import numpy as np
+import h5py
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from modelo.analisis_epocas import analizar_epocas
+from modelo.lector_mat import VariablesMAT
+
+
+def medir(nombre: str, funcion):
+    t0 = time.perf_counter()
+    resultado = funcion()
+    print(f"{nombre:42s} {(time.perf_counter() - t0) * 1000:9.1f} ms")
+    return resultado
+
+
+def bucle(senal: np.ndarray):
+    canales, _, epocas = senal.shape
+    salida = np.empty((4, canales, epocas))
+    for e in range(epocas):
+        for c in range(canales):
+            x = senal[c, :, e]
+            salida[:, c, e] = (x.mean(), x.var(), np.sqrt(np.mean(x * x)), x.max() - x.min())
+    return salida, senal.mean(axis=2)
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:4]]
+    canales, muestras, epocas = args + [64, 1000, 500][len(args):]
+    senal = np.random.default_rng(0).standard_normal((canales, muestras, epocas))
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta = os.path.join(tmp, "epocas.mat")
+        with h5py.File(ruta, "w", userblock_size=512) as f:
+            f.create_dataset("data", data=senal.T)
+        with open(ruta, "r+b") as f:
+            f.write(b"MATLAB 7.3 MAT-file")
+        print(f"{canales} canales × {muestras} muestras × {epocas} épocas "
+              f"({senal.nbytes / 1024 ** 2:.0f} MiB)")
+        variables = VariablesMAT(ruta)
+        medir("bucle por época y canal (en memoria)", lambda: bucle(senal))
+        medir("vectorizado (en memoria)", lambda: analizar_epocas(senal))
+        medir("vectorizado desde v7.3, bloques de 256 MiB", lambda: analizar_epocas(variables["data"]))
+        medir("vectorizado desde v7.3, bloques de 16 MiB",
+              lambda: analizar_epocas(variables["data"], max_bytes=16 * 1024 ** 2))
+        variables.cerrar()
@@ -0,0 +1,42 @@
+"""PSD de Welch y espectrograma: un canal por llamada vs. todos los canales juntos, y acierto de caché.
+
+Uso:
+    python benchmarks/bench_espectral.py [canales] [segundos] [fs]
+"""
+
+import os, sys, tempfile, time
+
+import numpy as np
+from scipy import signal
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from modelo.espectral import analizar_espectro, espectrograma, psd_welch
+
+
+def medir(nombre: str, funcion):
+    t0 = time.perf_counter()
+    resultado = funcion()
+    print(f"{nombre:42s} {(time.perf_counter() - t0) * 1000:9.1f} ms")
+    return resultado
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:4]]
+    canales, segundos, fs = args + [64, 600, 250][len(args):]
+    senal = np.random.default_rng(0).standard_normal((canales, segundos * fs))
+    print(f"{canales} canales × {segundos} s a {fs} Hz")
+    medir("Welch, un canal por llamada",
+          lambda: [signal.welch(senal[c], fs=fs, nperseg=256) for c in range(canales)])
+    medir("Welch, todos los canales (psd_welch)", lambda: psd_welch(senal, fs))
+    medir("espectrograma, un canal por llamada",
+          lambda: [signal.spectrogram(senal[c], fs=fs, nperseg=256) for c in range(canales)])
+    medir("espectrograma, todos los canales", lambda: espectrograma(senal, fs))
+    with tempfile.NamedTemporaryFile(suffix=".mat") as tmp:
+        medir("analizar_espectro (frío)", lambda: analizar_espectro(senal, fs, 0, canales - 1, ruta=tmp.name))
+        medir("analizar_espectro (caché)", lambda: analizar_espectro(senal, fs, 0, canales - 1, ruta=tmp.name))
+    epocas = np.stack([senal, senal], axis=2)
+    with tempfile.NamedTemporaryFile(suffix=".mat") as tmp:
+        medir("2 épocas: época 0 (Welch de todas + espectrograma)",
+              lambda: analizar_espectro(epocas, fs, 0, canales - 1, 0, ruta=tmp.name))
+        medir("2 épocas: época 1 (sólo espectrograma)",
+              lambda: analizar_espectro(epocas, fs, 0, canales - 1, 1, ruta=tmp.name))
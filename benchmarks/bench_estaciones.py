@@ -0,0 +1,52 @@
+"""Motor de estaciones sobre todos los CSV de datos/: carga, filtro de calidad y agregados.
+
+Con ``copias`` > 1 se replican las estaciones (con códigos nuevos) para ver
+cómo escala. Como referencia se mide también el promedio diario con un bucle
+de Python por estación y día.
+
+Uso:
+    python benchmarks/bench_estaciones.py [copias]
+"""
+
+import os, sys, time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from modelo.estaciones import AlmacenEstaciones
+
+DATOS = os.path.join(os.path.dirname(__file__), "..", "datos")
+
+
+def medir(nombre: str, funcion):
+    t0 = time.perf_counter()
+    resultado = funcion()
+    print(f"{nombre:38s} {(time.perf_counter() - t0) * 1000:9.1f} ms")
+    return resultado
+
+
+def promedio_diario_bucle(df: pd.DataFrame) -> dict:
+    salida = {}
+    for (codigo, fecha), t in zip(df.index, df["t"].to_numpy()):
+        if t == t:
+            suma, n = salida.get((codigo, fecha.date()), (0.0, 0))
+            salida[(codigo, fecha.date())] = (suma + t, n + 1)
+    return {k: s / n for k, (s, n) in salida.items()}
+
+
+if __name__ == "__main__":
+    copias = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    almacen = medir("carga de la carpeta (frío o caché)", lambda: AlmacenEstaciones.desde_carpeta(DATOS))
+    if copias > 1:
+        base = almacen.df.reset_index()
+        partes = [base.assign(codigo=base["codigo"] + 1000 * i) for i in range(copias)]
+        almacen = AlmacenEstaciones(pd.concat(partes).set_index(["codigo", "fecha_hora"]).sort_index())
+    print(f"{len(almacen.codigos)} estaciones, {len(almacen)} registros horarios")
+
+    filtrado = medir("filtro de calidad", almacen.filtrar_calidad)
+    medir("diario (media + suma de p)", lambda: filtrado.remuestrear("D"))
+    medir("mensual (media + suma de p)", lambda: filtrado.remuestrear("MS"))
+    medir("máximo diario de vv_max", lambda: filtrado.remuestrear("D", {"vv_max": "max"}))
+    medir("ventana móvil 24 h de t", lambda: filtrado.movil("t", "24h"))
+    medir("comparación diaria de t (7 días)", lambda: filtrado.comparar("t", "D", ventana=7))
+    medir("promedio diario de t, bucle Python", lambda: promedio_diario_bucle(filtrado.df))
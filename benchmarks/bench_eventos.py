@@ -0,0 +1,67 @@
+"""Detección de eventos: find_peaks canal por canal vs. detector vectorizado, y navegación.
+
+Genera una señal sintética canales × muestras × épocas con espigas y
+artefactos inyectados y mide scipy.signal.find_peaks en un bucle por época y
+canal frente a detectar_eventos (todos los detectores sobre bloques de
+épocas). Después compara buscar el siguiente evento recorriendo la lista con
+la búsqueda binaria del índice ordenado.
+
+Uso:
+    python benchmarks/bench_eventos.py [canales] [muestras] [epocas]
+"""
+
+import os, sys, time
+
+import numpy as np
+from scipy.signal import find_peaks
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from modelo.eventos import ParametrosDeteccion, detectar_eventos
+
+FS = 1000.0
+
+
+def medir(nombre: str, funcion, repeticiones: int = 1):
+    t0 = time.perf_counter()
+    for _ in range(repeticiones):
+        resultado = funcion()
+    print(f"{nombre:46s} {(time.perf_counter() - t0) / repeticiones * 1000:10.3f} ms")
+    return resultado
+
+
+def bucle_find_peaks(senal: np.ndarray, params: ParametrosDeteccion):
+    canales, _, epocas = senal.shape
+    d, w = int(params.distancia * FS), int(params.ventana_pico * FS)
+    eventos = []
+    for e in range(epocas):
+        for c in range(canales):
+            x = senal[c, :, e]
+            sigma = np.median(np.abs(x - np.median(x))) / 0.6745
+            picos, _ = find_peaks(x, distance=d, prominence=params.prominencia_desvios * sigma, wlen=2 * w + 1)
+            eventos.extend((e, c, int(i)) for i in picos)
+    return eventos
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:4]]
+    canales, muestras, epocas = args + [64, 1000, 200][len(args):]
+    rng = np.random.default_rng(0)
+    senal = rng.standard_normal((canales, muestras, epocas))
+    n_espigas = canales * epocas // 4
+    senal[rng.integers(canales, size=n_espigas), rng.integers(muestras, size=n_espigas),
+          rng.integers(epocas, size=n_espigas)] += 20
+    print(f"{canales} canales × {muestras} muestras × {epocas} épocas "
+          f"({senal.nbytes / 1024 ** 2:.0f} MiB)")
+
+    params = ParametrosDeteccion()
+    picos = medir("find_peaks por época y canal (sólo picos)", lambda: bucle_find_peaks(senal, params))
+    medir("vectorizado, sólo picos", lambda: detectar_eventos(senal, FS, ParametrosDeteccion(tipos=("pico",))))
+    indice = medir("vectorizado, los cuatro detectores", lambda: detectar_eventos(senal, FS, params))
+    print(f"eventos: find_peaks {len(picos)} picos · índice {indice.conteo()}")
+
+    consultas = rng.integers(0, epocas * muestras, size=200)
+    lista = indice.eventos["posicion"].tolist()
+    medir("siguiente evento, recorrido lineal (por consulta)",
+          lambda: next((p for p in lista if p > consultas[0]), None), len(consultas))
+    medir("siguiente evento, búsqueda binaria (por consulta)",
+          lambda: indice.siguiente(consultas[0]), len(consultas))
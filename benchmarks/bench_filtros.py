@@ -0,0 +1,49 @@
+"""Cadena de filtros: canal por canal vs. todos los canales en una llamada, y por bloques.
+
+Uso:
+    python benchmarks/bench_filtros.py [canales] [segundos] [fs]
+"""
+
+import os, sys, time, tracemalloc
+
+import numpy as np
+from scipy import signal
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from modelo.filtros import ConfigFiltro, filtrar, filtrar_por_bloques
+
+
+def medir(nombre: str, funcion):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    resultado = funcion()
+    dt = time.perf_counter() - t0
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{nombre:44s} {dt * 1000:9.1f} ms  pico {pico / 1024 ** 2:8.1f} MiB")
+    return resultado
+
+
+def por_canal(senal, fs, config):
+    b, a = signal.butter(config.orden, [config.f_baja, config.f_alta], btype="bandpass", fs=fs)
+    bn, an = signal.iirnotch(config.notch, 30.0, fs=fs)
+    return np.array([signal.filtfilt(bn, an, signal.filtfilt(b, a, x)) for x in senal])
+
+
+def consumir(bloques):
+    for _ in bloques:
+        pass
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:4]]
+    canales, segundos, fs = args + [64, 300, 250][len(args):]
+    senal = np.random.default_rng(0).standard_normal((canales, segundos * fs))
+    config = ConfigFiltro(f_baja=1, f_alta=40, notch=50)
+    print(f"{canales} canales × {segundos} s a {fs} Hz ({senal.nbytes / 1024 ** 2:.0f} MiB)")
+    medir("filtfilt canal por canal (ba)", lambda: por_canal(senal, fs, config))
+    medir("sosfiltfilt, todos los canales", lambda: filtrar(senal, fs, config))
+    medir("causal por bloques de 8 MiB (estado zi)",
+          lambda: consumir(filtrar_por_bloques(senal, fs, config, max_bytes=8 * 1024 ** 2)))
+    ventana = senal[:, 10 * fs:20 * fs]
+    medir("ventana de 10 s, todos los canales", lambda: filtrar(ventana, fs, config))
@@ -0,0 +1,60 @@
+"""Tiempo de dibujo de líneas y dispersión: todos los puntos vs. nivel de detalle.
+
+Uso:
+    python benchmarks/bench_graficos_lod.py [max_muestras]
+"""
+
+import os, sys, time
+
+import numpy as np
+import matplotlib
+matplotlib.use("Agg")
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from vista.graficos_lod import DispersionLOD, LineasLOD
+
+
+def ejes():
+    fig = Figure(figsize=(8, 5))
+    FigureCanvasAgg(fig)
+    return fig, fig.add_subplot(111)
+
+
+def dibujo(fig, ax, lim=None) -> float:
+    t0 = time.perf_counter()
+    if lim:
+        ax.set_xlim(*lim)
+    fig.canvas.draw()
+    return (time.perf_counter() - t0) * 1000
+
+
+if __name__ == "__main__":
+    maximo = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    rng = np.random.default_rng(0)
+    n = 100_000
+    print(f"{'muestras':>10s} | {'línea todo':>10s} {'línea LOD':>10s} {'zoom LOD':>9s} | "
+          f"{'scatter todo':>12s} {'scatter LOD':>11s}")
+    while n <= maximo:
+        y = rng.standard_normal((4, n)).cumsum(axis=1)
+        t = np.arange(n) / 100.0
+        fig, ax = ejes()
+        for c in y:
+            ax.plot(t, c)
+        linea_todo = dibujo(fig, ax)
+        fig, ax = ejes()
+        lod = LineasLOD(ax, t, y)
+        linea_lod = dibujo(fig, ax)
+        zoom = dibujo(fig, ax, (t[n // 3], t[n // 2]))
+
+        x = rng.standard_normal(n)
+        fig, ax = ejes()
+        ax.scatter(x, x + y[0] / n, s=6)
+        sc_todo = dibujo(fig, ax)
+        fig, ax = ejes()
+        disp = DispersionLOD(ax, x, x + y[0] / n)
+        sc_lod = dibujo(fig, ax)
+        print(f"{n:10d} | {linea_todo:8.0f}ms {linea_lod:8.0f}ms {zoom:7.0f}ms | "
+              f"{sc_todo:10.0f}ms {sc_lod:9.0f}ms")
+        n *= 10
@@ -0,0 +1,54 @@
+"""Latencia de login: consulta en texto plano vs. scrypt (frío y con caché en memoria).
+
+También mide el hash con otros factores de trabajo para elegir SCRYPT_N.
+
+Uso:
+    python benchmarks/bench_login.py [repeticiones]
+"""
+
+import os, sys, tempfile, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from modelo import autenticacion
+from modelo.base_datos import get_conn
+from modelo.modelo_usuarios import ModeloUsuarios
+
+
+def ms(funcion, n: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(n):
+        funcion()
+    return (time.perf_counter() - t0) / n * 1000
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = get_conn(os.path.join(tmp, "login.db"))
+        conn.execute("INSERT INTO usuarios (username, password, rol) VALUES ('plano', 'clave', 'imagen')")
+        conn.commit()
+        modelo = ModeloUsuarios(conn)
+        modelo.insertar_usuario("ana", "clave", "imagen")
+
+        antiguo = ms(lambda: conn.execute(
+            "SELECT username, rol FROM usuarios WHERE username=? AND password=?",
+            ("plano", "clave")).fetchone(), n)
+        t0 = time.perf_counter()
+        modelo.verificar_usuario("plano", "clave")        # migra la fila a scrypt
+        migracion = (time.perf_counter() - t0) * 1000
+
+        def frio():
+            modelo.cache.olvidar("ana")
+            modelo.verificar_usuario("ana", "clave")
+
+        print(f"SCRYPT_N = {autenticacion.SCRYPT_N}, {n} repeticiones")
+        print(f"consulta texto plano (antes) : {antiguo:8.3f} ms")
+        print(f"primer login + migración     : {migracion:8.3f} ms")
+        print(f"login scrypt (sin caché)     : {ms(frio, n):8.3f} ms")
+        print(f"login con caché en memoria   : {ms(lambda: modelo.verificar_usuario('ana', 'clave'), n):8.3f} ms")
+        print(f"usuario inexistente          : {ms(lambda: modelo.verificar_usuario('nadie', 'x'), n):8.3f} ms")
+
+    print("Hash por factor de trabajo:")
+    for exp in (13, 14, 15, 16):
+        t = ms(lambda: autenticacion.hash_contrasena("clave", n=2 ** exp), max(3, n // 4))
+        print(f"  n = 2**{exp}: {t:8.1f} ms")
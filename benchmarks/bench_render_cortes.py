@@ -0,0 +1,74 @@
+"""Mide el tiempo por cuadro al recorrer cortes con VisorCorte vs. matplotlib imshow.
+
+Usa un volumen sintético uint8 de 500x512x512 (o la forma indicada).
+
+Uso:
+    python benchmarks/bench_render_cortes.py [z y x] [cuadros]
+"""
+
+import os, sys, time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+import numpy as np
+from PyQt5.QtWidgets import QApplication
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from vista.visor_corte import VisorCorte
+
+
+def volumen_sintetico(z: int, y: int, x: int) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 256, size=(z, y, x), dtype=np.uint8)
+
+
+def medir_visor(vol: np.ndarray, cuadros: int, app: QApplication) -> dict:
+    visores = {p: VisorCorte() for p in ("axial", "coronal", "sagital")}
+    for v in visores.values():
+        v.resize(512, 512)
+        v.show()
+    cortes = {
+        "axial": lambda i: vol[i % vol.shape[0]],
+        "coronal": lambda i: vol[:, i % vol.shape[1], :],
+        "sagital": lambda i: vol[:, :, i % vol.shape[2]],
+    }
+    resultados = {}
+    for plano, visor in visores.items():
+        tiempos = []
+        for i in range(cuadros):
+            t0 = time.perf_counter()
+            visor.mostrar(cortes[plano](i))
+            visor.viewport().repaint()
+            app.processEvents()
+            tiempos.append(time.perf_counter() - t0)
+        resultados[plano] = np.median(tiempos) * 1000
+    return resultados
+
+
+def medir_matplotlib(vol: np.ndarray, cuadros: int) -> float:
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    fig = Figure(figsize=(4, 4))
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.add_subplot(111)
+    tiempos = []
+    for i in range(cuadros):
+        t0 = time.perf_counter()
+        ax.clear()
+        ax.imshow(vol[i % vol.shape[0]], cmap="gray")
+        ax.axis("off")
+        canvas.draw()
+        tiempos.append(time.perf_counter() - t0)
+    return np.median(tiempos) * 1000
+
+
+if __name__ == "__main__":
+    forma = tuple(int(v) for v in sys.argv[1:4]) if len(sys.argv) >= 4 else (500, 512, 512)
+    cuadros = int(sys.argv[4]) if len(sys.argv) >= 5 else 120
+
+    app = QApplication(sys.argv)
+    vol = volumen_sintetico(*forma)
+    print(f"Volumen sintético {vol.shape} uint8, {cuadros} cuadros por plano")
+    for plano, ms in medir_visor(vol, cuadros, app).items():
+        print(f"VisorCorte {plano:8s}: {ms:7.2f} ms/cuadro ({1000 / ms:6.0f} fps)")
+    ms = medir_matplotlib(vol, min(cuadros, 30))
+    print(f"matplotlib axial    : {ms:7.2f} ms/cuadro ({1000 / ms:6.0f} fps)")
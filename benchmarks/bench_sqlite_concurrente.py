@@ -0,0 +1,72 @@
+"""Escrituras y lecturas concurrentes: conexión por defecto vs. pool WAL de base_datos.
+
+Varios hilos insertan pacientes (un commit por paciente, como al registrar
+desde la GUI) mientras otros leen páginas de la tabla. Cada modo usa una
+base temporal nueva.
+
+Uso:
+    python benchmarks/bench_sqlite_concurrente.py [escritores lectores inserciones_por_hilo]
+"""
+
+import os, sys, tempfile, threading, time
+import sqlite3
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from modelo.base_datos import PoolConexiones, migrar
+from modelo.modelo_pacientes import ModeloPacientes
+
+
+class _ConexionPorDefecto:
+    """Una conexión sqlite3 sin configurar por hilo (lo que había antes del pool)."""
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self._local = threading.local()
+        migrar(self.conexion())
+
+    def conexion(self):
+        if getattr(self._local, "conn", None) is None:
+            self._local.conn = sqlite3.connect(self.ruta, timeout=30)
+        return self._local.conn
+
+
+def correr(fuente, escritores: int, lectores: int, n: int) -> tuple:
+    """Devuelve (inserciones/s, páginas leídas/s)."""
+    listo = threading.Event()
+    paginas = [0] * lectores
+
+    def escribir():
+        conn = fuente.conexion()
+        for i in range(n):
+            conn.execute("INSERT INTO pacientes (patient_id, nombre, sexo, study_date) "
+                         "VALUES (?,?,?,?)", (f"P{i}", f"Paciente {i:06d}", "F", "20240101"))
+            conn.commit()
+
+    def leer(k):
+        modelo = ModeloPacientes(fuente.conexion())
+        while not listo.is_set():
+            modelo.consultar_pagina({"sexo": "F"}, limite=200, orden="nombre")
+            paginas[k] += 1
+
+    hilos_l = [threading.Thread(target=leer, args=(k,)) for k in range(lectores)]
+    hilos_e = [threading.Thread(target=escribir) for _ in range(escritores)]
+    t0 = time.perf_counter()
+    for h in hilos_l + hilos_e:
+        h.start()
+    for h in hilos_e:
+        h.join()
+    dt = time.perf_counter() - t0
+    listo.set()
+    for h in hilos_l:
+        h.join()
+    return escritores * n / dt, sum(paginas) / dt
+
+
+if __name__ == "__main__":
+    escritores, lectores, n = (int(v) for v in sys.argv[1:4]) if len(sys.argv) >= 4 else (4, 4, 500)
+    print(f"{escritores} escritores x {n} inserciones, {lectores} lectores")
+    with tempfile.TemporaryDirectory() as tmp:
+        for nombre, fabrica in (("por defecto", _ConexionPorDefecto), ("pool WAL", PoolConexiones)):
+            fuente = fabrica(os.path.join(tmp, nombre.replace(" ", "_") + ".db"))
+            ins, pag = correr(fuente, escritores, lectores, n)
+            print(f"{nombre:12s}: {ins:8.0f} inserciones/s | {pag:8.0f} páginas/s")
@@ -3,10 +3,10 @@ Incluye función para cargar carpetas DICOM completas y generar el volumen 3D qu
 en el paciente activo.
 """
 
-from modelo.base_datos import get_conn
+from modelo.autenticacion import Sesiones
+from modelo.base_datos import obtener_pool
+from modelo.cargador_dicom import cargar_volumen
 import os
-import numpy as np
-import pydicom
 from PyQt5.QtWidgets import QFileDialog, QMessageBox
 
 # Modelos
@@ -19,6 +19,7 @@ from vista.vista_menu import VistaMenu
 from vista.vista_imagen_simple import VistaImagenSimple
 
 from vista.vista_csv import VistaCSV
+from vista.vista_estaciones import VistaEstaciones
 from vista.vista_mat import VistaMAT
 from vista.vista_tabla_pacientes import VistaTablaPacientes
 from vista.vista_registro import VistaRegistro 
@@ -30,12 +31,15 @@ class ControladorPrincipal:
     """Coordinador maestro del flujo de la aplicación  MVC."""
 
     def __init__(self):
-        # Conexión y modelos
-        self.conn = get_conn()
-        self.modelo_usuarios = ModeloUsuarios(self.conn)
-        self.modelo_pacientes = ModeloPacientes(self.conn)
+        # Pool de conexiones (una por hilo) y modelos; el esquema se migra aquí una vez
+        self.pool = obtener_pool()
+        self.conn = self.pool.conexion()
+        self.modelo_usuarios = ModeloUsuarios(self.pool)
+        self.modelo_pacientes = ModeloPacientes(self.pool)
 
         # Estado
+        self.sesiones = Sesiones()
+        self.sesion = None           # sesión en memoria (token + rol), ver modelo/autenticacion.py
         self.usuario_actual = None
         self.paciente_actual = None  #  atributo para el volumen 
 
@@ -47,14 +51,24 @@ class ControladorPrincipal:
     # AUTENTICACIÓN
     # -------------------------------------------------------------------------
     def login(self, username: str, password: str) -> bool:
+        """Login síncrono (bloquea durante el hash); VistaLogin usa HiloLogin + iniciar_sesion."""
         usuario = self.modelo_usuarios.verificar_usuario(username, password)
         if usuario:
-            self.usuario_actual = usuario
-            self.vista_login.close()
-            self.mostrar_menu_principal(usuario["rol"])
+            self.iniciar_sesion(usuario)
             return True
         return False
 
+    def iniciar_sesion(self, usuario: dict):
+        """Abre la sesión de un usuario ya verificado y muestra el menú."""
+        self.usuario_actual = usuario
+        self.sesion = self.sesiones.abrir(usuario["usuario"], usuario["rol"])
+        self.vista_login.close()
+        self.mostrar_menu_principal(self.sesion.token)
+
+    def rol_sesion(self, token: str):
+        """Rol de la sesión `token` (sin consultar la base), o None si no es válida."""
+        return self.sesiones.rol(token)
+
     def registrar_usuario(self, username: str, password: str, rol: str) -> bool:
         rol = rol.lower()
         if rol == "imagenes":
@@ -70,6 +84,8 @@ class ControladorPrincipal:
         self.vista_registro.show()
 
     def logout(self):
+        self.sesiones.cerrar(self.sesion.token if self.sesion else None)
+        self.sesion = None
         self.usuario_actual = None
         self.paciente_actual = None
         self.vista_menu.close()
@@ -79,8 +95,8 @@ class ControladorPrincipal:
     # -------------------------------------------------------------------------
     # MENÚ PRINCIPAL
     # -------------------------------------------------------------------------
-    def mostrar_menu_principal(self, rol: str):
-        self.vista_menu = VistaMenu(self, rol)
+    def mostrar_menu_principal(self, token: str):
+        self.vista_menu = VistaMenu(self, token)
         self.vista_menu.show()
 
     # -------------------------------------------------------------------------
@@ -108,6 +124,10 @@ class ControladorPrincipal:
         self.vista_mat = VistaMAT(self)
         self.vista_mat.show()
 
+    def mostrar_estaciones(self):
+        self.vista_estaciones = VistaEstaciones(self)
+        self.vista_estaciones.show()
+
     # -------------------------------------------------------------------------
     # PACIENTES
     # -------------------------------------------------------------------------
@@ -120,14 +140,27 @@ class ControladorPrincipal:
 
     def obtener_pacientes(self):
         return self.modelo_pacientes.obtener_todos()
+
+    def consultar_pacientes(self, filtros=None, despues_de=None, limite=None, **orden):
+        """Página de pacientes (ver ModeloPacientes.consultar_pagina)."""
+        if limite is None:
+            return self.modelo_pacientes.consultar_pagina(filtros, despues_de, **orden)
+        return self.modelo_pacientes.consultar_pagina(filtros, despues_de, limite, **orden)
     
 
+    def obtener_paciente(self, id_paciente, filtros=None):
+        return self.modelo_pacientes.obtener_fila(id_paciente, filtros)
+
+    def indice_serie(self, carpeta_dicom):
+        """Orden de cortes y geometría guardados al registrar la carpeta (o None)."""
+        return self.modelo_pacientes.obtener_indice_serie(carpeta_dicom)
+
     def registrar_paciente_dicom(self, carpeta_dicom, ruta_nifti):
-        self.modelo_pacientes.insertar_dicom(carpeta_dicom, ruta_nifti)
+        id_paciente = self.modelo_pacientes.insertar_dicom(carpeta_dicom, ruta_nifti)
         
-        # Mostrar o actualizar la vista
+        # Mostrar o actualizar la vista (sólo se inserta la fila nueva)
         if hasattr(self, "vista_tabla"):
-            self.vista_tabla.actualizar_tabla()
+            self.vista_tabla.agregar_paciente(id_paciente)
             self.vista_tabla.show()
         else:
             self.mostrar_tabla_pacientes()   
@@ -164,22 +197,7 @@ class ControladorPrincipal:
     # construcción del volumen 3D a partir de archivos DICOM
     # ---------------------------------------------------------------------
     def _cargar_volumen_dicom(self, ruta_carpeta):
-        import pydicom
-        import numpy as np
-        import os
-
-        archivos = [f for f in os.listdir(ruta_carpeta) if f.lower().endswith('.dcm')]
-        rutas = [os.path.join(ruta_carpeta, f) for f in archivos]
-
-        slices = []
-        for path in rutas:
-            ds = pydicom.dcmread(path)
-            pixel_array = ds.pixel_array
-            instancia = getattr(ds, 'InstanceNumber', len(slices))
-            slices.append((instancia, pixel_array))
-
-        slices.sort(key=lambda x: x[0])
-
-        volumen = np.stack([s[1] for s in slices], axis=0)
+        volumen = cargar_volumen(ruta_carpeta, normalizar=False,
+                                 indice=self.indice_serie(ruta_carpeta))
         print("Volumen cargado con shape:", volumen.shape)
         return volumen
@@ -0,0 +1,163 @@
+"""Estadísticos por canal y época de señales (canales, muestras, épocas).
+
+Todo se calcula con operaciones vectorizadas sobre bloques de épocas
+completas: cada bloque es un arreglo (canales, muestras, k) que se reduce a
+lo largo de las muestras, y el ERP (promedio de épocas) se acumula sumando
+los bloques. Así una sola pasada da media, varianza, RMS y pico a pico de
+todas las épocas, y la memoria queda acotada por MAX_BYTES_BLOQUE aunque el
+archivo (p. ej. un .mat v7.3 leído con h5py) no quepa en RAM. Una señal 2D
+(un registro continuo, una sola época) se recorre por bloques de muestras
+(``bloques_muestras``, con el solapamiento que pida cada consumidor)
+acumulando sumas, mínimos y máximos.
+"""
+
+from __future__ import annotations
+from typing import Callable, Iterator, Tuple
+
+import numpy as np
+
+from modelo.errores import CargaCancelada
+
+MAX_BYTES_BLOQUE = 256 * 1024 ** 2   # 256 MiB por bloque leído
+
+
+def forma_3d(senal) -> Tuple[int, int, int]:
+    """(canales, muestras, épocas); una señal 2D cuenta como una sola época."""
+    forma = tuple(senal.shape)
+    return forma if len(forma) == 3 else forma + (1,)
+
+
+def epocas_por_bloque(senal, max_bytes: int = MAX_BYTES_BLOQUE) -> int:
+    canales, muestras, epocas = forma_3d(senal)
+    por_epoca = canales * muestras * np.dtype(np.float64).itemsize
+    return int(min(epocas, max(1, max_bytes // max(1, por_epoca))))
+
+
+def bloques_epocas(senal, canales: slice = slice(None), max_bytes: int = MAX_BYTES_BLOQUE
+                   ) -> Iterator[Tuple[int, np.ndarray]]:
+    """Genera (primera época, bloque float64 (canales, muestras, k)) recorriendo todas las épocas.
+
+    Sólo para señales 3D: un registro continuo entero no tiene por qué caber en
+    memoria, así que las señales 2D se recorren con ``bloques_muestras``.
+    """
+    if senal.ndim == 2:
+        raise ValueError("bloques_epocas necesita una señal 3D; usa bloques_muestras")
+    n = forma_3d(senal)[2]
+    paso = epocas_por_bloque(senal, max_bytes)
+    for e0 in range(0, n, paso):
+        yield e0, np.asarray(senal[canales, :, e0:e0 + paso], dtype=np.float64)
+
+
+def bloques_muestras(senal, canales: slice = slice(None), epoca: int = 0,
+                     max_bytes: int = MAX_BYTES_BLOQUE, solape: int = 0, multiplo: int = 1
+                     ) -> Iterator[Tuple[int, np.ndarray]]:
+    """Genera (primera muestra, bloque float64 (canales, k)) recorriendo una época por muestras.
+
+    Con ``solape`` cada bloque repite las últimas ``solape`` muestras del
+    anterior (ventanas o filtros que cruzan el borde), y el avance entre
+    bloques es múltiplo de ``multiplo`` (p. ej. el salto entre segmentos de Welch).
+    """
+    n_ch_total, muestras, _ = forma_3d(senal)
+    n_ch = len(range(*canales.indices(n_ch_total)))
+    largo = max_bytes // (np.dtype(np.float64).itemsize * max(1, n_ch))
+    avance = max(multiplo, (largo - solape) // multiplo * multiplo)
+    largo = avance + solape
+    i0 = 0
+    while i0 < muestras:
+        if senal.ndim == 3:
+            bloque = senal[canales, i0:i0 + largo, epoca]
+        else:
+            bloque = senal[canales, i0:i0 + largo]
+        yield i0, np.asarray(bloque, dtype=np.float64)
+        if i0 + largo >= muestras:
+            break
+        i0 += avance
+
+
+class EstadisticasEpocas:
+    """Resultados por (canal, época) y el ERP (canal, muestra) de una pasada.
+
+    En una señal 2D no hay épocas que promediar y ``erp`` es None.
+    """
+
+    def __init__(self, media, varianza, rms, pico_pico, erp):
+        self.media = media
+        self.varianza = varianza
+        self.rms = rms
+        self.pico_pico = pico_pico
+        self.erp = erp
+
+    @property
+    def n_canales(self) -> int:
+        return self.media.shape[0]
+
+    @property
+    def n_epocas(self) -> int:
+        return self.media.shape[1]
+
+
+def analizar_epocas(senal, canales: slice = slice(None), max_bytes: int = MAX_BYTES_BLOQUE,
+                    progreso: Callable[[int, int], None] | None = None,
+                    cancelar: Callable[[], bool] | None = None) -> EstadisticasEpocas:
+    """Media, varianza, RMS y pico a pico por canal y época, más el ERP, en una pasada.
+
+    ``progreso(hechas, total)`` se llama tras cada bloque (épocas, o muestras
+    si la señal es 2D).
+    """
+    if senal.ndim == 2:
+        return _analizar_continua(senal, canales, max_bytes, progreso, cancelar)
+    n_ch_total, muestras, n_epocas = forma_3d(senal)
+    n_ch = len(range(*canales.indices(n_ch_total)))
+    media = np.empty((n_ch, n_epocas))
+    varianza = np.empty((n_ch, n_epocas))
+    rms = np.empty((n_ch, n_epocas))
+    pico_pico = np.empty((n_ch, n_epocas))
+    suma = np.zeros((n_ch, muestras))
+
+    for e0, bloque in bloques_epocas(senal, canales, max_bytes):
+        if cancelar and cancelar():
+            raise CargaCancelada("Análisis de épocas cancelado por el usuario.")
+        e1 = e0 + bloque.shape[2]
+        m = bloque.mean(axis=1)
+        centrado = bloque - m[:, None, :]
+        v = np.einsum("cme,cme->ce", centrado, centrado) / muestras
+        media[:, e0:e1] = m
+        varianza[:, e0:e1] = v
+        rms[:, e0:e1] = np.sqrt(v + m * m)
+        pico_pico[:, e0:e1] = np.ptp(bloque, axis=1)
+        suma += bloque.sum(axis=2)
+        if progreso:
+            progreso(e1, n_epocas)
+    return EstadisticasEpocas(media, varianza, rms, pico_pico, suma / n_epocas)
+
+
+def _analizar_continua(senal, canales: slice, max_bytes: int,
+                       progreso: Callable[[int, int], None] | None,
+                       cancelar: Callable[[], bool] | None) -> EstadisticasEpocas:
+    """Estadísticos de una señal 2D acumulados por bloques de muestras (una sola época)."""
+    n_ch_total, muestras, _ = forma_3d(senal)
+    n_ch = len(range(*canales.indices(n_ch_total)))
+    referencia = None                   # media del primer bloque: evita restar números enormes
+    suma = np.zeros(n_ch)
+    suma_cuadrados = np.zeros(n_ch)
+    minimo = np.full(n_ch, np.inf)
+    maximo = np.full(n_ch, -np.inf)
+
+    for i0, bloque in bloques_muestras(senal, canales, max_bytes=max_bytes):
+        if cancelar and cancelar():
+            raise CargaCancelada("Análisis de épocas cancelado por el usuario.")
+        if referencia is None:
+            referencia = bloque.mean(axis=1)
+        centrado = bloque - referencia[:, None]
+        suma += centrado.sum(axis=1)
+        suma_cuadrados += np.einsum("cm,cm->c", centrado, centrado)
+        np.minimum(minimo, bloque.min(axis=1), out=minimo)
+        np.maximum(maximo, bloque.max(axis=1), out=maximo)
+        if progreso:
+            progreso(i0 + bloque.shape[1], muestras)
+
+    m_centrada = suma / muestras
+    v = np.maximum(suma_cuadrados / muestras - m_centrada ** 2, 0.0)
+    m = referencia + m_centrada
+    return EstadisticasEpocas(m[:, None], v[:, None], np.sqrt(v + m * m)[:, None],
+                              (maximo - minimo)[:, None], None)
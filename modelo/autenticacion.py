@@ -0,0 +1,118 @@
+"""Hash de contraseñas y sesiones en memoria.
+
+Las contraseñas se guardan como ``scrypt$n$r$p$sal$hash`` (base64). scrypt es
+lento a propósito (~60 ms con los parámetros por defecto), así que la
+verificación se hace fuera del hilo de la GUI y los reingresos de la misma
+ejecución se validan contra una caché en memoria (HMAC con clave aleatoria
+del proceso, nunca la contraseña en claro). Al iniciar sesión se emite un
+token cuyo rol se consulta sin volver a la base.
+"""
+
+from __future__ import annotations
+import base64, hashlib, hmac, secrets, threading, time
+from typing import Dict, Tuple
+
+SCRYPT_N = 2 ** 14     # factor de trabajo; ver benchmarks/bench_login.py
+SCRYPT_R = 8
+SCRYPT_P = 1
+LARGO_SAL = 16
+LARGO_HASH = 32
+PREFIJO = "scrypt$"
+
+
+def _b64(datos: bytes) -> str:
+    return base64.b64encode(datos).decode("ascii")
+
+
+def _scrypt(contrasena: str, sal: bytes, n: int, r: int, p: int) -> bytes:
+    return hashlib.scrypt(contrasena.encode("utf-8"), salt=sal, n=n, r=r, p=p,
+                          dklen=LARGO_HASH, maxmem=256 * n * r + 2 ** 20)
+
+
+def hash_contrasena(contrasena: str, n: int = SCRYPT_N, r: int = SCRYPT_R, p: int = SCRYPT_P) -> str:
+    """Hash con sal aleatoria en el formato que se guarda en la tabla usuarios."""
+    sal = secrets.token_bytes(LARGO_SAL)
+    return f"{PREFIJO}{n}${r}${p}${_b64(sal)}${_b64(_scrypt(contrasena, sal, n, r, p))}"
+
+
+def es_hash(guardado: str) -> bool:
+    return guardado.startswith(PREFIJO)
+
+
+def verificar_contrasena(contrasena: str, guardado: str) -> bool:
+    """Compara en tiempo constante; acepta también filas antiguas en texto plano."""
+    if not es_hash(guardado):
+        return hmac.compare_digest(contrasena.encode("utf-8"), guardado.encode("utf-8"))
+    try:
+        _, n, r, p, sal, esperado = guardado.split("$")
+        calculado = _scrypt(contrasena, base64.b64decode(sal), int(n), int(r), int(p))
+    except (ValueError, TypeError):
+        return False
+    return hmac.compare_digest(calculado, base64.b64decode(esperado))
+
+
+def necesita_rehash(guardado: str) -> bool:
+    """True para texto plano o parámetros distintos a los actuales."""
+    return not guardado.startswith(f"{PREFIJO}{SCRYPT_N}${SCRYPT_R}${SCRYPT_P}$")
+
+
+class CacheCredenciales:
+    """Logins ya verificados en esta ejecución: usuario -> (HMAC de la contraseña, hash guardado).
+
+    La entrada sólo vale mientras el hash guardado en la base sea el mismo.
+    """
+
+    def __init__(self):
+        self._clave = secrets.token_bytes(32)
+        self._entradas: Dict[str, Tuple[bytes, str]] = {}
+        self._candado = threading.Lock()
+
+    def _huella(self, usuario: str, contrasena: str) -> bytes:
+        return hmac.new(self._clave, f"{usuario}\0{contrasena}".encode("utf-8"), "sha256").digest()
+
+    def coincide(self, usuario: str, contrasena: str, guardado: str) -> bool:
+        with self._candado:
+            entrada = self._entradas.get(usuario)
+        return (entrada is not None and entrada[1] == guardado
+                and hmac.compare_digest(entrada[0], self._huella(usuario, contrasena)))
+
+    def recordar(self, usuario: str, contrasena: str, guardado: str):
+        with self._candado:
+            self._entradas[usuario] = (self._huella(usuario, contrasena), guardado)
+
+    def olvidar(self, usuario: str):
+        with self._candado:
+            self._entradas.pop(usuario, None)
+
+
+class Sesion:
+    """Sesión iniciada: token opaco, usuario y rol."""
+
+    def __init__(self, usuario: str, rol: str):
+        self.token = secrets.token_urlsafe(32)
+        self.usuario = usuario
+        self.rol = rol
+        self.inicio = time.time()
+
+
+class Sesiones:
+    """Registro en memoria de las sesiones abiertas."""
+
+    def __init__(self):
+        self._sesiones: Dict[str, Sesion] = {}
+
+    def abrir(self, usuario: str, rol: str) -> Sesion:
+        sesion = Sesion(usuario, rol)
+        self._sesiones[sesion.token] = sesion
+        return sesion
+
+    def obtener(self, token: str | None) -> Sesion | None:
+        return self._sesiones.get(token) if token else None
+
+    def rol(self, token: str | None) -> str | None:
+        sesion = self.obtener(token)
+        return sesion.rol if sesion else None
+
+    def cerrar(self, token: str | None):
+        if token:
+            self._sesiones.pop(token, None)
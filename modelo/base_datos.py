@@ -1,33 +1,179 @@
+"""Conexiones SQLite de la aplicación.
+
+Cada hilo usa su propia conexión (sqlite3 no permite compartirlas entre
+hilos), todas configuradas en modo WAL para que las lecturas de la GUI no
+esperen a las escrituras de los hilos de carga o ingesta. El esquema se
+migra una sola vez por base, al abrir el pool, según ``PRAGMA user_version``.
+"""
+
 import sqlite3
 import os
+import threading
 
 DB_PATH = os.path.join(os.path.dirname(__file__), "..", "app.db")
 
-def get_conn():
-    conn = sqlite3.connect(DB_PATH)
-    crear_tablas(conn)
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",     # seguro con WAL; sólo se pierde la última transacción ante un corte de luz
+    "PRAGMA cache_size=-65536",      # 64 MiB de caché de páginas por conexión
+    "PRAGMA mmap_size=268435456",    # 256 MiB mapeados en memoria
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA busy_timeout=5000",
+)
+
+# ───────────── Esquema ─────────────
+# Cada entrada lleva la base de la versión i a la i+1. No se modifican las ya
+# publicadas: los cambios nuevos se agregan al final.
+MIGRACIONES = (
+    # 1: usuarios, pacientes con índices e índice de series DICOM
+    """
+    CREATE TABLE IF NOT EXISTS usuarios (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT UNIQUE NOT NULL,
+        password TEXT NOT NULL,
+        rol TEXT NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS pacientes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        patient_id TEXT,
+        nombre TEXT,
+        edad TEXT,
+        sexo TEXT,
+        study_date TEXT,
+        diagnostico TEXT,
+        ruta_dicom TEXT,
+        ruta_nifti TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_pacientes_patient_id ON pacientes(patient_id);
+    CREATE INDEX IF NOT EXISTS idx_pacientes_nombre ON pacientes(nombre);
+    CREATE INDEX IF NOT EXISTS idx_pacientes_study_date ON pacientes(study_date);
+    CREATE INDEX IF NOT EXISTS idx_pacientes_sexo ON pacientes(sexo);
+    CREATE TABLE IF NOT EXISTS series (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        paciente_id INTEGER REFERENCES pacientes(id),
+        serie_uid TEXT UNIQUE,
+        estudio_uid TEXT,
+        carpeta TEXT,
+        n_cortes INTEGER,
+        filas INTEGER,
+        columnas INTEGER,
+        metadatos TEXT
+    );
+    CREATE TABLE IF NOT EXISTS series_archivos (
+        serie_id INTEGER REFERENCES series(id),
+        orden INTEGER,
+        ruta TEXT,
+        offset_pixeles INTEGER,
+        PRIMARY KEY (serie_id, orden)
+    );
+    CREATE INDEX IF NOT EXISTS idx_series_carpeta ON series(carpeta);
+    """,
+    # 2: carpetas ya recorridas por la ingesta, aunque no hayan aportado series nuevas
+    """
+    CREATE TABLE IF NOT EXISTS carpetas_indexadas (
+        carpeta TEXT PRIMARY KEY
+    );
+    """,
+    # 3: un índice (columna, id) por cada columna de orden de la paginación por clave
+    """
+    DROP INDEX IF EXISTS idx_pacientes_patient_id;
+    DROP INDEX IF EXISTS idx_pacientes_nombre;
+    DROP INDEX IF EXISTS idx_pacientes_study_date;
+    DROP INDEX IF EXISTS idx_pacientes_sexo;
+    CREATE INDEX IF NOT EXISTS idx_pacientes_patient_id ON pacientes(patient_id, id);
+    CREATE INDEX IF NOT EXISTS idx_pacientes_nombre ON pacientes(nombre, id);
+    CREATE INDEX IF NOT EXISTS idx_pacientes_edad ON pacientes(edad, id);
+    CREATE INDEX IF NOT EXISTS idx_pacientes_sexo ON pacientes(sexo, id);
+    CREATE INDEX IF NOT EXISTS idx_pacientes_study_date ON pacientes(study_date, id);
+    """,
+)
+VERSION_ESQUEMA = len(MIGRACIONES)
+
+
+def configurar(conn: sqlite3.Connection) -> sqlite3.Connection:
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
     return conn
 
-def crear_tablas(conn):
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS usuarios (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT UNIQUE NOT NULL,
-            password TEXT NOT NULL,
-            rol TEXT NOT NULL
-        );
-    """)
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS pacientes (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            patient_id TEXT,
-            nombre TEXT,
-            edad TEXT,
-            sexo TEXT,
-            study_date TEXT,
-            diagnostico TEXT,
-            ruta_dicom TEXT,
-            ruta_nifti TEXT
-        );
-    """)
-    conn.commit()
+
+def migrar(conn: sqlite3.Connection) -> int:
+    """Aplica las migraciones pendientes en una transacción y devuelve la versión final."""
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version >= VERSION_ESQUEMA:
+        return version
+    conn.execute("BEGIN IMMEDIATE")      # otro proceso no puede migrar a la vez
+    try:
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        for script in MIGRACIONES[version:]:
+            for sentencia in script.split(";"):
+                if sentencia.strip():
+                    conn.execute(sentencia)
+        conn.execute(f"PRAGMA user_version = {VERSION_ESQUEMA}")
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return VERSION_ESQUEMA
+
+
+class PoolConexiones:
+    """Una conexión configurada por hilo hacia la misma base."""
+
+    def __init__(self, ruta: str = DB_PATH):
+        self.ruta = ruta
+        self._local = threading.local()
+        self._candado = threading.Lock()
+        self._todas = []
+        migrar(self.conexion())
+
+    def conexion(self) -> sqlite3.Connection:
+        """Conexión del hilo actual (se crea la primera vez)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = configurar(sqlite3.connect(self.ruta))
+            self._local.conn = conn
+            with self._candado:
+                self._todas.append(conn)
+        return conn
+
+    def cerrar_hilo(self):
+        """Cierra la conexión del hilo actual (llamar al terminar un hilo de trabajo)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            self._local.conn = None
+            with self._candado:
+                self._todas.remove(conn)
+            conn.close()
+
+    def cerrar(self):
+        with self._candado:
+            todas, self._todas = self._todas, []
+        for conn in todas:
+            try:
+                conn.close()
+            except sqlite3.ProgrammingError:
+                pass    # creada en otro hilo; se libera cuando ese hilo termina
+        self._local = threading.local()
+
+
+_pools = {}
+_candado_pools = threading.Lock()
+
+
+def obtener_pool(ruta: str = DB_PATH) -> PoolConexiones:
+    """Pool compartido de la base `ruta`; la primera llamada migra el esquema."""
+    clave = os.path.abspath(ruta) if ruta != ":memory:" else ruta
+    with _candado_pools:
+        if clave not in _pools:
+            _pools[clave] = PoolConexiones(ruta)
+        return _pools[clave]
+
+
+def get_conn(ruta: str = DB_PATH):
+    """Conexión propia (no del pool), configurada y con el esquema al día."""
+    conn = configurar(sqlite3.connect(ruta))
+    if ruta == ":memory:":
+        migrar(conn)        # cada conexión en memoria es una base distinta
+    else:
+        obtener_pool(ruta)
+    return conn
@@ -0,0 +1,57 @@
+"""Buffer circular de tamaño fijo para señales multicanal que llegan por bloques.
+
+Cada fila del arreglo (canales, capacidad) es el anillo de un canal. Escribir
+nunca reserva memoria: el bloque se copia a partir de la posición actual y da
+la vuelta al llegar al final, como la pluma de un registrador de papel que
+barre la pantalla y sobrescribe lo más viejo.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+
+class BufferCircular:
+    """Anillos (canales, capacidad) con una posición de escritura común."""
+
+    def __init__(self, n_canales: int, capacidad: int, dtype=np.float64):
+        if capacidad <= 0:
+            raise ValueError("La capacidad debe ser positiva")
+        self.datos = np.full((n_canales, capacidad), np.nan, dtype=dtype)
+        self.posicion = 0          # próxima columna a escribir
+        self.escritas = 0          # total de columnas escritas desde limpiar()
+
+    @property
+    def capacidad(self) -> int:
+        return self.datos.shape[1]
+
+    @property
+    def n_canales(self) -> int:
+        return self.datos.shape[0]
+
+    def limpiar(self):
+        self.datos.fill(np.nan)
+        self.posicion = 0
+        self.escritas = 0
+
+    def escribir(self, bloque: np.ndarray):
+        """Copia bloque (canales, n) a partir de la posición actual, dando la vuelta si hace falta."""
+        n = bloque.shape[1]
+        if n >= self.capacidad:          # sólo importa lo último que cabe
+            bloque = bloque[:, n - self.capacidad:]
+            self.posicion = (self.posicion + n - self.capacidad) % self.capacidad
+            self.escritas += n - self.capacidad
+            n = self.capacidad
+        fin = self.posicion + n
+        if fin <= self.capacidad:
+            self.datos[:, self.posicion:fin] = bloque
+        else:
+            corte = self.capacidad - self.posicion
+            self.datos[:, self.posicion:] = bloque[:, :corte]
+            self.datos[:, :n - corte] = bloque[:, corte:]
+        self.posicion = fin % self.capacidad
+        self.escritas += n
+
+    def ordenado(self) -> np.ndarray:
+        """Copia con la columna más vieja primero (para exportar o analizar, no para dibujar)."""
+        return np.roll(self.datos, -self.posicion, axis=1)
@@ -0,0 +1,103 @@
+"""Caché columnar (Feather/Arrow) de CSV ya leídos.
+
+La primera lectura de un CSV se guarda como ``<clave>.feather`` sin
+compresión; las siguientes lo abren con ``memory_map=True`` y leen sólo las
+columnas pedidas, sin volver a parsear texto. La clave sale de la ruta
+absoluta, el mtime y el tamaño del CSV, así que editarlo invalida la entrada.
+
+Como en cache_volumenes, el tamaño total se limita a LIMITE_BYTES expulsando
+las entradas usadas hace más tiempo (LRU por mtime). Si pyarrow no está
+instalado la caché queda desactivada y todo se lee del CSV.
+"""
+
+from __future__ import annotations
+import hashlib, os
+from typing import List
+
+import pandas as pd
+
+try:
+    import pyarrow.feather as feather
+except ImportError:          # pyarrow es opcional
+    feather = None
+
+DIR_CACHE = os.path.join(os.path.dirname(__file__), "..", "cache", "csv")
+LIMITE_BYTES = 2 * 1024 ** 3  # 2 GB
+EXTENSION = ".feather"
+
+
+def disponible() -> bool:
+    return feather is not None
+
+
+def clave_csv(ruta: str) -> str:
+    """Hash de ruta absoluta + mtime + tamaño del CSV."""
+    st = os.stat(ruta)
+    return hashlib.sha1(f"{os.path.abspath(ruta)}|{st.st_mtime_ns}|{st.st_size}".encode()).hexdigest()
+
+
+def _ruta(clave: str, directorio: str | None) -> str:
+    return os.path.join(directorio or DIR_CACHE, clave + EXTENSION)
+
+
+def obtener(clave: str, columnas: List[str] | None = None,
+            directorio: str | None = None) -> pd.DataFrame | None:
+    """DataFrame (sólo `columnas` si se dan) leído del archivo mapeado, o None si no está."""
+    ruta = _ruta(clave, directorio)
+    if feather is None or not os.path.exists(ruta):
+        return None
+    try:
+        tabla = feather.read_table(ruta, columns=columnas, memory_map=True)
+        df = tabla.to_pandas(split_blocks=True)   # sin consolidar: evita copiar columnas
+    except (OSError, ValueError, KeyError) as e:
+        print(f"[cache_csv] Entrada corrupta o columnas inválidas {clave}: {e}")
+        if not isinstance(e, KeyError):
+            eliminar(clave, directorio)
+        return None
+    os.utime(ruta)  # marca de uso para el LRU
+    return df
+
+
+def guardar(clave: str, df: pd.DataFrame, directorio: str | None = None,
+            limite: int = LIMITE_BYTES):
+    """Escribe la entrada de forma atómica y aplica el límite de tamaño."""
+    if feather is None:
+        return
+    directorio = directorio or DIR_CACHE
+    os.makedirs(directorio, exist_ok=True)
+    ruta = _ruta(clave, directorio)
+    tmp = ruta + ".tmp"
+    try:
+        feather.write_feather(df.reset_index(drop=True), tmp, compression="uncompressed")
+        os.replace(tmp, ruta)
+    except Exception as e:
+        print(f"[cache_csv] No se pudo guardar {clave}: {e}")
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        return
+    recortar(directorio, limite)
+
+
+def eliminar(clave: str, directorio: str | None = None):
+    try:
+        os.remove(_ruta(clave, directorio))
+    except FileNotFoundError:
+        pass
+
+
+def recortar(directorio: str | None = None, limite: int = LIMITE_BYTES):
+    """Expulsa las entradas menos usadas hasta que la caché quepa en `limite` bytes."""
+    directorio = directorio or DIR_CACHE
+    if not os.path.isdir(directorio):
+        return
+    entradas = []
+    for nombre in os.listdir(directorio):
+        if nombre.endswith(EXTENSION):
+            st = os.stat(os.path.join(directorio, nombre))
+            entradas.append((st.st_mtime, st.st_size, nombre[:-len(EXTENSION)]))
+    total = sum(e[1] for e in entradas)
+    for _, tam, clave in sorted(entradas):
+        if total <= limite:
+            break
+        eliminar(clave, directorio)
+        total -= tam
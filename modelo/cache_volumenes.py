@@ -0,0 +1,130 @@
+"""Caché en disco de volúmenes DICOM ya ensamblados.
+
+Cada volumen se guarda como ``<clave>.npy`` junto a ``<clave>.json`` con sus
+metadatos (espaciado, orientación, UID de la serie). La clave se calcula a
+partir de la lista de archivos, sus mtimes/tamaños y el SeriesInstanceUID, de
+modo que cualquier cambio en la carpeta invalida la entrada. En un acierto el
+volumen se reabre con ``np.load(mmap_mode="r")`` y no se copia a memoria.
+En una carga en frío el volumen se ensambla directamente en disco con
+``reservar`` y se publica con ``confirmar``, así ambas cargas ocupan lo mismo.
+
+El tamaño total se limita a LIMITE_BYTES expulsando las entradas usadas hace
+más tiempo (LRU por mtime del .npy, que se actualiza en cada acierto).
+"""
+
+from __future__ import annotations
+import hashlib, json, os
+from typing import List, Tuple
+
+import numpy as np
+
+DIR_CACHE = os.path.join(os.path.dirname(__file__), "..", "cache", "volumenes")
+LIMITE_BYTES = 4 * 1024 ** 3  # 4 GB
+
+
+def clave_serie(rutas: List[str], serie_uid: str, normalizar: bool) -> str:
+    """Hash estable de la serie: rutas + mtime + tamaño + UID + modo de normalización."""
+    h = hashlib.sha1()
+    h.update(f"{serie_uid}|{int(normalizar)}".encode())
+    for ruta in sorted(rutas):
+        st = os.stat(ruta)
+        h.update(f"|{os.path.abspath(ruta)}|{st.st_mtime_ns}|{st.st_size}".encode())
+    return h.hexdigest()
+
+
+def _rutas(clave: str, directorio: str) -> Tuple[str, str]:
+    base = os.path.join(directorio, clave)
+    return base + ".npy", base + ".json"
+
+
+def obtener(clave: str, directorio: str = DIR_CACHE):
+    """Devuelve (volumen memmap de sólo lectura, metadatos) o None si no está en caché."""
+    ruta_npy, ruta_json = _rutas(clave, directorio)
+    if not (os.path.exists(ruta_npy) and os.path.exists(ruta_json)):
+        return None
+    try:
+        vol = np.load(ruta_npy, mmap_mode="r")
+        with open(ruta_json, encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"[cache_volumenes] Entrada corrupta {clave}: {e}")
+        eliminar(clave, directorio)
+        return None
+    os.utime(ruta_npy)  # marca de uso para el LRU
+    return vol, meta
+
+
+def guardar(clave: str, vol: np.ndarray, meta: dict,
+            directorio: str = DIR_CACHE, limite: int = LIMITE_BYTES):
+    """Escribe el volumen y sus metadatos de forma atómica y aplica el límite de tamaño."""
+    if vol.nbytes > limite:
+        return
+    os.makedirs(directorio, exist_ok=True)
+    ruta_npy, ruta_json = _rutas(clave, directorio)
+    tmp_npy, tmp_json = ruta_npy + ".tmp", ruta_json + ".tmp"
+    with open(tmp_npy, "wb") as f:
+        np.save(f, np.ascontiguousarray(vol))
+    with open(tmp_json, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(tmp_json, ruta_json)
+    os.replace(tmp_npy, ruta_npy)
+    recortar(directorio, limite)
+
+
+def reservar(clave: str, forma: Tuple[int, ...], dtype, sufijo: str = ".tmp",
+             directorio: str = DIR_CACHE) -> np.memmap:
+    """Memmap .npy escribible (``<clave>.npy<sufijo>``) donde ensamblar un volumen."""
+    os.makedirs(directorio, exist_ok=True)
+    ruta = _rutas(clave, directorio)[0] + sufijo
+    return np.lib.format.open_memmap(ruta, mode="w+", dtype=dtype, shape=tuple(forma))
+
+
+def descartar(ruta_tmp: str):
+    """Borra un archivo creado con ``reservar`` (carga cancelada o fallida)."""
+    try:
+        os.remove(ruta_tmp)
+    except FileNotFoundError:
+        pass
+
+
+def confirmar(clave: str, ruta_tmp: str, meta: dict,
+              directorio: str = DIR_CACHE, limite: int = LIMITE_BYTES):
+    """Publica el volumen reservado en `ruta_tmp` y lo devuelve como en ``obtener``.
+
+    El memmap escribible debe estar vaciado (``flush``) y liberado antes de
+    llamar: en Windows no se puede renombrar un archivo todavía mapeado.
+    """
+    ruta_npy, ruta_json = _rutas(clave, directorio)
+    tmp_json = ruta_json + ".tmp"
+    with open(tmp_json, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(tmp_json, ruta_json)
+    os.replace(ruta_tmp, ruta_npy)
+    recortar(directorio, limite)
+    vol = np.load(ruta_npy, mmap_mode="r")
+    return vol, meta
+
+
+def eliminar(clave: str, directorio: str = DIR_CACHE):
+    for ruta in _rutas(clave, directorio):
+        try:
+            os.remove(ruta)
+        except FileNotFoundError:
+            pass
+
+
+def recortar(directorio: str = DIR_CACHE, limite: int = LIMITE_BYTES):
+    """Expulsa las entradas menos usadas hasta que la caché quepa en `limite` bytes."""
+    if not os.path.isdir(directorio):
+        return
+    entradas = []
+    for nombre in os.listdir(directorio):
+        if nombre.endswith(".npy"):
+            st = os.stat(os.path.join(directorio, nombre))
+            entradas.append((st.st_mtime, st.st_size, nombre[:-4]))
+    total = sum(e[1] for e in entradas)
+    for _, tam, clave in sorted(entradas):
+        if total <= limite:
+            break
+        eliminar(clave, directorio)
+        total -= tam
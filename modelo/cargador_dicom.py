@@ -0,0 +1,215 @@
+"""Carga de series DICOM compartida por la vista 3D y el controlador.
+
+Cada archivo se abre primero sólo para leer los encabezados que sirven para
+ordenar la serie (``stop_before_pixels``) y después se decodifica una única
+vez, en un pool de hilos, directamente sobre un volumen ya reservado. Con la
+caché activa ese volumen es un memmap en disco: la carga en frío devuelve lo
+mismo que un acierto y la memoria no crece con el número de cortes.
+"""
+
+from __future__ import annotations
+import glob, os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, List, Tuple
+
+import numpy as np
+import pydicom
+
+from modelo import cache_volumenes
+from modelo.errores import CargaCancelada
+
+# Etiquetas que se leen en la primera pasada (sin datos de píxel)
+TAGS_ENCABEZADO = [
+    "SeriesInstanceUID", "InstanceNumber", "ImagePositionPatient",
+    "ImageOrientationPatient", "PixelSpacing", "SliceThickness",
+    "Rows", "Columns",
+]
+
+
+# ───────────────────────────── Helpers ─────────────────────────────────────────
+def archivos_dicom(carpeta: str) -> List[str]:
+    """Lista (recursivamente) los archivos .dcm de la carpeta."""
+    return glob.glob(os.path.join(carpeta, "**", "*.dcm"), recursive=True)
+
+
+def leer_encabezado(ruta: str):
+    """Lee sólo las etiquetas de ordenamiento/geometría, sin tocar los píxeles."""
+    return pydicom.dcmread(ruta, stop_before_pixels=True, specific_tags=TAGS_ENCABEZADO)
+
+
+def ordenar_serie(rutas: List[str], hilos: int | None = None) -> List[Tuple[str, object]]:
+    """Devuelve [(ruta, encabezado)] de los cortes válidos, ordenados en Z.
+
+    Se ordena por ImagePositionPatient[2] cuando todos los cortes lo tienen y
+    por InstanceNumber en caso contrario (mismo criterio que usaba la vista).
+    """
+    with ThreadPoolExecutor(max_workers=hilos) as pool:
+        encabezados = list(pool.map(leer_encabezado, rutas))
+    return ordenar_cortes(list(zip(rutas, encabezados)))
+
+
+def ordenar_cortes(pares: List[Tuple[str, object]]) -> List[Tuple[str, object]]:
+    """Filtra y ordena pares (ruta, encabezado) ya leídos."""
+    cortes = [
+        (ruta, ds) for ruta, ds in pares
+        if hasattr(ds, "ImagePositionPatient") or hasattr(ds, "InstanceNumber")
+    ]
+    try:
+        cortes.sort(key=lambda c: float(c[1].ImagePositionPatient[2]))
+    except AttributeError:
+        cortes.sort(key=lambda c: int(c[1].InstanceNumber))
+    return cortes
+
+
+def _pixeles(ruta: str) -> np.ndarray:
+    return pydicom.dcmread(ruta).pixel_array
+
+
+def normalizar_uint8(vol: np.ndarray, salida: np.ndarray | None = None) -> np.ndarray:
+    """Escala el volumen a [0, 255] corte a corte, sin crear una copia float32 completa.
+
+    ``salida`` (p. ej. un memmap uint8) recibe el resultado en lugar de un arreglo nuevo.
+    """
+    vmin = float(vol.min())
+    escala = 255.0 / (float(vol.max()) - vmin + 1e-5)
+    if salida is None:
+        salida = np.empty(vol.shape, dtype=np.uint8)
+    for i in range(vol.shape[0]):
+        salida[i] = (vol[i].astype(np.float32) - vmin) * escala
+    return salida
+
+
+def metadatos_serie(cortes: List[Tuple[str, object]]) -> dict:
+    """Geometría de la serie ordenada: espaciado (z, y, x), orientación y origen."""
+    primero, ultimo = cortes[0][1], cortes[-1][1]
+    dy, dx = (float(v) for v in getattr(primero, "PixelSpacing", (1.0, 1.0)))
+    try:
+        origen = [float(v) for v in primero.ImagePositionPatient]
+        fin = [float(v) for v in ultimo.ImagePositionPatient]
+        paso_corte = [float(v) for v in np.subtract(fin, origen) / (len(cortes) - 1)]
+        dz = float(np.linalg.norm(paso_corte))
+    except AttributeError:
+        origen = [0.0, 0.0, 0.0]
+        paso_corte = None
+        dz = 0.0
+    if dz == 0.0:
+        dz = float(getattr(primero, "SliceThickness", 1.0) or 1.0)
+        paso_corte = None
+    orientacion = [float(v) for v in getattr(primero, "ImageOrientationPatient",
+                                             (1, 0, 0, 0, 1, 0))]
+    return {
+        "serie_uid": str(getattr(primero, "SeriesInstanceUID", "")),
+        "espaciado": [dz, dy, dx],
+        "orientacion": orientacion,
+        "origen": origen,
+        "paso_corte": paso_corte,   # vector entre cortes consecutivos (mm, LPS)
+    }
+
+
+# ───────────────────────────── Carga ───────────────────────────────────────────
+def cargar_volumen(carpeta: str, normalizar: bool = True, **kwargs) -> np.ndarray:
+    """Atajo de cargar_serie que devuelve sólo el volumen."""
+    return cargar_serie(carpeta, normalizar, **kwargs)[0]
+
+
+def cargar_serie(carpeta: str, normalizar: bool = True,
+                 hilos: int | None = None,
+                 progreso: Callable[[int, np.ndarray, int, int], None] | None = None,
+                 cancelar: Callable[[], bool] | None = None,
+                 usar_cache: bool = True,
+                 indice: Tuple[List[str], dict] | None = None) -> Tuple[np.ndarray, dict]:
+    """Construye el volumen (z, y, x) de la serie DICOM contenida en `carpeta`
+    y devuelve ``(volumen, metadatos)``.
+
+    Con ``normalizar=True`` devuelve uint8 en [0, 255] (lo que usa el visor);
+    con ``normalizar=False`` devuelve los valores crudos del pixel_array.
+
+    ``progreso(indice, corte, hechos, total)`` se llama desde el hilo que
+    invoca la función cada vez que un corte queda decodificado, y
+    ``cancelar()`` se consulta entre cortes; si devuelve True se lanza
+    CargaCancelada.
+
+    Con ``usar_cache=True`` el volumen se decodifica directamente en la
+    caché memory-mapped de cache_volumenes y se devuelve reabierto de sólo
+    lectura, igual que en un acierto (salvo que supere su límite de tamaño).
+
+    ``indice=(rutas_ordenadas, metadatos)`` (p. ej. el guardado por
+    indice_dicom en la base de datos) evita releer los encabezados; sólo se
+    usa si coincide con los archivos presentes en la carpeta.
+    """
+    rutas = sorted(archivos_dicom(carpeta))
+    print("Archivos encontrados:", len(rutas))
+
+    clave = None
+    if usar_cache and rutas:
+        uid = str(getattr(leer_encabezado(rutas[0]), "SeriesInstanceUID", ""))
+        clave = cache_volumenes.clave_serie(rutas, uid, normalizar)
+        en_cache = cache_volumenes.obtener(clave)
+        if en_cache is not None:
+            vol, meta = en_cache
+            if progreso:
+                progreso(0, vol[0], 1, vol.shape[0])
+            return vol, meta
+
+    meta = None
+    presentes = {os.path.abspath(r) for r in rutas} if indice is not None else set()
+    if indice is not None and len(indice[0]) >= 2 and \
+            all(os.path.abspath(r) in presentes for r in indice[0]):
+        cortes = [(ruta, None) for ruta in indice[0]]
+        meta = indice[1]
+    else:
+        cortes = ordenar_serie(rutas, hilos)
+    if len(cortes) < 2:
+        raise ValueError("No se encontraron suficientes imágenes DICOM válidas.")
+    total = len(cortes)
+
+    # El primer corte fija forma y tipo del volumen reservado
+    primero = _pixeles(cortes[0][0])
+    forma = (total,) + primero.shape
+    if clave is not None and total * primero.size * (1 if normalizar else primero.itemsize) \
+            > cache_volumenes.LIMITE_BYTES:
+        clave = None                     # no entraría en la caché: se arma en memoria
+    if clave is None:
+        vol = np.empty(forma, dtype=primero.dtype)
+    else:
+        vol = cache_volumenes.reservar(clave, forma, primero.dtype,
+                                       sufijo=".crudo.tmp" if normalizar else ".tmp")
+    temporales = [] if clave is None else [vol.filename]
+    salida = None
+    try:
+        vol[0] = primero
+        if progreso:
+            # Copias: una vista del memmap mantendría el archivo abierto tras la carga
+            progreso(0, np.array(vol[0]), 1, total)
+
+        def _decodificar(i: int) -> int:
+            vol[i] = _pixeles(cortes[i][0])
+            return i
+
+        with ThreadPoolExecutor(max_workers=hilos) as pool:
+            futuros = [pool.submit(_decodificar, i) for i in range(1, total)]
+            for hechos, futuro in enumerate(as_completed(futuros), start=2):
+                if cancelar and cancelar():
+                    for f in futuros:
+                        f.cancel()
+                    raise CargaCancelada("Carga DICOM cancelada por el usuario.")
+                i = futuro.result()
+                if progreso:
+                    progreso(i, np.array(vol[i]), hechos, total)
+
+        if normalizar:
+            if clave is not None:
+                salida = cache_volumenes.reservar(clave, forma, np.uint8)
+                temporales.append(salida.filename)
+            vol = normalizar_uint8(vol, salida)
+        if meta is None:
+            meta = metadatos_serie(cortes)
+        if clave is None:
+            return vol, meta
+        vol.flush()
+        vol = salida = None              # libera los mapeos antes de renombrar
+        return cache_volumenes.confirmar(clave, temporales[-1], meta)
+    finally:
+        vol = salida = None
+        for ruta in temporales:
+            cache_volumenes.descartar(ruta)  # el crudo siempre; el final sólo si falló
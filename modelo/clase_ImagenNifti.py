@@ -1,30 +1,57 @@
 import os
+from collections import OrderedDict
+
 import nibabel as nib
 import numpy as np
-import dicom2nifti
-import dicom2nifti.convert_dicom
+
+from modelo.cargador_dicom import cargar_serie
+from modelo.exportar_nifti import exportar_nifti
 
 class ImagenNifti:
+    """Imagen NIfTI que lee los cortes bajo demanda desde el proxy de nibabel.
+
+    No se llama a get_fdata(): `datos` es el ArrayProxy (forma y slicing sin
+    cargar el volumen), cada corte se lee en su tipo nativo y los últimos
+    MAX_CORTES_CACHE cortes pedidos se guardan en un LRU.
+    """
+    MAX_CORTES_CACHE = 32
+
     def __init__(self, ruta_archivo):
         self.ruta = ruta_archivo
         self.objeto_nifti = nib.load(ruta_archivo)
-        self.datos = self.objeto_nifti.get_fdata()
+        self.datos = self.objeto_nifti.dataobj
         self.metadatos = self.objeto_nifti.header
+        self._cortes: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+
+    def _corte(self, eje: int, indice: int) -> np.ndarray:
+        clave = (eje, indice)
+        corte = self._cortes.get(clave)
+        if corte is not None:
+            self._cortes.move_to_end(clave)
+            return corte
+        slicer = [slice(None)] * len(self.datos.shape)
+        slicer[eje] = indice
+        corte = np.asarray(self.datos[tuple(slicer)])
+        corte.setflags(write=False)   # compartido por el caché
+        self._cortes[clave] = corte
+        if len(self._cortes) > self.MAX_CORTES_CACHE:
+            self._cortes.popitem(last=False)
+        return corte
 
     def obtener_corte_axial(self, indice=None):
         if indice is None:
             indice = self.datos.shape[2] // 2
-        return self.datos[:, :, indice]
+        return self._corte(2, indice)
 
     def obtener_corte_coronal(self, indice=None):
         if indice is None:
             indice = self.datos.shape[1] // 2
-        return self.datos[:, indice, :]
+        return self._corte(1, indice)
 
     def obtener_corte_sagital(self, indice=None):
         if indice is None:
             indice = self.datos.shape[0] // 2
-        return self.datos[indice, :, :]
+        return self._corte(0, indice)
 
     def obtener_info(self):
         return {
@@ -35,7 +62,8 @@ class ImagenNifti:
 
 def convertir_dicom_a_nifti(carpeta_dicom: str, carpeta_salida: str) -> str:
     """
-    Convierte una carpeta con archivos DICOM a un archivo .nii.gz usando dicom2nifti.
+    Convierte una carpeta con archivos DICOM a un archivo .nii.gz con el mismo
+    pipeline que usa la vista (cargar_serie + exportar_nifti, valores crudos).
     Devuelve la ruta del archivo NIfTI generado.
     """
     if not os.path.isdir(carpeta_dicom):
@@ -48,7 +76,7 @@ def convertir_dicom_a_nifti(carpeta_dicom: str, carpeta_salida: str) -> str:
     ruta_salida = os.path.join(carpeta_salida, f"{nombre}.nii.gz")
 
     try:
-        dicom2nifti.convert_dicom.dicom_series_to_nifti(carpeta_dicom, ruta_salida)
-        return ruta_salida
+        vol, meta = cargar_serie(carpeta_dicom, normalizar=False)
+        return exportar_nifti(vol, ruta_salida, meta)
     except Exception as e:
         raise Exception(f"Error al convertir DICOM a NIfTI: {e}")
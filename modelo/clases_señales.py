@@ -1,10 +1,19 @@
 import os
 import numpy as np
 import pandas as pd
-import scipy.io as sio
 import matplotlib.pyplot as plt
 from matplotlib import gridspec
 
+from modelo.lector_csv import cargar_csv
+from modelo.lector_mat import VariablesMAT
+from modelo.analisis_epocas import analizar_epocas
+from modelo.espectral import analizar_espectro
+from modelo.eventos import detectar_eventos
+from modelo.filtros import filtrar, margen_muestras
+
+FS_POR_DEFECTO = 100   # Hz, si el .mat no trae la frecuencia de muestreo
+LLAVES_FS = ("fs", "Fs", "FS", "srate", "sfreq", "fsample", "frecuencia_muestreo")
+
 # Diccionarios principales
 objetos_csv = {}
 rutas_graficos = {}
@@ -13,9 +22,9 @@ class ArchivoCSV:
     def __init__(self):
         self.df = None
 
-    """Carga el archivo CSV desde la ruta."""
+    """Carga el archivo CSV desde la ruta (por bloques, con tipos explícitos)."""
     def cargar_csv(self, ruta):  
-        self.df = pd.read_csv(ruta)
+        self.df = cargar_csv(ruta)
 
     """Devuelve las columnas si el DataFrame fue cargado."""
     def obtener_columnas(self):
@@ -34,20 +43,52 @@ class ArchivoCSV:
         ax.set_title(f"Scatter: {col_x} vs {col_y}")
 
 class ArchivoMAT:
-    def __init__(self, nombre, ruta):
+    """Señal de un .mat; las variables se leen bajo demanda (ver modelo.lector_mat)."""
+    def __init__(self, nombre, ruta, llave="data"):
         self.nombre = nombre
         self.ruta = ruta
-        self.data = sio.loadmat(ruta)
-        self.senal = self.data['data']  # Asegura que 'data' existe en el .mat
-
-        # Si tiene 3 dimensiones (por ejemplo: canales, muestras, épocas), toma la primera época
-        if self.senal.ndim == 3:
-            self.senal = self.senal[:, :, 0]
-
-        # Frecuencia de muestreo fija 
-        self.fs = 100  # Hz
-
-    def extraer_intervalo(self, ch_ini, ch_fin, t_ini, t_fin):
+        self.data = VariablesMAT(ruta)   # sólo encabezados; cada variable se lee al pedirla
+        self.llave = llave if llave in self.data.info else self._llave_senal()
+        if self.llave is None:
+            raise KeyError(f"El archivo no tiene una matriz de señal ('{llave}')")
+        # (canales, muestras) o (canales, muestras, épocas); en v7.3 no se carga entera
+        self.senal = self.data[self.llave]
+
+        # Frecuencia de muestreo: la del archivo si la trae, si no FS_POR_DEFECTO (editable)
+        fs = self._fs_del_archivo()
+        self.fs_en_archivo = fs is not None
+        self.fs = fs or FS_POR_DEFECTO  # Hz
+
+    def _llave_senal(self):
+        """Variable numérica más grande con al menos 2 dimensiones, si no hay 'data'."""
+        candidatas = [(np.prod(forma), n) for n, (forma, clase) in self.data.info.items()
+                      if len(forma) >= 2 and clase not in ("struct", "cell", "char")]
+        return max(candidatas)[1] if candidatas else None
+
+    def _fs_del_archivo(self):
+        for nombre in LLAVES_FS:
+            if nombre not in self.data.info:
+                continue
+            forma, clase = self.data.info[nombre]
+            if int(np.prod(forma)) == 1 and clase not in ("struct", "cell", "char"):
+                try:
+                    fs = float(np.asarray(self.data[nombre]).ravel()[0])
+                except (TypeError, ValueError):
+                    continue
+                if fs > 0:
+                    return fs
+        return None
+
+    @property
+    def n_epocas(self):
+        return self.senal.shape[2] if self.senal.ndim == 3 else 1
+
+    def extraer_intervalo(self, ch_ini, ch_fin, t_ini, t_fin, epoca=0, filtro=None):
+        """Canales [ch_ini, ch_fin] entre t_ini y t_fin de una época; lee sólo ese bloque.
+
+        Con un ConfigFiltro activo se lee además un margen a cada lado (y todos
+        los canales si se rereferencia al promedio), se filtra y se recorta.
+        """
         if ch_ini > ch_fin or ch_fin >= self.senal.shape[0]:
             raise ValueError("Rango de canales inválido")
 
@@ -55,10 +96,50 @@ class ArchivoMAT:
         idx_fin = int(t_fin * self.fs)
         if idx_ini >= idx_fin or idx_fin > self.senal.shape[1]:
             raise ValueError("Intervalo de tiempo inválido")
+        if not 0 <= epoca < self.n_epocas:
+            raise ValueError("Época inválida")
 
         t = np.arange(idx_ini, idx_fin) / self.fs
-        datos = self.senal[ch_ini:ch_fin + 1, idx_ini:idx_fin]
-        return t, datos
+        if filtro is None or not filtro.activo:
+            return t, self._bloque(slice(ch_ini, ch_fin + 1), idx_ini, idx_fin, epoca)
+
+        margen = margen_muestras(filtro, self.fs)
+        ini, fin = max(0, idx_ini - margen), min(self.senal.shape[1], idx_fin + margen)
+        canales = slice(None) if filtro.referencia == "promedio" else slice(ch_ini, ch_fin + 1)
+        datos = filtrar(self._bloque(canales, ini, fin, epoca), self.fs, filtro)
+        if canales.start is None:
+            datos = datos[ch_ini:ch_fin + 1]
+        return t, datos[:, idx_ini - ini:idx_fin - ini]
+
+    def _bloque(self, canales, idx_ini, idx_fin, epoca):
+        if self.senal.ndim == 3:
+            return np.asarray(self.senal[canales, idx_ini:idx_fin, epoca])
+        return np.asarray(self.senal[canales, idx_ini:idx_fin])
+
+    def analizar_epocas(self, ch_ini=0, ch_fin=None, **kwargs):
+        """Estadísticos de todas las épocas de los canales [ch_ini, ch_fin] (ver analisis_epocas)."""
+        ch_fin = self.senal.shape[0] - 1 if ch_fin is None else ch_fin
+        if ch_ini > ch_fin or ch_fin >= self.senal.shape[0]:
+            raise ValueError("Rango de canales inválido")
+        return analizar_epocas(self.senal, slice(ch_ini, ch_fin + 1), **kwargs)
+
+    def analizar_espectro(self, ch_ini, ch_fin, epoca=0, **kwargs):
+        """PSD, espectrograma y potencia por banda de los canales (ver modelo.espectral)."""
+        if ch_ini > ch_fin or ch_fin >= self.senal.shape[0]:
+            raise ValueError("Rango de canales inválido")
+        if not 0 <= epoca < self.n_epocas:
+            raise ValueError("Época inválida")
+        return analizar_espectro(self.senal, self.fs, ch_ini, ch_fin, epoca, ruta=self.ruta, **kwargs)
+
+    def detectar_eventos(self, ch_ini=0, ch_fin=None, **kwargs):
+        """Índice de eventos de todas las épocas de los canales [ch_ini, ch_fin] (ver modelo.eventos)."""
+        ch_fin = self.senal.shape[0] - 1 if ch_fin is None else ch_fin
+        if ch_ini > ch_fin or ch_fin >= self.senal.shape[0]:
+            raise ValueError("Rango de canales inválido")
+        return detectar_eventos(self.senal, self.fs, canales=slice(ch_ini, ch_fin + 1), **kwargs)
+
+    def cerrar(self):
+        self.data.cerrar()
 
     def graficar(self, xmin, xmax, eje, epoca):
         muestras = self.senal.shape[1]
@@ -96,7 +177,10 @@ class ArchivoMAT:
         ax2.set_ylabel("Valor")
 
         ax3 = fig.add_subplot(gs[1, 1])
-        promedio_epoca = np.mean(senal_epoca, axis=0)
+        erp = self.analizar_epocas(0, senal_epoca.shape[0] - 1).erp
+        if erp is None:                 # señal 2D: una sola época
+            erp = np.asarray(senal_epoca)
+        promedio_epoca = np.mean(erp, axis=0)
         ax3.hist(promedio_epoca, bins=20)
         ax3.set_title("Histograma de época promedio")
         ax3.set_xlabel("Valor")
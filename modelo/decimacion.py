@@ -0,0 +1,116 @@
+"""Decimación de series largas para graficar (nivel de detalle).
+
+Una línea de millones de muestras no se ve mejor que su envolvente min/max
+con una o dos columnas por píxel. PiramideMinMax precalcula mínimos y
+máximos por bloques de FACTOR**k muestras (como una pirámide de mipmaps), de
+modo que la envolvente de cualquier rango visible sale de unos pocos miles
+de valores, sin importar cuántas muestras tenga la señal.
+
+Para dispersión, histograma_visible cuenta los puntos del rango visible en
+una grilla 2D y así el costo de dibujar no depende de la cantidad de puntos.
+"""
+
+from __future__ import annotations
+from typing import List, Tuple
+
+import numpy as np
+
+FACTOR = 8              # muestras por bloque entre un nivel y el siguiente
+MAX_PUNTOS_LINEA = 4_000
+MAX_PUNTOS_SCATTER = 50_000
+
+
+def _agrupar(mins: np.ndarray, maxs: np.ndarray, g: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Min/max de grupos consecutivos de `g` columnas (el último se completa con el borde)."""
+    m = mins.shape[-1]
+    resto = (-m) % g
+    if resto:
+        mins = np.concatenate([mins, np.repeat(mins[..., -1:], resto, axis=-1)], axis=-1)
+        maxs = np.concatenate([maxs, np.repeat(maxs[..., -1:], resto, axis=-1)], axis=-1)
+    forma = mins.shape[:-1] + (-1, g)
+    return mins.reshape(forma).min(axis=-1), maxs.reshape(forma).max(axis=-1)
+
+
+class PiramideMinMax:
+    """Envolventes min/max por niveles de una señal (canales, muestras)."""
+
+    def __init__(self, datos: np.ndarray, factor: int = FACTOR):
+        datos = np.atleast_2d(datos)
+        self.factor = factor
+        self.n = datos.shape[-1]
+        self._niveles: List[Tuple[np.ndarray, np.ndarray]] = [(datos, datos)]
+        mins, maxs = datos, datos
+        while mins.shape[-1] > MAX_PUNTOS_LINEA:
+            mins, maxs = _agrupar(mins, maxs, factor)
+            self._niveles.append((mins, maxs))
+
+    @property
+    def n_canales(self) -> int:
+        return self._niveles[0][0].shape[0]
+
+    @property
+    def n_niveles(self) -> int:
+        return len(self._niveles)
+
+    def envolvente(self, i0: int, i1: int, n_columnas: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Índices de muestra (x) y valores (canales, x) para dibujar [i0, i1) en `n_columnas`.
+
+        Si el rango tiene pocas muestras se devuelven tal cual; si no, cada
+        columna aporta su mínimo y su máximo (dos puntos en la misma x).
+        """
+        i0, i1 = max(0, int(i0)), min(self.n, int(i1))
+        if i1 - i0 <= 2 * n_columnas:
+            datos = self._niveles[0][0]
+            return np.arange(i0, i1), datos[..., i0:i1]
+        k = 0
+        while k + 1 < self.n_niveles and self.factor ** (k + 1) * n_columnas <= i1 - i0:
+            k += 1
+        s = self.factor ** k
+        mins, maxs = self._niveles[k]
+        j0, j1 = i0 // s, -(-i1 // s)
+        g = max(1, -(-(j1 - j0) // n_columnas))
+        mins, maxs = _agrupar(mins[..., j0:j1], maxs[..., j0:j1], g)
+        x = (j0 + np.arange(mins.shape[-1]) * g) * s
+        y = np.empty(mins.shape[:-1] + (2 * mins.shape[-1],), dtype=mins.dtype)
+        y[..., 0::2] = mins
+        y[..., 1::2] = maxs
+        return np.repeat(x, 2), y
+
+
+class DecimadorMinMax:
+    """Reduce un flujo (canales, muestras) a pares min/max cada `paso` muestras.
+
+    Las muestras que no completan un grupo se guardan para el bloque
+    siguiente, así el resultado no depende de cómo llegue partido el flujo.
+    """
+
+    def __init__(self, paso: int):
+        self.paso = max(1, int(paso))
+        self._resto = None
+
+    def reiniciar(self):
+        self._resto = None
+
+    def procesar(self, bloque: np.ndarray) -> np.ndarray:
+        """Columnas (canales, 2 * grupos) con min y max intercalados (o el bloque si paso == 1)."""
+        if self.paso == 1:
+            return bloque
+        if self._resto is not None:
+            bloque = np.concatenate([self._resto, bloque], axis=1)
+        grupos = bloque.shape[1] // self.paso
+        corte = grupos * self.paso
+        self._resto = bloque[:, corte:] if corte < bloque.shape[1] else None
+        if not grupos:
+            return bloque[:, :0]
+        g = bloque[:, :corte].reshape(bloque.shape[0], grupos, self.paso)
+        salida = np.empty((bloque.shape[0], 2 * grupos), dtype=bloque.dtype)
+        salida[:, 0::2] = g.min(axis=2)
+        salida[:, 1::2] = g.max(axis=2)
+        return salida
+
+
+def histograma_visible(x: np.ndarray, y: np.ndarray, limites_x: Tuple[float, float],
+                       limites_y: Tuple[float, float], bins: Tuple[int, int] = (200, 150)):
+    """Cuenta de puntos por celda dentro de los límites visibles (forma bins[1] x bins[0])."""
+    cuentas, _, _ = np.histogram2d(x, y, bins=bins, range=[limites_x, limites_y])
+    return cuentas.T
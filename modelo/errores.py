@@ -0,0 +1,5 @@
+"""Excepciones compartidas por los cargadores y análisis del modelo."""
+
+
+class CargaCancelada(Exception):
+    """Se lanza cuando el usuario cancela una carga o un cálculo en curso."""
@@ -0,0 +1,173 @@
+"""Análisis espectral de señales (canales, muestras[, épocas]).
+
+Todos los canales se procesan en la misma llamada de scipy.signal (eje de
+muestras = 1): la PSD de Welch se promedia sobre todas las épocas leyendo por
+bloques (ver analisis_epocas.bloques_epocas; un registro 2D, por bloques de
+muestras alineados con los segmentos de Welch), el espectrograma se calcula
+para una época y la potencia de cada banda canónica se integra sobre la PSD.
+
+Los resultados quedan en una caché LRU en memoria indexada por archivo
+(ruta, mtime, tamaño), rango de canales y parámetros: la PSD y las bandas
+(que promedian todas las épocas) sin la época y el espectrograma con ella,
+así cambiar de época sólo calcula un espectrograma. Cambiar sólo lo que se
+muestra (canal, frecuencia máxima, tipo de gráfico) no recalcula nada.
+"""
+
+from __future__ import annotations
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Tuple
+
+import numpy as np
+from scipy import signal
+from scipy.integrate import trapezoid
+
+from modelo.analisis_epocas import MAX_BYTES_BLOQUE, bloques_epocas, bloques_muestras, forma_3d
+from modelo.errores import CargaCancelada
+
+BANDAS: Dict[str, Tuple[float, float]] = {
+    "delta": (0.5, 4.0), "theta": (4.0, 8.0), "alfa": (8.0, 13.0), "beta": (13.0, 30.0),
+}
+NPERSEG = 256
+MAX_ENTRADAS_CACHE = 16
+
+
+class ResultadoEspectral:
+    """PSD (canal, f), espectrograma (canal, f, t) y potencia por banda (canal, banda)."""
+
+    def __init__(self, fs, canales, f, psd, f_sg, t_sg, sxx, potencias):
+        self.fs = fs
+        self.canales = canales            # (primero, último)
+        self.f = f
+        self.psd = psd
+        self.f_sg = f_sg
+        self.t_sg = t_sg
+        self.sxx = sxx
+        self.potencias = potencias
+        total = potencias.sum(axis=1, keepdims=True)
+        self.relativas = np.divide(potencias, total, out=np.zeros_like(potencias), where=total > 0)
+
+
+def psd_welch(senal, fs: float, canales: slice = slice(None), nperseg: int = NPERSEG,
+              solapamiento: int | None = None, max_bytes: int = MAX_BYTES_BLOQUE,
+              cancelar: Callable[[], bool] | None = None):
+    """Frecuencias y PSD de Welch (canal, f) promediada sobre todas las épocas."""
+    nperseg = min(nperseg, forma_3d(senal)[1])
+    if senal.ndim == 2:
+        return _welch_continua(senal, fs, canales, nperseg, solapamiento, max_bytes, cancelar)
+    suma, n = None, 0
+    for _, bloque in bloques_epocas(senal, canales, max_bytes):
+        if cancelar and cancelar():
+            raise CargaCancelada("Análisis espectral cancelado por el usuario.")
+        f, pxx = signal.welch(bloque, fs=fs, nperseg=nperseg, noverlap=solapamiento, axis=1)
+        suma = pxx.sum(axis=2) if suma is None else suma + pxx.sum(axis=2)
+        n += bloque.shape[2]
+    return f, suma / n
+
+
+def _welch_continua(senal, fs: float, canales: slice, nperseg: int, solapamiento: int | None,
+                    max_bytes: int, cancelar: Callable[[], bool] | None):
+    """Welch de una señal 2D por bloques de muestras.
+
+    Los bloques se solapan en `solapamiento` muestras y avanzan un múltiplo del
+    salto entre segmentos, así cada segmento cae entero en un solo bloque y el
+    promedio ponderado por segmentos es el mismo que con la señal entera.
+    """
+    solapamiento = nperseg // 2 if solapamiento is None else solapamiento
+    salto = nperseg - solapamiento
+    suma, n = None, 0
+    # welch arma los segmentos solapados y sus FFT: temporales de varias veces el bloque
+    for _, bloque in bloques_muestras(senal, canales, max_bytes=max_bytes // 4,
+                                      solape=solapamiento, multiplo=salto):
+        if cancelar and cancelar():
+            raise CargaCancelada("Análisis espectral cancelado por el usuario.")
+        if bloque.shape[1] < nperseg:
+            continue                     # cola sin segmentos completos (welch tampoco la usa)
+        f, pxx = signal.welch(bloque, fs=fs, nperseg=nperseg, noverlap=solapamiento, axis=1)
+        k = (bloque.shape[1] - nperseg) // salto + 1
+        suma = pxx * k if suma is None else suma + pxx * k
+        n += k
+    return f, suma / n
+
+
+def espectrograma(datos: np.ndarray, fs: float, nperseg: int = NPERSEG,
+                  solapamiento: int | None = None):
+    """Frecuencias, tiempos y densidad (canal, f, t) en float32 de datos (canal, muestras)."""
+    nperseg = min(nperseg, datos.shape[1])
+    f, t, sxx = signal.spectrogram(np.asarray(datos, dtype=np.float32), fs=fs, nperseg=nperseg,
+                                   noverlap=solapamiento, axis=1)
+    return f, t, sxx
+
+
+def potencia_bandas(f: np.ndarray, psd: np.ndarray, bandas: Dict[str, Tuple[float, float]] = BANDAS
+                    ) -> np.ndarray:
+    """Potencia absoluta (canal, banda) integrando la PSD en cada banda."""
+    potencias = np.zeros((psd.shape[0], len(bandas)))
+    for j, (f0, f1) in enumerate(bandas.values()):
+        mascara = (f >= f0) & (f < f1)
+        if np.count_nonzero(mascara) > 1:
+            potencias[:, j] = trapezoid(psd[:, mascara], f[mascara], axis=1)
+    return potencias
+
+
+class CacheEspectral:
+    """LRU en memoria de resultados parciales (PSD y bandas, espectrograma) por clave."""
+
+    def __init__(self, max_entradas: int = MAX_ENTRADAS_CACHE):
+        self.max_entradas = max_entradas
+        self._entradas: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def clave(ruta: str, *parametros) -> tuple:
+        st = os.stat(ruta)
+        return (os.path.abspath(ruta), st.st_mtime_ns, st.st_size) + parametros
+
+    def obtener(self, clave: tuple) -> tuple | None:
+        with self._lock:
+            res = self._entradas.get(clave)
+            if res is not None:
+                self._entradas.move_to_end(clave)
+            return res
+
+    def guardar(self, clave: tuple, res: tuple):
+        with self._lock:
+            self._entradas[clave] = res
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+
+
+cache = CacheEspectral()
+
+
+def analizar_espectro(senal, fs: float, ch_ini: int, ch_fin: int, epoca: int = 0,
+                      nperseg: int = NPERSEG, solapamiento: int | None = None,
+                      ruta: str | None = None, cancelar: Callable[[], bool] | None = None
+                      ) -> ResultadoEspectral:
+    """PSD, espectrograma de `epoca` y potencias por banda de los canales [ch_ini, ch_fin].
+
+    Con `ruta` el resultado se busca/guarda en la caché del módulo.
+    """
+    canales = slice(ch_ini, ch_fin + 1)
+    parametros = (ch_ini, ch_fin, float(fs), nperseg, solapamiento)
+    clave_psd = clave_sg = None
+    welch = grama = None
+    if ruta is not None:
+        clave_psd = cache.clave(ruta, "psd", *parametros)
+        clave_sg = cache.clave(ruta, "espectrograma", epoca, *parametros)
+        welch, grama = cache.obtener(clave_psd), cache.obtener(clave_sg)
+
+    if welch is None:
+        f, psd = psd_welch(senal, fs, canales, nperseg, solapamiento, cancelar=cancelar)
+        welch = (f, psd, potencia_bandas(f, psd))
+        if clave_psd is not None:
+            cache.guardar(clave_psd, welch)
+    if grama is None:
+        datos = senal[canales, :, epoca] if senal.ndim == 3 else senal[canales, :]
+        grama = espectrograma(datos, fs, nperseg, solapamiento)
+        if clave_sg is not None:
+            cache.guardar(clave_sg, grama)
+    f, psd, potencias = welch
+    return ResultadoEspectral(fs, (ch_ini, ch_fin), f, psd, *grama, potencias)
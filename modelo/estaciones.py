@@ -0,0 +1,146 @@
+"""Motor de agregación de series de varias estaciones meteorológicas.
+
+Todos los CSV de ``datos/`` comparten el esquema
+``fecha_hora,codigo,h,t,pr,vv,vv_max,dv,dv_max,p,calidad``. AlmacenEstaciones
+los junta en un único DataFrame columnar indexado por (codigo, fecha_hora) y
+resuelve con operaciones de pandas/NumPy (sin bucles por fila): filtro por
+``calidad``, remuestreo horario → diario/mensual, ventanas móviles y la tabla
+ancha fecha × estación que usa la vista de comparación.
+"""
+
+from __future__ import annotations
+import glob, os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List
+
+import numpy as np
+import pandas as pd
+
+from modelo.lector_csv import COLUMNA_FECHA, cargar_csv
+
+VARIABLES = ("h", "t", "pr", "vv", "vv_max", "dv", "dv_max", "p")
+NOMBRES_VARIABLES = {
+    "h": "Humedad (%)", "t": "Temperatura (°C)", "pr": "Presión (hPa)", "vv": "Viento (m/s)",
+    "vv_max": "Viento máx. (m/s)", "dv": "Dirección viento (°)", "dv_max": "Dirección ráfaga (°)",
+    "p": "Precipitación (mm)",
+}
+CALIDAD_VALIDA = (1.0,)
+FRECUENCIAS = {"Hora": "h", "Día": "D", "Mes": "MS"}
+ESTADISTICOS = {"Media": "mean", "Máximo": "max", "Mínimo": "min", "Suma": "sum"}
+PATRON_ARCHIVOS = "Estacion_meteorologica_*.csv"
+# Frecuencias que se resuelven truncando datetime64 (más rápido que pd.Grouper con freq)
+UNIDADES_NUMPY = {"h": "h", "D": "D", "MS": "M", "YS": "Y"}
+
+
+def agregacion_por_defecto(variable: str) -> str:
+    """La precipitación se acumula; el resto se promedia."""
+    return "sum" if variable == "p" else "mean"
+
+
+def _leer_estacion(ruta: str) -> pd.DataFrame:
+    df = cargar_csv(ruta)
+    codigo = df["codigo"].dropna()
+    if not codigo.empty:
+        # Las horas sin datos vienen con codigo vacío: se completan con el de la estación
+        df = df.assign(codigo=codigo.mode().iloc[0])
+    return df
+
+
+class AlmacenEstaciones:
+    """Series horarias de varias estaciones en un DataFrame indexado por (codigo, fecha_hora)."""
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+
+    @classmethod
+    def desde_archivos(cls, rutas: Iterable[str], hilos: int | None = None) -> "AlmacenEstaciones":
+        rutas = list(rutas)
+        if not rutas:
+            raise ValueError("No hay archivos de estaciones para cargar")
+        with ThreadPoolExecutor(max_workers=hilos) as pool:
+            partes = list(pool.map(_leer_estacion, rutas))
+        df = pd.concat(partes, ignore_index=True)
+        df = df.dropna(subset=["codigo", COLUMNA_FECHA])
+        df["codigo"] = df["codigo"].astype(np.int32)
+        df = df.set_index(["codigo", COLUMNA_FECHA]).sort_index()
+        df = df[~df.index.duplicated(keep="last")]
+        return cls(df)
+
+    @classmethod
+    def desde_carpeta(cls, carpeta: str, patron: str = PATRON_ARCHIVOS, **kwargs) -> "AlmacenEstaciones":
+        return cls.desde_archivos(sorted(glob.glob(os.path.join(carpeta, patron))), **kwargs)
+
+    # ------------------------------------------------------------------
+    @property
+    def codigos(self) -> List[int]:
+        return self.df.index.get_level_values("codigo").unique().tolist()
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    def seleccionar(self, codigos: Iterable[int] | None = None, desde=None, hasta=None) -> "AlmacenEstaciones":
+        """Subconjunto por estaciones y rango de fechas (cortes sobre el índice ordenado)."""
+        df = self.df
+        if codigos is not None:
+            df = df.loc[list(codigos)]
+        if desde is not None or hasta is not None:
+            df = df.loc[(slice(None), slice(desde, hasta)), :]
+        return AlmacenEstaciones(df)
+
+    def filtrar_calidad(self, validos: Iterable[float] = CALIDAD_VALIDA) -> "AlmacenEstaciones":
+        """Marca como NaN las mediciones cuyo `calidad` no es válido (la grilla horaria se conserva)."""
+        malos = ~self.df["calidad"].isin(list(validos)).to_numpy()
+        df = self.df.copy()
+        columnas = [c for c in VARIABLES if c in df.columns]
+        valores = df[columnas].to_numpy(copy=True)
+        valores[malos] = np.nan
+        df[columnas] = valores
+        return AlmacenEstaciones(df)
+
+    def remuestrear(self, frecuencia: str = "D",
+                    agregaciones: Dict[str, str | List[str]] | None = None) -> pd.DataFrame:
+        """Agregados por estación y período (índice (codigo, fecha_hora)).
+
+        Por defecto promedia todas las variables y suma la precipitación. Una suma
+        sin ninguna medición válida en el período queda NaN (no 0).
+        """
+        if agregaciones is None:
+            agregaciones = {v: agregacion_por_defecto(v) for v in VARIABLES if v in self.df.columns}
+        if frecuencia in UNIDADES_NUMPY:
+            fechas = self.df.index.get_level_values(COLUMNA_FECHA).to_numpy()
+            periodo = pd.Index(fechas.astype(f"datetime64[{UNIDADES_NUMPY[frecuencia]}]"),
+                               name=COLUMNA_FECHA)
+            claves = [self.df.index.get_level_values("codigo"), periodo]
+        else:
+            claves = [pd.Grouper(level="codigo"), pd.Grouper(level=COLUMNA_FECHA, freq=frecuencia)]
+        agrupado = self.df.groupby(claves)
+        resultado = agrupado.agg(agregaciones)
+        sumas = [v for v, a in agregaciones.items() if "sum" in ([a] if isinstance(a, str) else a)]
+        if sumas:
+            # pandas suma un grupo vacío como 0: tras filtrar_calidad eso sería "sin lluvia"
+            con_datos = agrupado[sumas].count() > 0
+            for v in sumas:
+                columna = (v, "sum") if isinstance(resultado.columns, pd.MultiIndex) else v
+                resultado[columna] = resultado[columna].where(con_datos[v])
+        return resultado
+
+    def movil(self, variable: str, ventana: str | int, estadistico: str = "mean") -> pd.Series:
+        """Ventana móvil por estación; `ventana` en períodos (int) o duración ('24h', '7D')."""
+        serie = self.df[variable].reset_index(level="codigo")
+        return serie.groupby("codigo")[variable].rolling(ventana).agg(estadistico)
+
+    def comparar(self, variable: str, frecuencia: str = "D", estadistico: str | None = None,
+                 ventana: int = 0) -> pd.DataFrame:
+        """Tabla ancha período × estación de `variable` agregada, con suavizado móvil opcional."""
+        estadistico = estadistico or agregacion_por_defecto(variable)
+        if frecuencia == "h":
+            ancha = self.df[variable].unstack("codigo")
+        else:
+            ancha = self.remuestrear(frecuencia, {variable: estadistico})[variable].unstack("codigo")
+        if ventana and ventana > 1:
+            ancha = ancha.rolling(ventana, min_periods=1).mean()   # todas las estaciones a la vez
+        return ancha
+
+    def resumen(self, variable: str) -> pd.DataFrame:
+        """Estadísticos de `variable` por estación."""
+        return self.df[variable].groupby(level="codigo").agg(["count", "mean", "min", "max"])
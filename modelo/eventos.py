@@ -0,0 +1,274 @@
+"""Detección de eventos en señales (canales, muestras[, épocas]) e índice ordenado.
+
+Los detectores trabajan sobre bloques de épocas completas (ver
+analisis_epocas.bloques_epocas) como arreglos (épocas, canales, muestras) y
+no tienen bucles por canal ni por muestra. Un registro continuo (2D) se lee
+por bloques de muestras que se solapan en las ventanas de los detectores:
+
+- cruce: la señal cruza hacia arriba mediana + umbral_desvios · σ del canal.
+- pico: máximo local (el mayor en ±distancia) con prominencia de al menos
+  prominencia_desvios · σ, medida contra el mínimo de cada lado dentro de
+  ±ventana_pico (como ``wlen`` en scipy.signal.find_peaks).
+- espiga: salto muestra a muestra mayor que desvios_espiga · σ de la derivada.
+- artefacto: comienzo de un tramo con |x| > desvios_artefacto · σ (saturación,
+  movimiento).
+
+σ es robusta (mediana de |x - mediana| / 0.6745) y se estima una sola vez
+por canal con EPOCAS_ESTIMACION épocas repartidas en el registro, así el
+resultado no depende de cómo se parta la lectura en bloques. Los eventos se
+guardan en un arreglo estructurado compacto ordenado por posición global
+(época · muestras + muestra), así que el siguiente/anterior evento y los
+eventos de una ventana salen con np.searchsorted en O(log n).
+"""
+
+from __future__ import annotations
+from typing import Callable, Dict, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy.ndimage import maximum_filter1d, minimum_filter1d
+
+from modelo.analisis_epocas import MAX_BYTES_BLOQUE, bloques_epocas, bloques_muestras, forma_3d
+from modelo.errores import CargaCancelada
+
+TIPOS = ("cruce", "pico", "espiga", "artefacto")
+EPOCAS_ESTIMACION = 32     # épocas con que se estiman mediana y σ de cada canal
+DTYPE_EVENTO = np.dtype([
+    ("posicion", "i8"), ("epoca", "i4"), ("muestra", "i8"), ("canal", "i4"),
+    ("tipo", "i1"), ("amplitud", "f4"), ("valor", "f4"),   # valor: prominencia, salto o σ según el tipo
+])
+
+
+class ParametrosDeteccion:
+    """Umbrales (en desvíos robustos) y ventanas (en segundos) de los detectores."""
+
+    def __init__(self, umbral_desvios: float = 4.0, prominencia_desvios: float = 3.0,
+                 ventana_pico: float = 0.2, distancia: float = 0.05, desvios_espiga: float = 6.0,
+                 desvios_artefacto: float = 10.0, tipos: Tuple[str, ...] = TIPOS):
+        self.umbral_desvios = umbral_desvios
+        self.prominencia_desvios = prominencia_desvios
+        self.ventana_pico = ventana_pico
+        self.distancia = distancia
+        self.desvios_espiga = desvios_espiga
+        self.desvios_artefacto = desvios_artefacto
+        self.tipos = tuple(tipos)
+
+
+def _sigma_robusta(x: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Mediana y σ por canal de x (épocas, canales, muestras), con forma (1, canales, 1)."""
+    mediana = np.median(x, axis=(0, 2), keepdims=True)
+    sigma = np.median(np.abs(x - mediana), axis=(0, 2), keepdims=True) / 0.6745
+    return mediana, np.where(sigma > 0, sigma, 1.0)
+
+
+class EscalaCanales:
+    """Mediana y σ por canal de la señal y σ de su derivada, con forma (1, canales, 1)."""
+
+    def __init__(self, mediana: np.ndarray, sigma: np.ndarray, sigma_derivada: np.ndarray):
+        self.mediana = mediana
+        self.sigma = sigma
+        self.sigma_derivada = sigma_derivada
+
+
+def estimar_escala(x: np.ndarray) -> EscalaCanales:
+    """Escala por canal de x (épocas, canales, muestras)."""
+    mediana, sigma = _sigma_robusta(x)
+    _, sigma_derivada = _sigma_robusta(np.abs(np.diff(x, axis=-1)))
+    return EscalaCanales(mediana, sigma, sigma_derivada)
+
+
+def escala_de_senal(senal, canales: slice = slice(None),
+                    max_bytes: int = MAX_BYTES_BLOQUE) -> EscalaCanales:
+    """Escala por canal estimada con hasta EPOCAS_ESTIMACION épocas repartidas en la señal.
+
+    En una señal 2D que no entra en `max_bytes` las "épocas" son
+    EPOCAS_ESTIMACION tramos repartidos en el registro.
+    """
+    n_canales, n_muestras, n_epocas = forma_3d(senal)
+    if senal.ndim == 2:
+        n_ch = len(range(*canales.indices(n_canales)))
+        largo = max(2, max_bytes // (8 * max(1, n_ch) * EPOCAS_ESTIMACION))
+        if n_muestras <= largo * EPOCAS_ESTIMACION:
+            return estimar_escala(np.asarray(senal[canales, :], dtype=np.float64)[None])
+        inicios = np.linspace(0, n_muestras - largo, EPOCAS_ESTIMACION).round().astype(int)
+        return estimar_escala(np.stack([np.asarray(senal[canales, i:i + largo], dtype=np.float64)
+                                        for i in inicios]))
+    epocas = np.unique(np.linspace(0, n_epocas - 1, min(n_epocas, EPOCAS_ESTIMACION)).round().astype(int))
+    return estimar_escala(np.stack([np.asarray(senal[canales, :, e], dtype=np.float64) for e in epocas]))
+
+
+def _eventos(mascara: np.ndarray, tipo: int, x: np.ndarray, valor: np.ndarray, e0: int,
+             desplazamiento: int = 0) -> np.ndarray:
+    """Eventos de una máscara; `valor` está alineado con la máscara y `desplazamiento`
+    pasa de su índice a la muestra de x (1 para máscaras calculadas sobre diferencias)."""
+    e, c, j = np.nonzero(mascara)
+    i = j + desplazamiento
+    salida = np.empty(len(e), dtype=DTYPE_EVENTO)
+    salida["epoca"] = e0 + e
+    salida["muestra"] = i
+    salida["canal"] = c
+    salida["tipo"] = tipo
+    salida["amplitud"] = x[e, c, i]
+    salida["valor"] = valor[e, c, j]
+    return salida
+
+
+def detectar_bloque(x: np.ndarray, fs: float, params: ParametrosDeteccion, e0: int = 0,
+                    canal0: int = 0, escala: EscalaCanales | None = None) -> np.ndarray:
+    """Eventos (sin ordenar) de un bloque x (épocas, canales, muestras).
+
+    Sin `escala`, mediana y σ se estiman con el mismo bloque.
+    """
+    escala = escala or estimar_escala(x)
+    mediana, sigma = escala.mediana, escala.sigma
+    partes = []
+    if "cruce" in params.tipos:
+        u = mediana + params.umbral_desvios * sigma
+        cruce = (x[..., :-1] < u) & (x[..., 1:] >= u)
+        partes.append(_eventos(cruce, TIPOS.index("cruce"), x, np.broadcast_to(sigma, x.shape), e0, 1))
+    if "pico" in params.tipos:
+        d = max(1, int(params.distancia * fs))
+        w = max(1, int(params.ventana_pico * fs))
+        es_maximo = x == maximum_filter1d(x, 2 * d + 1, axis=-1, mode="nearest")
+        # Mínimo a la izquierda ([i - w, i]) y a la derecha ([i, i + w]) de cada muestra
+        min_izq = minimum_filter1d(x, w + 1, axis=-1, mode="nearest", origin=w // 2)
+        min_der = minimum_filter1d(x, w + 1, axis=-1, mode="nearest", origin=-((w + 1) // 2))
+        prominencia = x - np.maximum(min_izq, min_der)
+        pico = es_maximo & (prominencia >= params.prominencia_desvios * sigma)
+        pico[..., 0] = pico[..., -1] = False
+        partes.append(_eventos(pico, TIPOS.index("pico"), x, prominencia, e0))
+    if "espiga" in params.tipos:
+        dx = np.abs(np.diff(x, axis=-1))
+        d = max(1, int(params.distancia * fs))
+        espiga = ((dx > params.desvios_espiga * escala.sigma_derivada)
+                  & (dx == maximum_filter1d(dx, 2 * d + 1, axis=-1)))
+        partes.append(_eventos(espiga, TIPOS.index("espiga"), x, dx, e0, 1))
+    if "artefacto" in params.tipos:
+        fuera = np.abs(x - mediana) > params.desvios_artefacto * sigma
+        inicio = fuera.copy()
+        inicio[..., 1:] &= ~fuera[..., :-1]
+        partes.append(_eventos(inicio, TIPOS.index("artefacto"), x, np.broadcast_to(sigma, x.shape), e0))
+    eventos = np.concatenate(partes) if partes else np.empty(0, dtype=DTYPE_EVENTO)
+    eventos["canal"] += canal0
+    return eventos
+
+
+class IndiceEventos:
+    """Eventos ordenados por posición global; búsquedas con np.searchsorted."""
+
+    def __init__(self, eventos: np.ndarray, n_muestras: int, fs: float):
+        self.n_muestras = n_muestras
+        self.fs = fs
+        eventos = eventos.copy()
+        eventos["posicion"] = eventos["epoca"].astype(np.int64) * n_muestras + eventos["muestra"]
+        self.eventos = eventos[np.argsort(eventos["posicion"], kind="stable")]
+        self._posiciones: Dict[tuple, Tuple[np.ndarray, np.ndarray]] = {}
+
+    def __len__(self) -> int:
+        return len(self.eventos)
+
+    def posicion(self, epoca: int, t: float) -> int:
+        return int(epoca) * self.n_muestras + int(round(t * self.fs))
+
+    def _filtrado(self, canales: Tuple[int, int] | None, tipo: str | None):
+        """(posiciones ordenadas, índices en self.eventos) del subconjunto; se arma una sola vez."""
+        clave = (canales, tipo)
+        if clave not in self._posiciones:
+            mascara = np.ones(len(self.eventos), dtype=bool)
+            if canales is not None:
+                mascara &= (self.eventos["canal"] >= canales[0]) & (self.eventos["canal"] <= canales[1])
+            if tipo is not None:
+                mascara &= self.eventos["tipo"] == TIPOS.index(tipo)
+            indices = np.flatnonzero(mascara)
+            self._posiciones[clave] = (self.eventos["posicion"][indices], indices)
+        return self._posiciones[clave]
+
+    def siguiente(self, posicion: int, canales=None, tipo=None) -> np.void | None:
+        """Primer evento estrictamente después de `posicion`."""
+        pos, indices = self._filtrado(canales, tipo)
+        i = np.searchsorted(pos, posicion, side="right")
+        return self.eventos[indices[i]] if i < len(pos) else None
+
+    def anterior(self, posicion: int, canales=None, tipo=None) -> np.void | None:
+        """Último evento estrictamente antes de `posicion`."""
+        pos, indices = self._filtrado(canales, tipo)
+        i = np.searchsorted(pos, posicion, side="left") - 1
+        return self.eventos[indices[i]] if i >= 0 else None
+
+    def en_ventana(self, epoca: int, t_ini: float, t_fin: float, canales=None, tipo=None) -> np.ndarray:
+        """Eventos de `epoca` con t_ini <= t < t_fin."""
+        pos, indices = self._filtrado(canales, tipo)
+        i0 = np.searchsorted(pos, self.posicion(epoca, t_ini), side="left")
+        i1 = np.searchsorted(pos, self.posicion(epoca, t_fin), side="left")
+        return self.eventos[indices[i0:i1]]
+
+    def conteo(self) -> Dict[str, int]:
+        cuentas = np.bincount(self.eventos["tipo"], minlength=len(TIPOS))
+        return {t: int(n) for t, n in zip(TIPOS, cuentas)}
+
+    def a_dataframe(self) -> pd.DataFrame:
+        e = self.eventos
+        return pd.DataFrame({
+            "epoca": e["epoca"], "muestra": e["muestra"], "tiempo_s": e["muestra"] / self.fs,
+            "canal": e["canal"], "tipo": np.asarray(TIPOS)[e["tipo"]],
+            "amplitud": e["amplitud"], "valor": e["valor"],
+        })
+
+    def exportar_csv(self, ruta: str):
+        self.a_dataframe().to_csv(ruta, index=False, float_format="%.6g")
+
+
+def detectar_eventos(senal, fs: float, params: ParametrosDeteccion | None = None,
+                     canales: slice = slice(None), max_bytes: int = MAX_BYTES_BLOQUE,
+                     progreso: Callable[[int, int], None] | None = None,
+                     cancelar: Callable[[], bool] | None = None) -> IndiceEventos:
+    """Recorre todas las épocas por bloques y devuelve el índice de eventos.
+
+    ``progreso(hechas, total)`` se llama tras cada bloque (épocas, o muestras
+    si la señal es 2D).
+    """
+    params = params or ParametrosDeteccion()
+    n_canales, n_muestras, n_epocas = forma_3d(senal)
+    canal0 = canales.indices(n_canales)[0]
+    # Los filtros de ventana crean temporales del tamaño del bloque: se leen bloques más chicos
+    escala = escala_de_senal(senal, canales, max_bytes // 4)
+    if senal.ndim == 2:
+        eventos = _detectar_continua(senal, fs, params, canales, canal0, escala,
+                                     max_bytes // 4, progreso, cancelar)
+        return IndiceEventos(eventos, n_muestras, fs)
+    partes = []
+    for e0, bloque in bloques_epocas(senal, canales, max_bytes // 4):
+        if cancelar and cancelar():
+            raise CargaCancelada("Detección de eventos cancelada por el usuario.")
+        partes.append(detectar_bloque(np.moveaxis(bloque, 2, 0), fs, params, e0, canal0, escala))
+        if progreso:
+            progreso(e0 + bloque.shape[2], n_epocas)
+    eventos = np.concatenate(partes) if partes else np.empty(0, dtype=DTYPE_EVENTO)
+    return IndiceEventos(eventos, n_muestras, fs)
+
+
+def _detectar_continua(senal, fs: float, params: ParametrosDeteccion, canales: slice, canal0: int,
+                       escala: EscalaCanales, max_bytes: int,
+                       progreso: Callable[[int, int], None] | None,
+                       cancelar: Callable[[], bool] | None) -> np.ndarray:
+    """Eventos de una señal 2D por bloques de muestras solapados.
+
+    Cada bloque trae `borde` muestras de más a cada lado (el alcance de las
+    ventanas de los detectores) y sólo se conservan los eventos de su parte
+    central, así el resultado es el mismo que con la señal entera.
+    """
+    n_muestras = senal.shape[1]
+    borde = max(int(params.distancia * fs), int(params.ventana_pico * fs), 1) + 1
+    partes = []
+    for i0, bloque in bloques_muestras(senal, canales, max_bytes=max_bytes, solape=2 * borde):
+        if cancelar and cancelar():
+            raise CargaCancelada("Detección de eventos cancelada por el usuario.")
+        i1 = i0 + bloque.shape[1]
+        desde = i0 + borde if i0 > 0 else 0
+        hasta = i1 - borde if i1 < n_muestras else n_muestras
+        eventos = detectar_bloque(bloque[None], fs, params, 0, canal0, escala)
+        eventos["muestra"] += i0
+        partes.append(eventos[(eventos["muestra"] >= desde) & (eventos["muestra"] < hasta)])
+        if progreso:
+            progreso(hasta, n_muestras)
+    return np.concatenate(partes) if partes else np.empty(0, dtype=DTYPE_EVENTO)
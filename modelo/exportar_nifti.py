@@ -0,0 +1,80 @@
+"""Exportación de un volumen DICOM a NIfTI escribiendo corte por corte.
+
+El volumen (z, y, x) en orden C tiene exactamente la disposición en disco
+que NIfTI espera para (x, y, z) en orden Fortran, así que cada corte axial
+se escribe tal cual, sin transponer ni copiar el volumen completo. La
+matriz afín se arma a partir de ImagePositionPatient, ImageOrientationPatient
+y PixelSpacing (convertidos de LPS de DICOM a RAS de NIfTI).
+"""
+
+from __future__ import annotations
+import gzip, os
+from typing import Callable
+
+import numpy as np
+import nibabel as nib
+
+from modelo.errores import CargaCancelada
+
+NIVEL_COMPRESION = 1   # gzip rápido por defecto; 0 = sin compresión dentro del .gz
+
+
+def afin_desde_metadatos(meta: dict | None) -> np.ndarray:
+    """Matriz afín vóxel (i=x, j=y, k=z) -> mm en RAS a partir de la geometría de la serie."""
+    if not meta:
+        return np.eye(4)
+    dz, dy, dx = meta["espaciado"]
+    fila = np.asarray(meta["orientacion"][:3], dtype=float)
+    columna = np.asarray(meta["orientacion"][3:], dtype=float)
+    paso_corte = meta.get("paso_corte")
+    if paso_corte is None:
+        paso_corte = np.cross(fila, columna) * dz
+    afin = np.eye(4)
+    afin[:3, 0] = fila * dx
+    afin[:3, 1] = columna * dy
+    afin[:3, 2] = paso_corte
+    afin[:3, 3] = meta["origen"]
+    return np.diag([-1, -1, 1, 1]) @ afin   # LPS -> RAS
+
+
+def exportar_nifti(vol: np.ndarray, ruta: str, meta: dict | None = None,
+                   nivel_compresion: int = NIVEL_COMPRESION,
+                   progreso: Callable[[int, int], None] | None = None,
+                   cancelar: Callable[[], bool] | None = None) -> str:
+    """Escribe `vol` (z, y, x) en `ruta` (.nii o .nii.gz) con memoria acotada a un corte.
+
+    ``progreso(hechos, total)`` se llama después de cada corte y ``cancelar()``
+    se consulta entre cortes (lanza CargaCancelada y no deja el archivo a medias).
+    """
+    z, y, x = vol.shape
+    afin = afin_desde_metadatos(meta)
+    # La cabecera se escribe en el orden nativo: los cortes se convierten a él (p. ej. '>i2')
+    dt = vol.dtype.newbyteorder("=")
+
+    hdr = nib.Nifti1Header()
+    hdr.set_data_shape((x, y, z))
+    hdr.set_data_dtype(dt)
+    hdr.set_qform(afin, code=1)
+    hdr.set_sform(afin, code=1)
+    hdr.set_xyzt_units("mm")
+    hdr["vox_offset"] = 352
+    cabecera = hdr.binaryblock + b"\x00" * 4   # 348 bytes + extensión vacía
+
+    if ruta.endswith(".gz"):
+        archivo = gzip.open(ruta, "wb", compresslevel=nivel_compresion)
+    else:
+        archivo = open(ruta, "wb")
+    try:
+        with archivo:
+            archivo.write(cabecera)
+            for k in range(z):
+                if cancelar and cancelar():
+                    raise CargaCancelada("Exportación NIfTI cancelada por el usuario.")
+                archivo.write(np.ascontiguousarray(vol[k], dtype=dt).tobytes())
+                if progreso:
+                    progreso(k + 1, z)
+    except BaseException:
+        if os.path.exists(ruta):
+            os.remove(ruta)
+        raise
+    return ruta
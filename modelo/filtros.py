@@ -0,0 +1,150 @@
+"""Filtrado digital de señales (canales, muestras) con secciones de segundo orden (SOS).
+
+ConfigFiltro describe la cadena: rereferencia (promedio común), quitar
+tendencia, pasa banda Butterworth y notch de red (50/60 Hz). El diseño SOS se
+cachea por (fs, parámetros) y se aplica a todos los canales en una sola
+llamada de scipy.signal sobre el eje 1.
+
+- filtrar: fase cero (sosfiltfilt) para una ventana ya en memoria; conviene
+  leer unas muestras de margen a cada lado (margen_muestras) y recortarlas
+  después para no ver el transitorio de los bordes.
+- FiltroContinuo: filtrado causal por bloques que arrastra el estado (zi)
+  entre llamadas, así una grabación larga se procesa con memoria constante y
+  sin saltos en los bordes de los bloques.
+
+Con referencia "promedio" el promedio común es siempre el de todos los
+canales del archivo, también cuando sólo se muestran algunos: quien lee los
+bloques usa FiltroContinuo.lectura y el filtro recorta tras rereferenciar.
+"""
+
+from __future__ import annotations
+from functools import lru_cache
+from typing import Iterator, Tuple
+
+import numpy as np
+from scipy import signal
+
+from modelo.analisis_epocas import MAX_BYTES_BLOQUE, bloques_muestras
+
+ORDEN_BUTTER = 4
+Q_NOTCH = 30.0
+REFERENCIAS = ("original", "promedio")
+
+
+class ConfigFiltro:
+    """Parámetros de la cadena de filtrado (None desactiva cada etapa)."""
+
+    def __init__(self, f_baja: float | None = None, f_alta: float | None = None,
+                 notch: float | None = None, quitar_tendencia: bool = False,
+                 referencia: str = "original", orden: int = ORDEN_BUTTER):
+        if referencia not in REFERENCIAS:
+            raise ValueError(f"Referencia desconocida: {referencia}")
+        self.f_baja = f_baja or None
+        self.f_alta = f_alta or None
+        self.notch = notch or None
+        self.quitar_tendencia = quitar_tendencia
+        self.referencia = referencia
+        self.orden = orden
+
+    @property
+    def activo(self) -> bool:
+        return bool(self.f_baja or self.f_alta or self.notch or self.quitar_tendencia
+                    or self.referencia != "original")
+
+    def sos(self, fs: float) -> np.ndarray | None:
+        return disenar_sos(float(fs), self.f_baja, self.f_alta, self.notch, self.orden)
+
+
+@lru_cache(maxsize=64)
+def disenar_sos(fs: float, f_baja: float | None, f_alta: float | None, notch: float | None,
+                orden: int = ORDEN_BUTTER) -> np.ndarray | None:
+    """Secciones SOS del pasa banda/alto/bajo y el notch, o None si no hay etapas."""
+    nyquist = fs / 2
+    if f_alta is not None and f_alta >= nyquist:
+        f_alta = None                    # por encima de Nyquist no hay nada que cortar
+    if f_baja is not None and f_alta is not None and f_baja >= f_alta:
+        raise ValueError("La frecuencia baja debe ser menor que la alta")
+    secciones = []
+    if f_baja is not None and f_alta is not None:
+        secciones.append(signal.butter(orden, [f_baja, f_alta], btype="bandpass", fs=fs, output="sos"))
+    elif f_baja is not None:
+        secciones.append(signal.butter(orden, f_baja, btype="highpass", fs=fs, output="sos"))
+    elif f_alta is not None:
+        secciones.append(signal.butter(orden, f_alta, btype="lowpass", fs=fs, output="sos"))
+    if notch is not None and notch < nyquist:
+        b, a = signal.iirnotch(notch, Q_NOTCH, fs=fs)
+        secciones.append(signal.tf2sos(b, a))
+    if not secciones:
+        return None
+    return np.concatenate(secciones)
+
+
+def margen_muestras(config: ConfigFiltro, fs: float) -> int:
+    """Muestras a leer de más a cada lado de una ventana para que el filtro se asiente."""
+    if config.f_baja:
+        return int(3 * fs / config.f_baja)
+    if config.notch or config.f_alta:
+        return int(fs)
+    return 0
+
+
+def rereferenciar(datos: np.ndarray, referencia: str) -> np.ndarray:
+    if referencia == "promedio":
+        return datos - datos.mean(axis=0, keepdims=True)
+    return datos
+
+
+def filtrar(datos: np.ndarray, fs: float, config: ConfigFiltro) -> np.ndarray:
+    """Aplica la cadena completa con fase cero a datos (canales, muestras)."""
+    datos = rereferenciar(np.asarray(datos, dtype=np.float64), config.referencia)
+    if config.quitar_tendencia:
+        datos = signal.detrend(datos, axis=1)
+    sos = config.sos(fs)
+    if sos is None:
+        return datos
+    padlen = min(datos.shape[1] - 1, 3 * (2 * len(sos) + 1))
+    return signal.sosfiltfilt(sos, datos, axis=1, padlen=padlen)
+
+
+class FiltroContinuo:
+    """Filtro causal por bloques (canales, muestras) con estado arrastrado entre llamadas.
+
+    ``procesar`` recibe los canales ``lectura`` de la señal y devuelve los de
+    ``canales``. Quitar tendencia no tiene sentido por bloques: aquí la deriva
+    se elimina con la frecuencia baja del pasa banda.
+    """
+
+    def __init__(self, config: ConfigFiltro, fs: float, n_canales: int, canales: slice = slice(None)):
+        self.config = config
+        self.sos = config.sos(fs)
+        self.n_canales = n_canales
+        # El promedio común necesita todos los canales: se leen todos y se recorta después
+        promedio = config.referencia == "promedio"
+        self.lectura = slice(None) if promedio else canales
+        self._recorte = canales if promedio else slice(None)
+        self.zi = None
+
+    def reiniciar(self):
+        self.zi = None
+
+    def procesar(self, bloque: np.ndarray) -> np.ndarray:
+        bloque = rereferenciar(np.asarray(bloque, dtype=np.float64), self.config.referencia)
+        bloque = bloque[self._recorte]
+        if self.sos is None:
+            return bloque
+        if self.zi is None:
+            # Estado inicial en régimen para el primer valor de cada canal (sin escalón)
+            zi = signal.sosfilt_zi(self.sos)                       # (secciones, 2)
+            self.zi = zi[:, None, :] * bloque[:, 0][None, :, None]  # (secciones, canales, 2)
+        salida, self.zi = signal.sosfilt(self.sos, bloque, axis=1, zi=self.zi)
+        return salida
+
+
+def filtrar_por_bloques(senal, fs: float, config: ConfigFiltro, canales: slice = slice(None),
+                        epoca: int = 0, max_bytes: int = MAX_BYTES_BLOQUE
+                        ) -> Iterator[Tuple[int, np.ndarray]]:
+    """Genera (primera muestra, bloque filtrado) recorriendo una época entera por bloques."""
+    n_canales = len(range(*canales.indices(senal.shape[0])))
+    filtro = FiltroContinuo(config, fs, n_canales, canales)
+    for i0, bloque in bloques_muestras(senal, filtro.lectura, epoca, max_bytes):
+        yield i0, filtro.procesar(bloque)
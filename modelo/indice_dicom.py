@@ -0,0 +1,84 @@
+"""Indexado de series DICOM leyendo sólo encabezados.
+
+Recorre una carpeta (recursivamente), lee cada archivo con
+``stop_before_pixels`` y ``specific_tags``, agrupa por SeriesInstanceUID y
+devuelve por serie: UID, cantidad de cortes, dimensiones, geometría,
+datos demográficos y la lista ordenada de (ruta, offset de PixelData).
+ModeloPacientes guarda este resultado en las tablas `series` y
+`series_archivos` para que la carga posterior no relea encabezados.
+"""
+
+from __future__ import annotations
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+import pydicom
+
+from modelo.cargador_dicom import TAGS_ENCABEZADO, archivos_dicom, metadatos_serie, ordenar_cortes
+
+TAGS_INDICE = TAGS_ENCABEZADO + [
+    "StudyInstanceUID", "PatientID", "PatientName", "PatientAge", "PatientSex", "StudyDate",
+]
+
+
+def leer_encabezado_indice(ruta: str) -> Tuple[object, int]:
+    """Encabezado con las etiquetas del índice y offset en bytes del elemento PixelData."""
+    with open(ruta, "rb") as f:
+        ds = pydicom.dcmread(f, stop_before_pixels=True, specific_tags=TAGS_INDICE)
+        return ds, f.tell()
+
+
+def demograficos(ds) -> Dict[str, str]:
+    """Campos del paciente convertidos a str para SQLite."""
+    return {
+        "patient_id" : str(getattr(ds, "PatientID",  "")),
+        "nombre"     : str(getattr(ds, "PatientName", "")),   # PersonName → str
+        "edad"       : str(getattr(ds, "PatientAge",  "")),
+        "sexo"       : str(getattr(ds, "PatientSex",  "")),
+        "study_date" : str(getattr(ds, "StudyDate",   "")),
+    }
+
+
+def indexar_carpeta(carpeta: str, hilos: int | None = None) -> List[dict]:
+    """Devuelve una entrada por serie encontrada en `carpeta` (recursivo), la más grande primero."""
+    return indexar_archivos(archivos_dicom(carpeta), carpeta, hilos)
+
+
+def indexar_archivos(rutas: List[str], carpeta: str, hilos: int | None = None) -> List[dict]:
+    """Igual que indexar_carpeta pero sobre una lista de archivos ya conocida.
+
+    Con ``hilos=1`` se lee en el hilo actual (útil dentro de un pool de procesos).
+    """
+    rutas = sorted(os.path.abspath(r) for r in rutas)
+    if hilos == 1:
+        leidos = [leer_encabezado_indice(r) for r in rutas]
+    else:
+        with ThreadPoolExecutor(max_workers=hilos) as pool:
+            leidos = list(pool.map(leer_encabezado_indice, rutas))
+
+    grupos: Dict[str, list] = {}
+    offsets = {}
+    for ruta, (ds, offset) in zip(rutas, leidos):
+        grupos.setdefault(str(getattr(ds, "SeriesInstanceUID", "")), []).append((ruta, ds))
+        offsets[ruta] = offset
+
+    series = []
+    for uid, pares in grupos.items():
+        cortes = ordenar_cortes(pares)
+        if not cortes:
+            continue
+        primero = cortes[0][1]
+        series.append({
+            "serie_uid": uid,
+            "estudio_uid": str(getattr(primero, "StudyInstanceUID", "")),
+            "carpeta": os.path.abspath(carpeta),
+            "n_cortes": len(cortes),
+            "filas": int(getattr(primero, "Rows", 0)),
+            "columnas": int(getattr(primero, "Columns", 0)),
+            "metadatos": metadatos_serie(cortes) if len(cortes) > 1 else None,
+            "demograficos": demograficos(primero),
+            "archivos": [(ruta, offsets[ruta]) for ruta, _ in cortes],
+        })
+    series.sort(key=lambda s: s["n_cortes"], reverse=True)
+    return series
@@ -0,0 +1,97 @@
+"""Ingesta masiva de estudios DICOM sin interfaz gráfica (no importa PyQt5).
+
+Recorre un árbol de carpetas, trata cada carpeta con archivos .dcm como un
+estudio, extrae los encabezados en un pool de procesos (indice_dicom) y
+registra pacientes + índice de series por lotes con executemany, un commit
+por lote. Es reanudable e idempotente: las carpetas ya indexadas no se
+vuelven a leer y las series ya presentes se omiten.
+
+Uso:
+    python -m modelo.ingesta_dicom RAIZ [--procesos N] [--lote 200] [--db app.db]
+"""
+
+from __future__ import annotations
+import argparse, os, time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Tuple
+
+from modelo.base_datos import DB_PATH, get_conn
+from modelo.indice_dicom import indexar_archivos
+from modelo.modelo_pacientes import ModeloPacientes
+
+TAMANO_LOTE = 200
+
+
+def carpetas_con_dicom(raiz: str) -> Iterator[Tuple[str, List[str]]]:
+    """(carpeta, archivos .dcm directos) para cada carpeta del árbol que tenga alguno."""
+    for carpeta, _, nombres in os.walk(raiz):
+        dcm = [os.path.join(carpeta, n) for n in nombres if n.lower().endswith(".dcm")]
+        if dcm:
+            yield os.path.abspath(carpeta), dcm
+
+
+def _indexar(tarea: Tuple[str, List[str]]):
+    """Trabajo de un proceso: indexa una carpeta; los errores se devuelven, no se lanzan."""
+    carpeta, rutas = tarea
+    try:
+        return carpeta, indexar_archivos(rutas, carpeta, hilos=1), None
+    except Exception as exc:
+        return carpeta, [], f"{type(exc).__name__}: {exc}"
+
+
+def ingerir(raiz: str, procesos: int | None = None, lote: int = TAMANO_LOTE,
+            ruta_db: str = DB_PATH) -> dict:
+    """Ingresa todos los estudios bajo `raiz` y devuelve estadísticas de la corrida."""
+    conn = get_conn(ruta_db)
+    modelo = ModeloPacientes(conn)
+    ya_indexadas = modelo.carpetas_indexadas()
+    todas = list(carpetas_con_dicom(raiz))
+    tareas = [t for t in todas if t[0] not in ya_indexadas]
+
+    t0 = time.perf_counter()
+    stats = {"carpetas": len(tareas), "omitidas": len(todas) - len(tareas), "pacientes": 0,
+             "series": 0, "archivos": 0, "errores": []}
+    pendientes = []
+
+    def _volcar():
+        if not pendientes:
+            return
+        stats["pacientes"] += modelo.insertar_lote(pendientes)
+        pendientes.clear()
+        dt = time.perf_counter() - t0
+        print(f"[ingesta] {stats['pacientes']} estudios nuevos · "
+              f"{stats['pacientes'] / dt:.1f} estudios/s")
+
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        for carpeta, series, error in pool.map(_indexar, tareas, chunksize=4):
+            if error:
+                stats["errores"].append((carpeta, error))
+                continue
+            # Se registra aunque no aporte nada nuevo, para no volver a leerla
+            pendientes.append((carpeta, series))
+            stats["series"] += len(series)
+            stats["archivos"] += sum(s["n_cortes"] for s in series)
+            if len(pendientes) >= lote:
+                _volcar()
+    _volcar()
+    conn.close()
+
+    stats["segundos"] = time.perf_counter() - t0
+    stats["estudios_por_segundo"] = stats["pacientes"] / stats["segundos"] if stats["segundos"] else 0.0
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingesta masiva de estudios DICOM.")
+    parser.add_argument("raiz", help="carpeta raíz a recorrer")
+    parser.add_argument("--procesos", type=int, default=None, help="procesos del pool")
+    parser.add_argument("--lote", type=int, default=TAMANO_LOTE, help="estudios por transacción")
+    parser.add_argument("--db", default=DB_PATH, help="ruta de la base SQLite")
+    args = parser.parse_args()
+
+    r = ingerir(args.raiz, args.procesos, args.lote, args.db)
+    print(f"Carpetas leídas: {r['carpetas']} (ya indexadas: {r['omitidas']})")
+    print(f"Estudios nuevos: {r['pacientes']} · series leídas: {r['series']} · archivos: {r['archivos']}")
+    print(f"Tiempo: {r['segundos']:.2f} s · {r['estudios_por_segundo']:.1f} estudios/s")
+    for carpeta, error in r["errores"]:
+        print(f"  ERROR {carpeta}: {error}")
@@ -0,0 +1,98 @@
+"""Lectura de CSV por bloques con tipos explícitos.
+
+Los archivos de estaciones meteorológicas de ``datos/`` comparten el esquema
+``fecha_hora,codigo,h,t,pr,vv,vv_max,dv,dv_max,p,calidad``: si el encabezado
+las trae todas, se leen con dtype fijo (pandas no tiene que inferirlo) y ``fecha_hora`` se
+convierte una sola vez a datetime64 con formato conocido. Cualquier otro CSV
+se lee igual, infiriendo sólo las columnas desconocidas.
+
+Tras la primera lectura completa el resultado queda en cache_csv (Feather);
+las lecturas siguientes del mismo archivo sin cambios salen de ahí.
+"""
+
+from __future__ import annotations
+from typing import Callable, Dict, Iterator, List
+
+import pandas as pd
+
+from modelo import cache_csv
+from modelo.errores import CargaCancelada
+
+COLUMNA_FECHA = "fecha_hora"
+FORMATO_FECHA = "%Y-%m-%d %H:%M:%S"
+DTYPES_ESTACION: Dict[str, str] = {
+    "codigo": "float64", "h": "float64", "t": "float64", "pr": "float64", "vv": "float64",
+    "vv_max": "float64", "dv": "float64", "dv_max": "float64", "p": "float64", "calidad": "float64",
+}
+PRIMER_BLOQUE = 1_000        # filas del primer bloque: la tabla se muestra enseguida
+TAMANO_BLOQUE = 200_000
+
+
+def es_estacion(encabezado: List[str]) -> bool:
+    """True si el encabezado trae el esquema completo de las estaciones."""
+    return COLUMNA_FECHA in encabezado and set(DTYPES_ESTACION) <= set(encabezado)
+
+
+def leer_columnas(ruta: str) -> List[str]:
+    """Encabezado del CSV sin leer datos."""
+    return list(pd.read_csv(ruta, nrows=0).columns)
+
+
+def _convertir_fecha(bloque: pd.DataFrame) -> pd.DataFrame:
+    if COLUMNA_FECHA in bloque.columns:
+        bloque[COLUMNA_FECHA] = pd.to_datetime(bloque[COLUMNA_FECHA], format=FORMATO_FECHA,
+                                               errors="coerce")
+    return bloque
+
+
+def leer_bloques(ruta: str, columnas: List[str] | None = None,
+                 primer_bloque: int = PRIMER_BLOQUE,
+                 tamano_bloque: int = TAMANO_BLOQUE) -> Iterator[pd.DataFrame]:
+    """Genera DataFrames consecutivos del CSV (el primero pequeño, el resto grandes)."""
+    encabezado = leer_columnas(ruta)
+    presentes = columnas or encabezado
+    # Una columna suelta llamada "h" o "p" en otro CSV no implica el esquema de estaciones
+    dtypes = {c: t for c, t in DTYPES_ESTACION.items() if c in presentes} if es_estacion(encabezado) else {}
+    if COLUMNA_FECHA in presentes:
+        dtypes[COLUMNA_FECHA] = "string"      # se convierte a datetime64 por bloque
+    primero = pd.read_csv(ruta, dtype=dtypes, usecols=columnas, nrows=primer_bloque)
+    yield _convertir_fecha(primero)
+    if len(primero) < primer_bloque:
+        return
+    resto = pd.read_csv(ruta, dtype=dtypes, usecols=columnas,
+                        skiprows=range(1, primer_bloque + 1), chunksize=tamano_bloque)
+    with resto:
+        for bloque in resto:
+            bloque.index += primer_bloque
+            yield _convertir_fecha(bloque)
+
+
+def cargar_csv(ruta: str, columnas: List[str] | None = None,
+               progreso: Callable[[pd.DataFrame], None] | None = None,
+               cancelar: Callable[[], bool] | None = None, usar_cache: bool = True,
+               **kwargs) -> pd.DataFrame:
+    """CSV como un DataFrame (sólo `columnas` si se dan).
+
+    ``progreso(bloque)`` recibe cada bloque leído; en un acierto de caché
+    recibe una sola vez el DataFrame completo. Sólo las lecturas de todas las
+    columnas se guardan en la caché.
+    """
+    clave = cache_csv.clave_csv(ruta) if usar_cache else None
+    if clave is not None:
+        df = cache_csv.obtener(clave, columnas)
+        if df is not None:
+            if progreso:
+                progreso(df)
+            return df
+
+    bloques = []
+    for bloque in leer_bloques(ruta, columnas, **kwargs):
+        if cancelar and cancelar():
+            raise CargaCancelada("Lectura de CSV cancelada por el usuario.")
+        bloques.append(bloque)
+        if progreso:
+            progreso(bloque)
+    df = bloques[0] if len(bloques) == 1 else pd.concat(bloques)
+    if clave is not None and columnas is None:
+        cache_csv.guardar(clave, df)
+    return df
@@ -0,0 +1,130 @@
+"""Lectura perezosa de archivos .mat.
+
+Listar las variables no carga datos: en los .mat v4/v5 se usa
+``scipy.io.whosmat`` (sólo lee los encabezados) y en los v7.3, que son HDF5,
+se recorren los datasets con h5py. Cada variable se lee recién cuando se
+pide, y una vez leída queda en memoria.
+
+En los v7.3 las variables no se cargan: se devuelven como VariableHDF5, que
+se indexa como un arreglo NumPy y lee del disco sólo el bloque pedido
+(hyperslab). MATLAB guarda en orden de columnas, así que h5py ve los ejes al
+revés; VariableHDF5 los invierte para que la forma coincida con la de MATLAB
+(p. ej. canales × muestras × épocas).
+"""
+
+from __future__ import annotations
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+import scipy.io as sio
+
+try:
+    import h5py
+except ImportError:          # h5py es opcional: sin él no se abren los .mat v7.3
+    h5py = None
+
+FIRMA_HDF5 = b"\x89HDF\r\n\x1a\n"
+ENCABEZADO_V73 = 512         # los .mat v7.3 tienen 512 bytes de encabezado antes del HDF5
+
+
+def es_v73(ruta: str) -> bool:
+    """True si el archivo es un .mat v7.3 (contenedor HDF5)."""
+    with open(ruta, "rb") as f:
+        cabecera = f.read(ENCABEZADO_V73 + len(FIRMA_HDF5))
+    return cabecera.startswith(b"MATLAB 7.3") or FIRMA_HDF5 in (cabecera[:8], cabecera[ENCABEZADO_V73:])
+
+
+def _normalizar_indice(clave, ndim: int) -> Tuple:
+    if not isinstance(clave, tuple):
+        clave = (clave,)
+    if any(c is Ellipsis for c in clave):
+        i = next(i for i, c in enumerate(clave) if c is Ellipsis)
+        relleno = (slice(None),) * (ndim - len(clave) + 1)
+        clave = clave[:i] + relleno + clave[i + 1:]
+    return clave + (slice(None),) * (ndim - len(clave))
+
+
+class VariableHDF5:
+    """Dataset de un .mat v7.3 visto con los ejes de MATLAB; el indexado lee sólo lo pedido."""
+
+    def __init__(self, dataset):
+        self.dataset = dataset
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        return tuple(reversed(self.dataset.shape))
+
+    @property
+    def ndim(self) -> int:
+        return self.dataset.ndim
+
+    @property
+    def dtype(self):
+        return self.dataset.dtype
+
+    @property
+    def nbytes(self) -> int:
+        return int(np.prod(self.shape)) * self.dtype.itemsize
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    def __getitem__(self, clave):
+        clave = _normalizar_indice(clave, self.ndim)
+        return np.asarray(self.dataset[clave[::-1]]).T
+
+    def __array__(self, dtype=None, copy=None):
+        datos = self.dataset[()].T
+        return datos if dtype is None else datos.astype(dtype, copy=False)
+
+
+def _clase_hdf5(objeto) -> str:
+    clase = objeto.attrs.get("MATLAB_class", b"")
+    return clase.decode() if isinstance(clase, bytes) else str(clase)
+
+
+def listar_variables(ruta: str) -> List[Tuple[str, Tuple[int, ...], str]]:
+    """(nombre, forma, clase MATLAB) de cada variable, sin leer sus datos."""
+    if not es_v73(ruta):
+        return [(n, tuple(f), c) for n, f, c in sio.whosmat(ruta)]
+    if h5py is None:
+        raise ImportError("Los .mat v7.3 (HDF5) necesitan h5py instalado")
+    with h5py.File(ruta, "r") as f:
+        return [(n, tuple(reversed(d.shape)), _clase_hdf5(d))
+                for n, d in f.items() if isinstance(d, h5py.Dataset) and not n.startswith("#")]
+
+
+class VariablesMAT(Mapping):
+    """Mapa nombre → variable de un .mat que lee cada variable la primera vez que se pide."""
+
+    def __init__(self, ruta: str):
+        self.ruta = ruta
+        self.v73 = es_v73(ruta)
+        self._archivo = None
+        self.info = {n: (forma, clase) for n, forma, clase in listar_variables(ruta)}
+        self._leidas: Dict[str, object] = {}
+
+    def __getitem__(self, nombre: str):
+        if nombre not in self.info:
+            raise KeyError(nombre)
+        if nombre not in self._leidas:
+            if self.v73:
+                if self._archivo is None:
+                    self._archivo = h5py.File(self.ruta, "r")
+                self._leidas[nombre] = VariableHDF5(self._archivo[nombre])
+            else:
+                self._leidas[nombre] = sio.loadmat(self.ruta, variable_names=[nombre])[nombre]
+        return self._leidas[nombre]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.info)
+
+    def __len__(self) -> int:
+        return len(self.info)
+
+    def cerrar(self):
+        self._leidas.clear()
+        if self._archivo is not None:
+            self._archivo.close()
+            self._archivo = None
@@ -1,54 +1,210 @@
 # modelo/modelo_pacientes.py
-import os, sqlite3, pydicom, dicom2nifti
-from typing import List
+import json, os, sqlite3
+from typing import List, Tuple
+
+from modelo.base_datos import PoolConexiones
+from modelo.indice_dicom import indexar_carpeta
+
+TAMANO_PAGINA = 200
+COLUMNAS = ("id", "patient_id", "nombre", "edad", "sexo", "study_date", "ruta_dicom", "ruta_nifti")
+COLUMNAS_ORDEN = ("id", "patient_id", "nombre", "edad", "sexo", "study_date")
 
 class ModeloPacientes():
-    def __init__(self, conn: sqlite3.Connection):
-        self.conn = conn
-        self._crear_tabla()
-
-    def _crear_tabla(self):
-        self.conn.execute("""
-        CREATE TABLE IF NOT EXISTS pacientes (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            patient_id TEXT,
-            nombre TEXT,
-            edad TEXT,
-            sexo TEXT,
-            study_date TEXT,
-            diagnostico TEXT,
-            ruta_dicom TEXT,
-            ruta_nifti TEXT
-        );
-        """)
-        self.conn.commit()
+    def __init__(self, conn: sqlite3.Connection | PoolConexiones):
+        # Con un pool cada hilo usa su propia conexión; el esquema ya lo migró base_datos
+        self._conn = conn
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if isinstance(self._conn, PoolConexiones):
+            return self._conn.conexion()
+        return self._conn
 
     # ---------- NUEVO ----------
 
-    def insertar_dicom(self, carpeta_dicom: str, ruta_nifti: str):
-        # Busca el primer archivo .dcm
-        archivo = next(
-            f for f in os.listdir(carpeta_dicom)
-            if f.lower().endswith(".dcm")
-        )
-        ds = pydicom.dcmread(os.path.join(carpeta_dicom, archivo))
-
-        #  Convierte TODO a str para  SQLite
-        campos = {
-            "patient_id" : str(getattr(ds, "PatientID",  "")),
-            "nombre"     : str(getattr(ds, "PatientName", "")),   # PersonName → str
-            "edad"       : str(getattr(ds, "PatientAge",  "")),
-            "sexo"       : str(getattr(ds, "PatientSex",  "")),
-            "study_date" : str(getattr(ds, "StudyDate",   "")),
-            "ruta_dicom" : str(carpeta_dicom),
-            "ruta_nifti" : str(ruta_nifti),
-        }
+    def insertar_dicom(self, carpeta_dicom: str, ruta_nifti: str) -> int:
+        # Indexa la carpeta leyendo sólo encabezados (sin píxeles)
+        series = indexar_carpeta(carpeta_dicom)
+        if not series:
+            raise ValueError(f"No se encontraron archivos DICOM en {carpeta_dicom}")
+
+        campos = dict(series[0]["demograficos"])
+        campos["ruta_dicom"] = str(carpeta_dicom)
+        campos["ruta_nifti"] = str(ruta_nifti)
 
         cols = ", ".join(campos.keys())
         vals = tuple(campos.values())          
         qs   = ", ".join("?"*len(campos))
-        self.conn.execute(f"INSERT INTO pacientes ({cols}) VALUES ({qs})", vals)
+        cur = self.conn.execute(f"INSERT INTO pacientes ({cols}) VALUES ({qs})", vals)
+        self._guardar_series(cur.lastrowid, series)
         self.conn.commit()
+        return cur.lastrowid
+
+    def _guardar_series(self, paciente_id: int, series: List[dict]):
+        """Guarda el índice de cada serie; una serie ya indexada se reemplaza."""
+        for s in series:
+            self.conn.execute(
+                "DELETE FROM series_archivos WHERE serie_id IN "
+                "(SELECT id FROM series WHERE serie_uid=?)", (s["serie_uid"],))
+            self.conn.execute("DELETE FROM series WHERE serie_uid=?", (s["serie_uid"],))
+            cur = self.conn.execute(
+                """INSERT INTO series (paciente_id, serie_uid, estudio_uid, carpeta,
+                                       n_cortes, filas, columnas, metadatos)
+                   VALUES (?,?,?,?,?,?,?,?)""",
+                (paciente_id, s["serie_uid"], s["estudio_uid"], s["carpeta"], s["n_cortes"],
+                 s["filas"], s["columnas"], json.dumps(s["metadatos"])))
+            serie_id = cur.lastrowid
+            self.conn.executemany(
+                "INSERT INTO series_archivos (serie_id, orden, ruta, offset_pixeles) VALUES (?,?,?,?)",
+                [(serie_id, i, ruta, offset) for i, (ruta, offset) in enumerate(s["archivos"])])
+
+    def series_existentes(self, uids: List[str]) -> set:
+        """Subconjunto de `uids` que ya está en la tabla series."""
+        existentes = set()
+        for i in range(0, len(uids), 500):   # límite de parámetros de SQLite
+            parte = uids[i:i + 500]
+            qs = ", ".join("?" * len(parte))
+            existentes.update(u for (u,) in self.conn.execute(
+                f"SELECT serie_uid FROM series WHERE serie_uid IN ({qs})", parte))
+        return existentes
+
+    def carpetas_indexadas(self) -> set:
+        return {c for (c,) in self.conn.execute(
+            "SELECT carpeta FROM carpetas_indexadas UNION SELECT DISTINCT carpeta FROM series")}
+
+    def insertar_lote(self, estudios: List[tuple]) -> int:
+        """Registra muchos estudios [(carpeta, series)] en una sola transacción.
+
+        Las series ya indexadas se omiten (ingesta idempotente) y todas las
+        carpetas del lote quedan registradas como indexadas, aporten o no
+        series nuevas. Los ids se asignan explícitamente para poder usar
+        executemany en las tres tablas. Devuelve la cantidad de pacientes insertados.
+        """
+        existentes = self.series_existentes(
+            [s["serie_uid"] for _, series in estudios for s in series])
+        pacientes, filas_series, filas_archivos = [], [], []
+        conn = self.conn
+        with conn:
+            if not conn.in_transaction:
+                conn.execute("BEGIN IMMEDIATE")   # reserva la escritura antes de leer MAX(id)
+            id_pac = conn.execute("SELECT COALESCE(MAX(id), 0) FROM pacientes").fetchone()[0]
+            id_ser = conn.execute("SELECT COALESCE(MAX(id), 0) FROM series").fetchone()[0]
+            for carpeta, series in estudios:
+                nuevas = [s for s in series if s["serie_uid"] not in existentes]
+                if not nuevas:
+                    continue
+                id_pac += 1
+                d = nuevas[0]["demograficos"]
+                pacientes.append((id_pac, d["patient_id"], d["nombre"], d["edad"], d["sexo"],
+                                  d["study_date"], str(carpeta), ""))
+                for s in nuevas:
+                    id_ser += 1
+                    existentes.add(s["serie_uid"])
+                    filas_series.append((id_ser, id_pac, s["serie_uid"], s["estudio_uid"],
+                                         s["carpeta"], s["n_cortes"], s["filas"], s["columnas"],
+                                         json.dumps(s["metadatos"])))
+                    filas_archivos += [(id_ser, i, ruta, offset)
+                                       for i, (ruta, offset) in enumerate(s["archivos"])]
+            conn.executemany(
+                """INSERT INTO pacientes (id, patient_id, nombre, edad, sexo, study_date,
+                                         ruta_dicom, ruta_nifti) VALUES (?,?,?,?,?,?,?,?)""",
+                pacientes)
+            conn.executemany(
+                """INSERT INTO series (id, paciente_id, serie_uid, estudio_uid, carpeta,
+                                       n_cortes, filas, columnas, metadatos)
+                   VALUES (?,?,?,?,?,?,?,?,?)""", filas_series)
+            conn.executemany(
+                "INSERT INTO series_archivos (serie_id, orden, ruta, offset_pixeles) VALUES (?,?,?,?)",
+                filas_archivos)
+            conn.executemany("INSERT OR IGNORE INTO carpetas_indexadas (carpeta) VALUES (?)",
+                             [(str(carpeta),) for carpeta, _ in estudios])
+        return len(pacientes)
+
+    def obtener_indice_serie(self, carpeta_dicom: str):
+        """(rutas ordenadas, metadatos) de la serie más grande indexada en la carpeta, o None."""
+        fila = self.conn.execute(
+            "SELECT id, metadatos FROM series WHERE carpeta=? ORDER BY n_cortes DESC LIMIT 1",
+            (os.path.abspath(carpeta_dicom),)).fetchone()
+        if fila is None or fila[1] in (None, "null"):
+            return None
+        rutas = [r for (r,) in self.conn.execute(
+            "SELECT ruta FROM series_archivos WHERE serie_id=? ORDER BY orden", (fila[0],))]
+        return rutas, json.loads(fila[1])
+
+    # ---------- Consultas paginadas ----------
+
+    @staticmethod
+    def _filtros_sql(filtros: dict | None) -> Tuple[List[str], list]:
+        """Condiciones WHERE para los filtros admitidos (todas usan índices)."""
+        filtros = filtros or {}
+        condiciones, params = [], []
+        if filtros.get("patient_id"):
+            condiciones.append("patient_id = ?")
+            params.append(filtros["patient_id"])
+        if filtros.get("nombre"):
+            # Prefijo como rango para que SQLite use idx_pacientes_nombre
+            condiciones.append("nombre >= ? AND nombre < ?")
+            params += [filtros["nombre"], filtros["nombre"] + "\uffff"]
+        if filtros.get("fecha_desde"):
+            condiciones.append("study_date >= ?")
+            params.append(filtros["fecha_desde"])
+        if filtros.get("fecha_hasta"):
+            condiciones.append("study_date <= ?")
+            params.append(filtros["fecha_hasta"])
+        if filtros.get("sexo"):
+            condiciones.append("sexo = ?")
+            params.append(filtros["sexo"])
+        return condiciones, params
+
+    def consultar_pagina(self, filtros: dict | None = None, despues_de: tuple | None = None,
+                         limite: int = TAMANO_PAGINA, orden: str = "id",
+                         descendente: bool = False) -> List[tuple]:
+        """Página de pacientes con paginación por clave (keyset).
+
+        `despues_de` es el cursor (valor de `orden`, id) de la última fila de
+        la página anterior; sin cursor se devuelve la primera página. Las
+        fechas se guardan como 'YYYYMMDD', así que el rango es lexicográfico.
+        """
+        if orden not in COLUMNAS_ORDEN:
+            raise ValueError(f"Columna de orden inválida: {orden}")
+        condiciones, params = self._filtros_sql(filtros)
+        sentido = "DESC" if descendente else "ASC"
+        if despues_de is not None:
+            op = "<" if descendente else ">"
+            if orden == "id":
+                condiciones.append(f"id {op} ?")
+                params.append(despues_de[1])
+            else:
+                condiciones.append(f"({orden}, id) {op} (?, ?)")
+                params += list(despues_de)
+        where = ("WHERE " + " AND ".join(condiciones)) if condiciones else ""
+        orden_sql = "id" if orden == "id" else f"{orden} {sentido}, id"
+        try:
+            return self.conn.execute(
+                f"SELECT {', '.join(COLUMNAS)} FROM pacientes {where} "
+                f"ORDER BY {orden_sql} {sentido} LIMIT ?",
+                params + [limite]).fetchall()
+        except sqlite3.Error as e:
+            print(f"[ERROR consultar_pagina] {e}")
+            return []
+
+    def obtener_fila(self, id_paciente: int, filtros: dict | None = None):
+        """Fila del paciente `id_paciente` si cumple los filtros, o None."""
+        condiciones, params = self._filtros_sql(filtros)
+        condiciones.insert(0, "id = ?")
+        return self.conn.execute(
+            f"SELECT {', '.join(COLUMNAS)} FROM pacientes WHERE {' AND '.join(condiciones)}",
+            [id_paciente] + params).fetchone()
+
+    @staticmethod
+    def cursor_de(fila: tuple, orden: str = "id") -> tuple:
+        """Cursor (valor de orden, id) para pedir la página siguiente a `fila`."""
+        return fila[COLUMNAS.index(orden)], fila[0]
+
+    def contar(self, filtros: dict | None = None) -> int:
+        condiciones, params = self._filtros_sql(filtros)
+        where = ("WHERE " + " AND ".join(condiciones)) if condiciones else ""
+        return self.conn.execute(f"SELECT COUNT(*) FROM pacientes {where}", params).fetchone()[0]
 
     def obtener_todos(self) -> List[tuple]:
         try:
@@ -1,30 +1,33 @@
 import sqlite3
-from modelo.base_datos import get_conn
+from modelo.autenticacion import (CacheCredenciales, hash_contrasena, necesita_rehash,
+                                  verificar_contrasena)
+from modelo.base_datos import PoolConexiones, obtener_pool
 from sqlite3 import Connection
 
 class ModeloUsuarios:
-    def __init__(self, conn: Connection | None = None):
-        self.conn = conn or get_conn()
-        self._crear_tabla()
-
-    # -- crea la tabla si no existe --------------------------------------
-    def _crear_tabla(self):
-        self.conn.execute("""
-            CREATE TABLE IF NOT EXISTS usuarios (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE NOT NULL,
-                password TEXT NOT NULL,
-                rol TEXT NOT NULL
-            );
-        """)
-        self.conn.commit()
+    def __init__(self, conn: Connection | PoolConexiones | None = None):
+        self._conn = conn or obtener_pool()
+        self.cache = CacheCredenciales()
+        self._hash_ficticio = None   # para que un usuario inexistente tarde lo mismo
+
+    # -- conexión del hilo actual (el esquema lo migra base_datos) -------
+    @property
+    def conn(self) -> Connection:
+        if isinstance(self._conn, PoolConexiones):
+            return self._conn.conexion()
+        return self._conn
+
+    def liberar_conexion(self):
+        """Cierra la conexión del pool del hilo actual (al final de un hilo de trabajo)."""
+        if isinstance(self._conn, PoolConexiones):
+            self._conn.cerrar_hilo()
 
     # -- inserta usuario nuevo -------------------------------------------
     def insertar_usuario(self, username: str, password: str, rol: str) -> bool:
         try:
             self.conn.execute(
                 "INSERT INTO usuarios (username, password, rol) VALUES (?,?,?)",
-                (username, password, rol))
+                (username, hash_contrasena(password), rol))
             self.conn.commit()
             return True
         except sqlite3.IntegrityError:
@@ -36,14 +39,30 @@ class ModeloUsuarios:
 
     # -- verifica login ---------------------------------------------------
     def verificar_usuario(self, username: str, password: str):
-        cur = self.conn.cursor()
-        cur.execute(
-            "SELECT username, rol FROM usuarios WHERE username=? AND password=?",
-            (username, password))
-        fila = cur.fetchone()
-        if fila:
-            return {"usuario": fila[0], "rol": fila[1]}
-        return None
+        """Devuelve {"usuario", "rol"} o None. Es lento (scrypt): llamarlo fuera de la GUI.
+
+        Las filas antiguas en texto plano se reescriben con hash al primer
+        login correcto.
+        """
+        fila = self.conn.execute(
+            "SELECT username, password, rol FROM usuarios WHERE username=?",
+            (username,)).fetchone()
+        if fila is None:
+            if self._hash_ficticio is None:
+                self._hash_ficticio = hash_contrasena("")
+            verificar_contrasena(password, self._hash_ficticio)
+            return None
+        usuario, guardado, rol = fila
+        if not self.cache.coincide(usuario, password, guardado):
+            if not verificar_contrasena(password, guardado):
+                return None
+            if necesita_rehash(guardado):
+                guardado = hash_contrasena(password)
+                self.conn.execute("UPDATE usuarios SET password=? WHERE username=?",
+                                  (guardado, usuario))
+                self.conn.commit()
+            self.cache.recordar(usuario, password, guardado)
+        return {"usuario": usuario, "rol": rol}
 
 
 
@@ -0,0 +1,115 @@
+"""Pirámide multirresolución (tipo mipmap) de un volumen (z, y, x).
+
+El nivel 0 es el volumen original y cada nivel siguiente promedia bloques de
+2x2x2 vóxeles del anterior. Los niveles se calculan bajo demanda (o en un hilo
+aparte) y por bloques de cortes, así la memoria extra queda acotada a ~1/7 del
+volumen aunque éste sea un memmap de miles de cortes.
+
+Cada consumidor elige su nivel: la reconstrucción 3D uno grueso, las
+miniaturas el más grueso y los visores de cortes el nivel 0 sólo cuando la
+escala en pantalla lo requiere.
+"""
+
+from __future__ import annotations
+import math, threading
+from typing import Callable, List
+
+import numpy as np
+
+LADO_MINIMO = 16    # no se generan niveles con algún lado menor a esto
+BLOQUE = 32         # cortes del nivel origen procesados por iteración
+
+
+def reducir_2x(vol: np.ndarray) -> np.ndarray:
+    """Promedia bloques 2x2x2; los lados impares se completan repitiendo el borde."""
+    z, y, x = vol.shape
+    salida = np.empty(((z + 1) // 2, (y + 1) // 2, (x + 1) // 2), dtype=vol.dtype)
+    for ini in range(0, z, BLOQUE):
+        bloque = np.asarray(vol[ini:ini + BLOQUE], dtype=np.float32)
+        pad = [(0, bloque.shape[0] % 2), (0, y % 2), (0, x % 2)]
+        if any(p[1] for p in pad):
+            bloque = np.pad(bloque, pad, mode="edge")
+        # Sumas por pares eje a eje: más rápido que mean() sobre un reshape 6D
+        bloque = bloque[0::2] + bloque[1::2]
+        bloque = bloque[:, 0::2] + bloque[:, 1::2]
+        media = (bloque[:, :, 0::2] + bloque[:, :, 1::2]) * 0.125
+        if np.issubdtype(vol.dtype, np.integer):
+            media = np.rint(media)
+        salida[ini // 2:ini // 2 + media.shape[0]] = media
+    return salida
+
+
+class PiramideVolumen:
+    """Niveles 2x submuestreados de un volumen, calculados bajo demanda."""
+
+    def __init__(self, vol: np.ndarray, lado_minimo: int = LADO_MINIMO):
+        self._niveles: List[np.ndarray | None] = [vol]
+        n = 1
+        forma = vol.shape
+        while min(forma) // 2 >= lado_minimo:
+            forma = tuple((d + 1) // 2 for d in forma)
+            n += 1
+        self._niveles += [None] * (n - 1)
+        self._candado = threading.Lock()
+        self._hilo: threading.Thread | None = None
+
+    @property
+    def n_niveles(self) -> int:
+        return len(self._niveles)
+
+    @property
+    def base(self) -> np.ndarray:
+        return self._niveles[0]
+
+    def nivel(self, k: int) -> np.ndarray:
+        """Devuelve el nivel k (0 = resolución completa), calculándolo si hace falta."""
+        k = max(0, min(k, self.n_niveles - 1))
+        for i in range(1, k + 1):
+            with self._candado:
+                if self._niveles[i] is None:
+                    self._niveles[i] = reducir_2x(self._niveles[i - 1])
+        return self._niveles[k]
+
+    def listo(self, k: int) -> bool:
+        """True si el nivel k ya está calculado (no bloquea)."""
+        return self._niveles[max(0, min(k, self.n_niveles - 1))] is not None
+
+    def factor(self, k: int) -> int:
+        return 2 ** max(0, min(k, self.n_niveles - 1))
+
+    # ------------------------------------------------------------------
+    def nivel_para_voxeles(self, max_voxeles: int) -> int:
+        """Nivel más fino cuyo número de vóxeles no supera `max_voxeles`."""
+        total = self.base.size
+        for k in range(self.n_niveles):
+            if total / 8 ** k <= max_voxeles:
+                return k
+        return self.n_niveles - 1
+
+    def nivel_para_escala(self, escala: float) -> int:
+        """Nivel adecuado para mostrar con `escala` píxeles de pantalla por vóxel del nivel 0."""
+        if escala >= 0.5:
+            return 0
+        return min(int(math.floor(math.log2(1.0 / escala))), self.n_niveles - 1)
+
+    def miniatura(self, eje: int = 0) -> np.ndarray:
+        """Corte central del nivel más grueso, para vistas previas."""
+        vol = self.nivel(self.n_niveles - 1)
+        return np.take(vol, vol.shape[eje] // 2, axis=eje)
+
+    def construir_en_segundo_plano(self, al_terminar: Callable[[], None] | None = None):
+        """Calcula todos los niveles en un hilo aparte y luego llama a `al_terminar` (desde ese hilo)."""
+        if self._hilo is not None:
+            return
+        if self.n_niveles == 1:
+            if al_terminar:
+                al_terminar()
+            return
+
+        def construir():
+            self.nivel(self.n_niveles - 1)
+            if al_terminar:
+                al_terminar()
+
+        self._hilo = threading.Thread(target=construir, daemon=True)
+        self._hilo.start()
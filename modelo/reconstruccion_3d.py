@@ -0,0 +1,89 @@
+"""Reconstrucción 3D por isosuperficie (marching cubes) con malla decimada.
+
+Sustituye a la nube de puntos aleatoria: la superficie se extrae sobre el
+volumen submuestreado, se simplifica por agrupamiento de vértices hasta un
+número máximo de triángulos y se guarda en una caché por (volumen, nivel,
+paso) para que redibujar o rotar no vuelva a calcularla.
+"""
+
+from __future__ import annotations
+import time, weakref
+from collections import OrderedDict
+from typing import Sequence, Tuple
+
+import numpy as np
+
+MAX_TRIANGULOS = 40_000
+MAX_VOXELES = 8_000_000   # tamaño máximo del nivel de pirámide usado para extraer
+MAX_MALLAS_EN_CACHE = 8
+
+_cache_mallas: "OrderedDict[tuple, tuple]" = OrderedDict()
+
+
+class Malla:
+    """Resultado de la extracción: vértices (x, y, z) en mm, caras y estadísticas."""
+
+    def __init__(self, verts: np.ndarray, caras: np.ndarray, segundos: float):
+        self.verts = verts
+        self.caras = caras
+        self.segundos = segundos
+
+    @property
+    def n_triangulos(self) -> int:
+        return len(self.caras)
+
+
+def decimar(verts: np.ndarray, caras: np.ndarray,
+            max_triangulos: int = MAX_TRIANGULOS) -> Tuple[np.ndarray, np.ndarray]:
+    """Simplifica la malla agrupando vértices en una grilla regular (vertex clustering)."""
+    if len(caras) <= max_triangulos:
+        return verts, caras
+    aristas = np.linalg.norm(verts[caras[:, 0]] - verts[caras[:, 1]], axis=1)
+    celda = float(aristas.mean()) * np.sqrt(len(caras) / max_triangulos)
+    origen = verts.min(axis=0)
+    while True:
+        grilla = np.floor((verts - origen) / celda).astype(np.int64)
+        dims = grilla.max(axis=0) + 1
+        codigo = (grilla[:, 0] * dims[1] + grilla[:, 1]) * dims[2] + grilla[:, 2]
+        _, inverso, cuenta = np.unique(codigo, return_inverse=True, return_counts=True)
+        nuevos = np.stack([np.bincount(inverso, weights=verts[:, k]) for k in range(3)], axis=1)
+        nuevos /= cuenta[:, None]
+
+        f = inverso[caras]
+        validas = (f[:, 0] != f[:, 1]) & (f[:, 1] != f[:, 2]) & (f[:, 0] != f[:, 2])
+        f = f[validas]
+        ordenadas = np.sort(f, axis=1).astype(np.int64)
+        n = len(cuenta)
+        _, unicas = np.unique((ordenadas[:, 0] * n + ordenadas[:, 1]) * n + ordenadas[:, 2],
+                              return_index=True)
+        f = f[np.sort(unicas)]
+        if len(f) <= max_triangulos:
+            return nuevos.astype(np.float32), f.astype(np.int32)
+        celda *= 1.25
+
+
+def extraer_superficie(vol: np.ndarray, nivel: float, paso: int = 2,
+                       espaciado: Sequence[float] = (1.0, 1.0, 1.0),
+                       max_triangulos: int = MAX_TRIANGULOS) -> Malla:
+    """Isosuperficie de `vol` (z, y, x) al `nivel` dado, con caché por volumen y parámetros."""
+    clave = (id(vol), vol.shape, float(nivel), int(paso), tuple(espaciado), max_triangulos)
+    guardada = _cache_mallas.get(clave)
+    if guardada is not None and guardada[0]() is vol:
+        _cache_mallas.move_to_end(clave)
+        return guardada[1]
+
+    from skimage.measure import marching_cubes
+
+    t0 = time.perf_counter()
+    if not (vol.min() < nivel < vol.max()):
+        raise ValueError(f"El nivel {nivel} está fuera del rango del volumen "
+                         f"({vol.min()}–{vol.max()}).")
+    verts, caras, _, _ = marching_cubes(vol, level=nivel, spacing=tuple(espaciado),
+                                        step_size=paso, allow_degenerate=False)
+    verts, caras = decimar(verts, caras, max_triangulos)
+    malla = Malla(verts[:, ::-1].copy(), caras, time.perf_counter() - t0)  # (z,y,x) -> (x,y,z)
+
+    _cache_mallas[clave] = (weakref.ref(vol), malla)
+    while len(_cache_mallas) > MAX_MALLAS_EN_CACHE:
+        _cache_mallas.popitem(last=False)
+    return malla
@@ -0,0 +1,94 @@
+"""Acceso a cortes ortogonales de un volumen con costo parecido en los tres ejes.
+
+En un arreglo en orden C sólo los cortes sobre el eje 0 son contiguos; los de
+los ejes 1 y 2 son lecturas con salto (strided) que recorren todo el volumen.
+VolumenOrtogonal guarda, si el presupuesto de memoria lo permite, una copia
+contigua con cada eje "lento" movido al frente. Las copias se construyen por
+bloques en un hilo aparte después de la carga; mientras no estén listas se
+sigue leyendo del volumen original.
+"""
+
+from __future__ import annotations
+import threading
+
+import numpy as np
+
+PRESUPUESTO_BYTES = 2 * 1024 ** 3  # memoria máxima para las copias (2 GB)
+BLOQUE = 32                        # cortes por bloque al construir una copia
+
+
+def _es_contiguo(vol: np.ndarray, eje: int) -> bool:
+    """True si un corte sobre `eje` es un bloque contiguo de memoria."""
+    corte = vol[(slice(None),) * eje + (0,)]
+    return corte.flags.c_contiguous or corte.flags.f_contiguous
+
+
+class VolumenOrtogonal:
+    """Envoltorio de un volumen que entrega cortes contiguos en cualquier eje."""
+
+    def __init__(self, vol: np.ndarray, presupuesto: int = PRESUPUESTO_BYTES):
+        self.vol = vol
+        self.presupuesto = presupuesto
+        self._copias: dict[int, np.ndarray] = {}
+        self._hilo: threading.Thread | None = None
+        self._cancelar = False
+
+        # Ejes que se beneficiarían de una copia, mientras entren en el presupuesto
+        self.ejes_copia = []
+        usado = 0
+        for eje in range(vol.ndim):
+            if _es_contiguo(vol, eje):
+                continue
+            if usado + vol.nbytes <= presupuesto:
+                self.ejes_copia.append(eje)
+                usado += vol.nbytes
+
+    @property
+    def shape(self):
+        return self.vol.shape
+
+    @property
+    def copias_listas(self) -> bool:
+        return all(eje in self._copias for eje in self.ejes_copia)
+
+    def corte(self, eje: int, indice: int) -> np.ndarray:
+        """Equivale a ``np.take(vol, indice, axis=eje)`` pero sin salto cuando hay copia."""
+        copia = self._copias.get(eje)
+        if copia is not None:
+            return copia[indice]
+        return self.vol[(slice(None),) * eje + (indice,)]
+
+    # ------------------------------------------------------------------
+    def preparar(self):
+        """Construye (en el hilo actual) las copias contiguas que falten."""
+        for eje in self.ejes_copia:
+            if eje in self._copias:
+                continue
+            origen = np.moveaxis(self.vol, eje, 0)
+            copia = np.empty(origen.shape, dtype=self.vol.dtype)
+            # Se recorre el volumen por bloques del eje 0 original para que la
+            # lectura sea secuencial y la escritura quede acotada en caché.
+            for ini in range(0, self.vol.shape[0], BLOQUE):
+                if self._cancelar:
+                    return
+                fin = min(ini + BLOQUE, self.vol.shape[0])
+                bloque = np.moveaxis(self.vol[ini:fin], eje, 0)
+                if eje == 0:
+                    copia[ini:fin] = bloque
+                else:
+                    destino = [slice(None)] * copia.ndim
+                    destino[1] = slice(ini, fin)
+                    copia[tuple(destino)] = bloque
+            self._copias[eje] = copia  # se publica sólo cuando está completa
+
+    def preparar_en_segundo_plano(self):
+        if self._hilo is None and self.ejes_copia:
+            self._hilo = threading.Thread(target=self.preparar, daemon=True)
+            self._hilo.start()
+
+    def liberar(self):
+        """Detiene la construcción pendiente y suelta las copias."""
+        self._cancelar = True
+        if self._hilo is not None:
+            self._hilo.join()
+        self._copias.clear()
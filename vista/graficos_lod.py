@@ -0,0 +1,145 @@
+"""Gráficos matplotlib con nivel de detalle que se recalcula al hacer zoom o desplazar.
+
+LineasLOD dibuja cada canal con la envolvente min/max del rango visible y
+DispersionLOD cambia a un histograma 2D cuando hay demasiados puntos a la
+vista. Ambos escuchan ``xlim_changed``/``ylim_changed`` de los ejes y piden
+un ``draw_idle``, así que el costo por cuadro queda acotado por el ancho en
+píxeles y no por el tamaño de los datos. DispersionLOD ordena los puntos por
+x una vez (el rango visible sale con np.searchsorted) y, con vistas amplias,
+recorta una grilla de densidad precalculada en lugar de recorrer los puntos.
+Hay que guardar una referencia al objeto mientras el gráfico esté visible
+(matplotlib guarda los callbacks como referencias débiles).
+"""
+
+from __future__ import annotations
+from typing import Sequence
+
+import numpy as np
+from matplotlib.colors import LogNorm
+
+from modelo.decimacion import MAX_PUNTOS_SCATTER, PiramideMinMax, histograma_visible
+
+CELDAS_GRILLA = 1024       # celdas por eje de la grilla de densidad de todos los puntos
+MIN_CELDAS_VISTA = (200, 150)   # con menos celdas de la grilla a la vista se cuenta sobre los puntos
+
+
+class LineasLOD:
+    """Líneas (una por canal) de una señal con muestreo uniforme, decimadas al rango visible."""
+
+    def __init__(self, ax, t: np.ndarray, datos: np.ndarray, etiquetas: Sequence[str] = (),
+                 colores: Sequence[str] = (), **estilo):
+        self.ax = ax
+        self.t = np.asarray(t)
+        self.piramide = PiramideMinMax(datos)
+        self.lineas = []
+        for i in range(self.piramide.n_canales):
+            kw = dict(estilo)
+            if i < len(etiquetas):
+                kw["label"] = etiquetas[i]
+            if colores:
+                kw["color"] = colores[i % len(colores)]
+            self.lineas.append(ax.plot([], [], **kw)[0])
+        ax.set_xlim(self.t[0], self.t[-1])
+        self._actualizar()
+        ax.relim(); ax.autoscale_view(scalex=False)
+        ax.callbacks.connect("xlim_changed", self._limites_cambiados)
+
+    def cambiar_datos(self, t: np.ndarray, datos: np.ndarray):
+        """Reemplaza la señal (mismos canales) reutilizando los artistas existentes."""
+        self.t = np.asarray(t)
+        self.piramide = PiramideMinMax(datos)
+        self.ax.set_xlim(self.t[0], self.t[-1])   # dispara _limites_cambiados -> _actualizar
+        self.ax.relim(); self.ax.autoscale_view(scalex=False)
+
+    def _columnas(self) -> int:
+        return max(100, int(self.ax.bbox.width))
+
+    def _actualizar(self):
+        x0, x1 = self.ax.get_xlim()
+        i0 = np.searchsorted(self.t, x0, side="right") - 1
+        i1 = np.searchsorted(self.t, x1, side="left") + 1
+        idx, y = self.piramide.envolvente(i0, i1, self._columnas())
+        tx = self.t[idx]
+        for linea, yc in zip(self.lineas, y):
+            linea.set_data(tx, yc)
+
+    def _limites_cambiados(self, ax):
+        self._actualizar()
+        ax.figure.canvas.draw_idle()
+
+
+class DispersionLOD:
+    """Dispersión que pasa a histograma 2D (densidad) con más de `max_puntos` a la vista."""
+
+    def __init__(self, ax, x: np.ndarray, y: np.ndarray, max_puntos: int = MAX_PUNTOS_SCATTER):
+        self.ax = ax
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        validos = np.isfinite(x) & np.isfinite(y)
+        orden = np.argsort(x[validos], kind="stable")
+        self.x = x[validos][orden]
+        self.y = y[validos][orden]
+        self.max_puntos = max_puntos
+        self._artista = None
+        self._ocupado = False
+        self._grilla = None             # (cuentas (fila y, columna x), bordes x, bordes y)
+        if len(self.x):
+            ax.set_xlim(self.x[0], self.x[-1])
+            ax.set_ylim(self.y.min(), self.y.max())
+        ax.set_autoscale_on(False)
+        self._actualizar()
+        ax.callbacks.connect("xlim_changed", self._limites_cambiados)
+        ax.callbacks.connect("ylim_changed", self._limites_cambiados)
+
+    @property
+    def es_densidad(self) -> bool:
+        return self._artista is not None and not hasattr(self._artista, "get_offsets")
+
+    def _recorte_grilla(self, x0, x1, y0, y1):
+        """(cuentas, extent) de la grilla precalculada en la vista, o None si quedaría muy gruesa."""
+        if self._grilla is None:
+            cuentas, bx, by = np.histogram2d(self.x, self.y, bins=CELDAS_GRILLA)
+            self._grilla = (cuentas.T, bx, by)
+        cuentas, bx, by = self._grilla
+        c0, c1 = np.searchsorted(bx, x0, side="right") - 1, np.searchsorted(bx, x1, side="left")
+        f0, f1 = np.searchsorted(by, y0, side="right") - 1, np.searchsorted(by, y1, side="left")
+        c0, f0 = max(c0, 0), max(f0, 0)
+        c1, f1 = min(c1, CELDAS_GRILLA), min(f1, CELDAS_GRILLA)
+        if c1 - c0 < MIN_CELDAS_VISTA[0] or f1 - f0 < MIN_CELDAS_VISTA[1]:
+            return None
+        return cuentas[f0:f1, c0:c1], (bx[c0], bx[c1], by[f0], by[f1])
+
+    def _actualizar(self):
+        (x0, x1), (y0, y1) = self.ax.get_xlim(), self.ax.get_ylim()
+        if self._artista is not None:
+            self._artista.remove()
+        i0 = np.searchsorted(self.x, min(x0, x1), side="left")
+        i1 = np.searchsorted(self.x, max(x0, x1), side="right")
+        densidad = None
+        if i1 - i0 > 4 * self.max_puntos:
+            densidad = self._recorte_grilla(min(x0, x1), max(x0, x1), min(y0, y1), max(y0, y1))
+        if densidad is None:
+            xs, ys = self.x[i0:i1], self.y[i0:i1]
+            en_y = (ys >= min(y0, y1)) & (ys <= max(y0, y1))
+            xs, ys = xs[en_y], ys[en_y]
+            if len(xs) <= self.max_puntos:
+                self._artista = self.ax.scatter(xs, ys, s=6)
+            else:
+                densidad = histograma_visible(xs, ys, (x0, x1), (y0, y1)), (x0, x1, y0, y1)
+        if densidad is not None:
+            cuentas, extent = densidad
+            self._artista = self.ax.imshow(
+                np.ma.masked_equal(cuentas, 0), origin="lower", extent=extent,
+                aspect="auto", interpolation="nearest", cmap="viridis",
+                norm=LogNorm(vmin=1, vmax=max(1.0, cuentas.max())))
+        self.ax.set_xlim(x0, x1); self.ax.set_ylim(y0, y1)   # imshow no debe mover los límites
+
+    def _limites_cambiados(self, ax):
+        if self._ocupado:
+            return
+        self._ocupado = True
+        try:
+            self._actualizar()
+        finally:
+            self._ocupado = False
+        ax.figure.canvas.draw_idle()
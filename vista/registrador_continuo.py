@@ -0,0 +1,213 @@
+"""Modo "registrador de papel": reproduce una señal multicanal en tiempo real.
+
+La pantalla muestra una ventana fija de `ventana` segundos que se barre de
+izquierda a derecha; lo nuevo sobrescribe lo más viejo detrás de un hueco
+(como un monitor de EEG). Cada canal tiene su anillo en un BufferCircular y
+se apila con un desplazamiento vertical. Por cuadro sólo se leen las
+muestras nuevas del archivo, se filtran (opcional, con estado) y se reducen a
+pares min/max para que el total de puntos en pantalla no pase de
+PUNTOS_EN_PANTALLA (64 canales quedan en ~1000 puntos cada uno, uno por
+píxel). Todos los canales van en una sola Line2D (separados por NaN):
+dibujar un artista es mucho más barato que decenas de artistas chicos.
+
+Se dibuja con blitting y sólo donde cambió: por cuadro se restaura del fondo
+guardado la franja que barrió la pluma (más el hueco), se dibuja la línea
+recortada a esa franja y se copia esa franja a la pantalla. Ejes, textos y
+el resto de la señal no se tocan.
+"""
+
+from __future__ import annotations
+import time
+
+import numpy as np
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+from matplotlib.transforms import Bbox
+
+from modelo.buffer_circular import BufferCircular
+from modelo.decimacion import DecimadorMinMax
+from modelo.filtros import FiltroContinuo
+
+FPS = 30
+PUNTOS_EN_PANTALLA = 64_000   # lo que cuesta un redibujado completo (al inicio o al redimensionar)
+MAX_COLUMNAS = 2000            # puntos por canal en pantalla (min/max intercalados)
+MIN_COLUMNAS = 200
+HUECO = 0.02                   # fracción de la ventana que se deja en blanco delante de la pluma
+SEPARACION_DESVIOS = 6.0       # separación entre canales, en desvíos estándar típicos
+
+
+class RegistradorContinuo(QObject):
+    """Reproduce los canales [ch_ini, ch_fin] de un ArchivoMAT en una figura con blitting."""
+    cuadro = pyqtSignal(float, float)      # tiempo actual (s), cuadros por segundo
+
+    def __init__(self, canvas, mat_obj, ch_ini: int, ch_fin: int, epoca: int = 0,
+                 t_ini: float = 0.0, ventana: float = 10.0, velocidad: float = 1.0,
+                 filtro=None, parent=None):
+        super().__init__(parent)
+        self.canvas = canvas
+        self.fig = canvas.figure
+        self.mat_obj = mat_obj
+        self.canales = slice(ch_ini, ch_fin + 1)
+        self.n_canales = ch_fin - ch_ini + 1
+        self.epoca = epoca
+        self.fs = mat_obj.fs
+        self.n_muestras = mat_obj.senal.shape[1]
+        self.velocidad = velocidad
+        self.muestra = int(t_ini * self.fs)
+        self._inicio = self.muestra
+        self._pendiente = 0.0              # fracción de muestra acumulada entre cuadros
+
+        muestras_ventana = max(2, int(ventana * self.fs))
+        objetivo = min(MAX_COLUMNAS, max(MIN_COLUMNAS, PUNTOS_EN_PANTALLA // self.n_canales))
+        self.decimador = DecimadorMinMax(-(-muestras_ventana // (objetivo // 2)))
+        columnas = muestras_ventana if self.decimador.paso == 1 else 2 * (-(-muestras_ventana // self.decimador.paso))
+        self.buffer = BufferCircular(self.n_canales, columnas)
+        self.hueco = max(1, int(columnas * HUECO))
+        self.filtro = (FiltroContinuo(filtro, self.fs, self.n_canales, self.canales)
+                       if filtro and filtro.activo else None)
+
+        self._separacion = self._estimar_separacion()
+        self._offsets = -self._separacion * np.arange(self.n_canales)[:, None]
+        self._y = np.empty(self.buffer.datos.shape)
+        self._fondo = None
+        self._pintado = None               # (posición, escritas) del último cuadro dibujado
+        self._tiempos_cuadro = []
+        self._t_ultimo = None
+        # Cada redibujado completo (p. ej. al cambiar el tamaño) renueva el fondo del blitting
+        self._cid_draw = self.canvas.mpl_connect("draw_event", self._guardar_fondo)
+        self._crear_ejes(ch_ini, ventana)
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(int(1000 / FPS))
+        self.timer.timeout.connect(self._avanzar)
+
+    # ------------------------------------------------------------------
+    def _leer(self, i0: int, i1: int, canales: slice | None = None) -> np.ndarray:
+        canales = self.canales if canales is None else canales
+        if self.mat_obj.senal.ndim == 3:
+            return np.asarray(self.mat_obj.senal[canales, i0:i1, self.epoca], dtype=np.float64)
+        return np.asarray(self.mat_obj.senal[canales, i0:i1], dtype=np.float64)
+
+    def _estimar_separacion(self) -> float:
+        muestra = self._leer(self.muestra, min(self.n_muestras, self.muestra + int(self.fs) + 1))
+        desvios = np.nanstd(muestra, axis=1) if muestra.size else np.ones(1)
+        tipico = float(np.nanmedian(desvios)) if np.isfinite(desvios).any() else 1.0
+        return SEPARACION_DESVIOS * (tipico or 1.0)
+
+    def _crear_ejes(self, ch_ini: int, ventana: float):
+        self.fig.clf()
+        self.ax = self.fig.add_subplot(111)
+        self._x = np.linspace(0, ventana, self.buffer.capacidad, endpoint=False)
+        # Sin antialiasing: al redibujar sólo una franja, los píxeles del borde quedan idénticos
+        # a los de un redibujado completo (con antialiasing se verían costuras)
+        self.linea = self.ax.plot([], [], color="black", linewidth=0.6, animated=True,
+                                  antialiased=False)[0]
+        self.ax.set_xlim(0, ventana)
+        self.ax.set_ylim(self._offsets[-1, 0] - self._separacion, self._separacion)
+        paso_etiquetas = max(1, self.n_canales // 32)
+        self.ax.set_yticks(self._offsets[::paso_etiquetas, 0])
+        self.ax.set_yticklabels([f"Canal {ch_ini + i}" for i in range(0, self.n_canales, paso_etiquetas)],
+                                fontsize=7)
+        self.ax.set_xlabel("Tiempo en la ventana (s)", fontsize=9)
+        self.ax.grid(True, axis="x", linestyle="--", alpha=0.3)
+        self.ax.set_title(f"Registro continuo • época {self.epoca}", fontsize=11)
+        self.fig.tight_layout()
+        self.canvas.draw()
+
+    def _guardar_fondo(self, _evento=None):
+        self._fondo = self.canvas.copy_from_bbox(self.ax.bbox)
+        self._pintado = None
+        self._pintar()
+
+    # ------------------------------------------------------------------
+    @property
+    def activo(self) -> bool:
+        return self.timer.isActive()
+
+    @property
+    def tiempo(self) -> float:
+        return self.muestra / self.fs
+
+    def iniciar(self):
+        self._t_ultimo = time.perf_counter()
+        self.timer.start()
+
+    def detener(self):
+        self.timer.stop()
+
+    def cerrar(self):
+        self.detener()
+        self.canvas.mpl_disconnect(self._cid_draw)
+
+    def _avanzar(self):
+        ahora = time.perf_counter()
+        dt, self._t_ultimo = ahora - self._t_ultimo, ahora
+        self._pendiente += dt * self.fs * self.velocidad
+        n = int(self._pendiente)
+        self._pendiente -= n
+        while n > 0:
+            if self.muestra >= self.n_muestras:          # fin: vuelve a empezar
+                self.muestra = self._inicio
+                if self.filtro:
+                    self.filtro.reiniciar()
+            i1 = min(self.n_muestras, self.muestra + n)
+            if self.filtro:
+                bloque = self.filtro.procesar(self._leer(self.muestra, i1, self.filtro.lectura))
+            else:
+                bloque = self._leer(self.muestra, i1)
+            self.buffer.escribir(self.decimador.procesar(bloque))
+            n -= i1 - self.muestra
+            self.muestra = i1
+        self._pintar()
+
+        self._tiempos_cuadro.append(ahora)
+        if len(self._tiempos_cuadro) > FPS:
+            self._tiempos_cuadro.pop(0)
+        fps = 0.0
+        if len(self._tiempos_cuadro) > 1:
+            fps = (len(self._tiempos_cuadro) - 1) / (self._tiempos_cuadro[-1] - self._tiempos_cuadro[0])
+        self.cuadro.emit(self.tiempo, fps)
+
+    def _franjas(self):
+        """Intervalos de columnas [k0, k1) que cambiaron desde el último cuadro dibujado."""
+        cap = self.buffer.capacidad
+        if self._pintado is None:
+            return [(0, cap)]
+        p0, escritas0 = self._pintado
+        n = self.buffer.escritas - escritas0 + self.hueco
+        if n >= cap:
+            return [(0, cap)]
+        if p0 + n <= cap:
+            return [(p0, p0 + n)]
+        return [(p0, cap), (0, p0 + n - cap)]
+
+    def _pintar(self):
+        if self._fondo is None:
+            return
+        y = self._y
+        np.add(self.buffer.datos, self._offsets, out=y)
+        p, cap = self.buffer.posicion, self.buffer.capacidad
+        y[:, p:p + self.hueco] = np.nan                       # hueco delante de la pluma
+        if p + self.hueco > cap:
+            y[:, :p + self.hueco - cap] = np.nan
+
+        caja = self.ax.bbox
+        rx0, ry0, _, ry1 = self._fondo.get_extents()          # coordenadas de agg (y hacia abajo)
+        ancho_columna = caja.width / cap
+        for k0, k1 in self._franjas():
+            x0 = max(caja.x0, np.floor(caja.x0 + k0 * ancho_columna) - 2)
+            x1 = min(caja.x1, np.ceil(caja.x0 + k1 * ancho_columna) + 2)
+            self.canvas.restore_region(self._fondo, bbox=(x0, ry0, x1, ry1), xy=(rx0, ry0))
+            franja = Bbox.from_extents(x0, caja.y0, x1 + 1, caja.y1)   # agg recorta [x0, x1 + 1)
+            # Sólo las columnas que tocan la franja (con las vecinas que caen en el margen);
+            # una columna de NaN al final de cada canal corta la línea entre canales
+            vecinas = int(np.ceil(4 / ancho_columna)) + 2
+            c0, c1 = max(0, k0 - vecinas), min(cap, k1 + vecinas)
+            ys = np.empty((self.n_canales, c1 - c0 + 1))
+            ys[:, :-1] = y[:, c0:c1]
+            ys[:, -1] = np.nan
+            xs = np.tile(np.append(self._x[c0:c1], np.nan), self.n_canales)
+            self.linea.set_data(xs, ys.ravel())
+            self.linea.set_clip_box(franja)
+            self.ax.draw_artist(self.linea)
+            self.canvas.blit(franja)
+        self._pintado = (p, self.buffer.escritas)
\ No newline at end of file
@@ -0,0 +1,87 @@
+"""Visor de un corte 2D basado en QGraphicsView.
+
+Sustituye a matplotlib ``imshow`` para la navegación de cortes: el corte
+(uint8, contiguo) se envuelve en un QImage sin copiar y se vuelca sobre un
+QGraphicsPixmapItem persistente, así cada actualización cuesta una sola
+conversión a QPixmap.
+
+La escena siempre está en píxeles del nivel 0; un corte de un nivel más
+grueso de la pirámide se muestra escalado por su `factor`, de modo que el
+zoom (rueda del mouse) se conserva al cambiar de nivel.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtGui import QImage, QPixmap, QTransform, QPainter
+from PyQt5.QtWidgets import QGraphicsPixmapItem, QGraphicsScene, QGraphicsView
+
+
+def a_uint8(corte: np.ndarray) -> np.ndarray:
+    """Escala un corte de cualquier tipo a uint8 (se usa en la vista previa de carga)."""
+    if corte.dtype == np.uint8:
+        return corte
+    cmin = float(corte.min())
+    escala = 255.0 / (float(corte.max()) - cmin + 1e-5)
+    return ((corte.astype(np.float32) - cmin) * escala).astype(np.uint8)
+
+
+class VisorCorte(QGraphicsView):
+    """Muestra un corte en escala de grises con una relación de aspecto configurable."""
+    escala_cambiada = pyqtSignal(float)   # píxeles de pantalla por vóxel del nivel 0
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setScene(QGraphicsScene(self))
+        self.item = QGraphicsPixmapItem()
+        self.item.setTransformationMode(Qt.SmoothTransformation)
+        self.scene().addItem(self.item)
+        self.setRenderHint(QPainter.SmoothPixmapTransform)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setBackgroundBrush(Qt.black)
+        self.setDragMode(QGraphicsView.ScrollHandDrag)
+        self._buffer: np.ndarray | None = None   # mantiene vivo el buffer del QImage
+        self._geometria = None                   # (alto, ancho, aspecto, factor) del último corte
+        self._zoom = 1.0                         # zoom del usuario sobre el ajuste a la ventana
+
+    def mostrar(self, corte: np.ndarray, aspecto: float = 1.0, factor: int = 1):
+        """Pinta `corte` (2D); `aspecto` escala el eje vertical (alto de píxel / ancho)
+        y `factor` es el submuestreo del nivel de pirámide del que proviene."""
+        corte = np.ascontiguousarray(a_uint8(corte))
+        alto, ancho = corte.shape
+        self._buffer = corte
+        img = QImage(corte.data, ancho, alto, corte.strides[0], QImage.Format_Grayscale8)
+        self.item.setPixmap(QPixmap.fromImage(img))
+        if self._geometria != (alto, ancho, aspecto, factor):
+            self._geometria = (alto, ancho, aspecto, factor)
+            centro = self.mapToScene(self.viewport().rect().center())
+            self.item.setTransform(QTransform.fromScale(factor, factor * aspecto))
+            self.setSceneRect(self.item.sceneBoundingRect())
+            self._ajustar()
+            if self._zoom > 1.0:
+                self.centerOn(centro)
+
+    def escala(self) -> float:
+        """Píxeles de pantalla por vóxel del nivel 0 en el eje horizontal."""
+        return self.transform().m11()
+
+    def _ajustar(self):
+        self.fitInView(self.item, Qt.KeepAspectRatio)
+        if self._zoom != 1.0:
+            self.scale(self._zoom, self._zoom)
+
+    def wheelEvent(self, event):
+        paso = 1.25 if event.angleDelta().y() > 0 else 1 / 1.25
+        nuevo = max(1.0, self._zoom * paso)
+        if nuevo != self._zoom:
+            self.setTransformationAnchor(QGraphicsView.AnchorUnderMouse)
+            self.scale(nuevo / self._zoom, nuevo / self._zoom)
+            self._zoom = nuevo
+            self.escala_cambiada.emit(self.escala())
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._ajustar()
+        self.escala_cambiada.emit(self.escala())
@@ -1,10 +1,105 @@
 # ====================== V I S T A   C S V ==============================
+import time
+from bisect import bisect_right
+
+import numpy as np
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QThread, pyqtSignal
 from PyQt5.QtWidgets import (QWidget, QLabel, QPushButton, QFileDialog, QVBoxLayout, QHBoxLayout,
-                             QMessageBox, QTableWidget, QTableWidgetItem, QComboBox)
+                             QMessageBox, QTableView, QComboBox)
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as Canvas
 from matplotlib.figure import Figure
 import pandas as pd
+from modelo.errores import CargaCancelada
 from modelo.clases_señales import ArchivoCSV
+from modelo.lector_csv import cargar_csv
+from vista.graficos_lod import DispersionLOD
+
+
+class ModeloTablaDataFrame(QAbstractTableModel):
+    """Tabla virtual sobre las columnas NumPy de un DataFrame.
+
+    Los bloques se agregan a medida que llegan del hilo de lectura; data()
+    sólo formatea las celdas visibles, sin crear un ítem por celda.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._columnas = []
+        self._bloques = []          # por bloque: lista de arrays NumPy (uno por columna)
+        self._inicios = []          # fila global donde empieza cada bloque
+        self._filas = 0
+
+    def reiniciar(self, columnas):
+        self.beginResetModel()
+        self._columnas = list(columnas)
+        self._bloques, self._inicios, self._filas = [], [], 0
+        self.endResetModel()
+
+    def agregar_bloque(self, df: pd.DataFrame):
+        if df.empty:
+            return
+        self.beginInsertRows(QModelIndex(), self._filas, self._filas + len(df) - 1)
+        self._bloques.append([df[c].to_numpy() for c in self._columnas])
+        self._inicios.append(self._filas)
+        self._filas += len(df)
+        self.endInsertRows()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._filas
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._columnas)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+        fila = index.row()
+        b = bisect_right(self._inicios, fila) - 1
+        valor = self._bloques[b][index.column()][fila - self._inicios[b]]
+        if isinstance(valor, np.datetime64):
+            return "" if np.isnat(valor) else np.datetime_as_string(valor, unit="s").replace("T", " ")
+        return str(valor)
+
+    def headerData(self, seccion, orientacion, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientacion == Qt.Horizontal:
+            return self._columnas[seccion]
+        return super().headerData(seccion, orientacion, role)
+
+
+class HiloCargaCSV(QThread):
+    """Lee el CSV por bloques y los entrega a la vista a medida que llegan."""
+    columnas = pyqtSignal(list)
+    bloque = pyqtSignal(object)             # DataFrame
+    terminado = pyqtSignal(object, float)   # DataFrame completo, segundos
+    fallo = pyqtSignal(str)
+
+    def __init__(self, ruta: str, parent=None):
+        super().__init__(parent)
+        self.ruta = ruta
+        self._cancelar = False
+        self._primero = True
+
+    def cancelar(self):
+        self._cancelar = True
+
+    def _bloque_leido(self, df):
+        if self._primero:
+            self.columnas.emit(list(df.columns))
+            self._primero = False
+        self.bloque.emit(df)
+
+    def run(self):
+        t0 = time.perf_counter()
+        try:
+            df = cargar_csv(self.ruta, progreso=self._bloque_leido,
+                            cancelar=lambda: self._cancelar)
+            self.terminado.emit(df, time.perf_counter() - t0)
+        except CargaCancelada:
+            pass
+        except Exception as exc:
+            import traceback; traceback.print_exc()
+            self.fallo.emit(str(exc))
+
 
 class VistaCSV(QWidget):
     """Carga CSV, muestra tabla y permite scatter entre columnas."""
@@ -15,6 +110,7 @@ class VistaCSV(QWidget):
         self.controlador = controlador
         self.setWindowTitle("Exploración CSV")
         self.archivo_csv = ArchivoCSV()
+        self.hilo_carga = None
         self._build_ui()
 
     def _build_ui(self):
@@ -35,8 +131,12 @@ class VistaCSV(QWidget):
         btn_scatter = QPushButton("Graficar Scatter"); btn_scatter.clicked.connect(self.graficar_scatter)
         v.addWidget(btn_scatter)
 
-        # Tabla de datos
-        self.tabla = QTableWidget(); v.addWidget(self.tabla)
+        # Tabla de datos (modelo virtual, se llena por bloques)
+        self.modelo_tabla = ModeloTablaDataFrame(self)
+        self.tabla = QTableView(); self.tabla.setModel(self.modelo_tabla)
+        self.tabla.verticalHeader().setDefaultSectionSize(22)
+        v.addWidget(self.tabla)
+        self.lbl_estado = QLabel(""); v.addWidget(self.lbl_estado)
 
         # Canvas matplotlib
         self.fig = Figure(figsize=(6,4)); 
@@ -47,22 +147,40 @@ class VistaCSV(QWidget):
     def cargar_csv(self):
         ruta, _ = QFileDialog.getOpenFileName(self, "Selecciona CSV", "", "CSV (*.csv)")
         if not ruta: return
-        try:
-            self.df = pd.read_csv(ruta)
-            self.cmb_x.clear(); self.cmb_y.clear();
-            self.cmb_x.addItems(self.df.columns); 
-            self.cmb_y.addItems(self.df.columns)
-            self._poblar_tabla()
-        except Exception as e:
-            QMessageBox.critical(self, "Error", str(e))
+        self._cancelar_carga()
+        self.ruta = ruta
+        if hasattr(self, "df"):
+            del self.df             # el scatter espera a que termine la lectura
+        self.lbl_estado.setText("Leyendo…")
+        self.hilo_carga = HiloCargaCSV(ruta, self)
+        self.hilo_carga.columnas.connect(self._columnas_leidas)
+        self.hilo_carga.bloque.connect(self.modelo_tabla.agregar_bloque)
+        self.hilo_carga.bloque.connect(self._bloque_leido)
+        self.hilo_carga.terminado.connect(self._carga_terminada)
+        self.hilo_carga.fallo.connect(lambda msg: QMessageBox.critical(self, "Error", msg))
+        self.hilo_carga.start()
+
+    def _columnas_leidas(self, columnas):
+        self.modelo_tabla.reiniciar(columnas)
+        self.cmb_x.clear(); self.cmb_y.clear()
+        self.cmb_x.addItems(columnas)
+        self.cmb_y.addItems(columnas)
+
+    def _bloque_leido(self, _):
+        self.lbl_estado.setText(f"Leyendo… {self.modelo_tabla.rowCount()} filas")
 
-    def _poblar_tabla(self):
-        self.tabla.setRowCount(len(self.df)); 
-        self.tabla.setColumnCount(len(self.df.columns))
-        self.tabla.setHorizontalHeaderLabels(self.df.columns)
-        for r in range(len(self.df)):
-            for c, col in enumerate(self.df.columns):
-                self.tabla.setItem(r, c, QTableWidgetItem(str(self.df.iloc[r, c])))
+    def _carga_terminada(self, df, segundos):
+        self.df = df
+        self.lbl_estado.setText(f"{len(df)} filas · {len(df.columns)} columnas · {segundos:.2f} s")
+
+    def _cancelar_carga(self):
+        if self.hilo_carga is not None and self.hilo_carga.isRunning():
+            self.hilo_carga.cancelar()
+            self.hilo_carga.wait()
+
+    def closeEvent(self, event):
+        self._cancelar_carga()
+        super().closeEvent(event)
 
     def graficar_scatter(self):
            # Verifica si el archivo CSV fue cargado
@@ -74,15 +192,19 @@ class VistaCSV(QWidget):
             if col_x == col_y:
                 QMessageBox.warning(self, "Columnas", "Elige columnas distintas para scatter")
                 return
+
+            # Las dos columnas del DataFrame ya cargado (lo mismo que muestra la tabla)
+            datos = self.df[[col_x, col_y]]
             
                     # Asegura que ambas columnas sean numéricas
-            if not pd.api.types.is_numeric_dtype(self.df[col_x]) or not pd.api.types.is_numeric_dtype(self.df[col_y]):
+            if not pd.api.types.is_numeric_dtype(datos[col_x]) or not pd.api.types.is_numeric_dtype(datos[col_y]):
                 QMessageBox.warning(self, "Tipo de dato", "Las columnas seleccionadas deben ser numéricas.")
                 return
             
             #  grafica
             self.fig.clf(); ax = self.fig.add_subplot(111)
-            ax.scatter(self.df[col_x], self.df[col_y])
+            # Con muchos puntos a la vista se dibuja la densidad (histograma 2D)
+            self._dispersion_lod = DispersionLOD(ax, datos[col_x].to_numpy(), datos[col_y].to_numpy())
             ax.set_xlabel(col_x); ax.set_ylabel(col_y)
             ax.set_title(f"Scatter: {col_x} vs {col_y}")
             self.canvas.draw()
@@ -1,45 +1,96 @@
 from __future__ import annotations
-import glob, os
-from typing import List
+import time
+from collections import deque
 
 import numpy as np
-import pydicom
-import nibabel as nib
-from PyQt5.QtCore import QTimer
+from PyQt5.QtCore import QTimer, QThread, pyqtSignal
+from PyQt5.QtGui import QImage, QPixmap
 from PyQt5.QtWidgets import (
     QFileDialog, QMessageBox, QPushButton, QVBoxLayout, QWidget, 
-    QHBoxLayout, QLabel, QSlider
+    QHBoxLayout, QLabel, QSlider, QProgressBar, QApplication, QComboBox, QSpinBox
 )
 from PyQt5.QtCore import Qt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as Canvas
 from matplotlib.figure import Figure
+from mpl_toolkits.mplot3d.art3d import Poly3DCollection
 
 from estilos import APP_STYLESHEET
-import cv2
-# ───────────────────────────── Helpers ─────────────────────────────────────────
-def _dicom_files(folder: str) -> List[str]:
-    return glob.glob(os.path.join(folder, "**", "*.dcm"), recursive=True)
-
-def cargar_volumen_desde_dicom(folder: str) -> np.ndarray:
-    paths = _dicom_files(folder)
-    print("Archivos encontrados:", len(paths))
-    slices = [
-        pydicom.dcmread(p) for p in paths
-        if (_ := pydicom.dcmread(p)) and
-           (hasattr(_, "ImagePositionPatient") or hasattr(_, "InstanceNumber"))
-    ]
-    if len(slices) < 2:
-        raise ValueError("No se encontraron suficientes imágenes DICOM válidas.")
-    try:
-        slices.sort(key=lambda s: float(s.ImagePositionPatient[2]))
-    except AttributeError:
-        slices.sort(key=lambda s: int(s.InstanceNumber))
-    vol = np.stack([s.pixel_array for s in slices]).astype(np.float32)
-    vol = (vol - vol.min()) / (np.ptp(vol) + 1e-5) * 255
-    return vol.astype(np.uint8)
+from modelo.cargador_dicom import CargaCancelada, cargar_serie
+from modelo.exportar_nifti import NIVEL_COMPRESION, exportar_nifti
+from modelo.piramide_volumen import PiramideVolumen
+from modelo.reconstruccion_3d import MAX_VOXELES, extraer_superficie
+from modelo.volumen_ortogonal import VolumenOrtogonal
+from vista.visor_corte import VisorCorte, a_uint8
+# ──────────────────────────── Hilo de carga ────────────────────────────────────
+class HiloCargaDICOM(QThread):
+    """Carga la serie fuera del hilo de la GUI y va emitiendo los cortes decodificados."""
+    corte_listo = pyqtSignal(int, object, int, int)   # índice, corte, hechos, total
+    primer_corte = pyqtSignal(float)                   # segundos hasta el primer corte
+    terminado = pyqtSignal(object, object, float)      # volumen, metadatos, segundos
+    fallo = pyqtSignal(str)
+    cancelado = pyqtSignal()
+
+    def __init__(self, carpeta: str, indice=None, parent=None):
+        super().__init__(parent)
+        self.carpeta = carpeta
+        self.indice = indice      # orden/geometría ya indexados en la base de datos
+        self._cancelar = False
+        self._t0 = 0.0
+
+    def cancelar(self):
+        self._cancelar = True
+
+    def _progreso(self, indice, corte, hechos, total):
+        if hechos == 1:
+            self.primer_corte.emit(time.perf_counter() - self._t0)
+        self.corte_listo.emit(indice, corte, hechos, total)
+
+    def run(self):
+        self._t0 = time.perf_counter()
+        try:
+            vol, meta = cargar_serie(self.carpeta, progreso=self._progreso,
+                                     cancelar=lambda: self._cancelar, indice=self.indice)
+            # La pirámide la arma la vista después de mostrar el volumen (el hilo termina ya)
+            self.terminado.emit(vol, meta, time.perf_counter() - self._t0)
+        except CargaCancelada:
+            self.cancelado.emit()
+        except Exception as exc:
+            import traceback; traceback.print_exc()
+            self.fallo.emit(str(exc))
+
+class HiloExportarNifti(QThread):
+    """Escribe el NIfTI corte a corte fuera del hilo de la GUI."""
+    progreso = pyqtSignal(int, int)     # hechos, total
+    terminado = pyqtSignal(str, float)  # ruta, segundos
+    fallo = pyqtSignal(str)
+
+    def __init__(self, volumen, ruta: str, metadatos, nivel_compresion: int, parent=None):
+        super().__init__(parent)
+        self.volumen = volumen
+        self.ruta = ruta
+        self.metadatos = metadatos
+        self.nivel_compresion = nivel_compresion
+        self._cancelar = False
+
+    def cancelar(self):
+        self._cancelar = True
+
+    def run(self):
+        t0 = time.perf_counter()
+        try:
+            exportar_nifti(self.volumen, self.ruta, self.metadatos, self.nivel_compresion,
+                           progreso=self.progreso.emit, cancelar=lambda: self._cancelar)
+            self.terminado.emit(self.ruta, time.perf_counter() - t0)
+        except CargaCancelada:
+            pass
+        except Exception as exc:
+            import traceback; traceback.print_exc()
+            self.fallo.emit(str(exc))
 
 # ──────────────────────────── Vista ────────────────────────────────────────────
 class VistaDICOM3D(QWidget):
+    piramide_lista = pyqtSignal(object)    # PiramideVolumen con todos sus niveles (desde otro hilo)
+
     def __init__(self, controlador):
         super().__init__()
         self.setStyleSheet(APP_STYLESHEET)
@@ -48,7 +99,11 @@ class VistaDICOM3D(QWidget):
         self.setMinimumSize(900, 650)
 
         self.volumen: np.ndarray | None = None
+        self.metadatos: dict | None = None   # espaciado/orientación de la serie
+        self.orto: VolumenOrtogonal | None = None  # cortes contiguos en los 3 planos
+        self.piramide: PiramideVolumen | None = None  # niveles 2x para 3D/miniatura/zoom
         self.canvas3d: Canvas | None = None
+        self._3d_pendiente = False     # vista 3D pedida antes de tener su nivel de pirámide
         self.ax3d    : "Figure.axes" | None = None
         
         # Variables para los índices actuales de cada plano
@@ -56,26 +111,89 @@ class VistaDICOM3D(QWidget):
         self.indice_coronal = 0
         self.indice_sagital = 0
 
+        # Carga en segundo plano
+        self.hilo_carga: HiloCargaDICOM | None = None
+        self.hilo_nifti: HiloExportarNifti | None = None
+        self._corte_previo = None          # último corte recibido durante la carga
+        self.t_primer_corte: float | None = None
+        self.timer_previo = QTimer(self)
+        self.timer_previo.setInterval(100)
+        self.timer_previo.timeout.connect(self._pintar_previo)
+        self.piramide_lista.connect(self._piramide_lista)
+
+        # Refresco de cortes: los eventos de los sliders sólo marcan el plano
+        # como pendiente y un timer de un cuadro de pantalla los agrupa.
+        self._planos_pendientes: set[str] = set()
+        self.timer_refresco = QTimer(self)
+        self.timer_refresco.setSingleShot(True)
+        pantalla = QApplication.primaryScreen()
+        hz = pantalla.refreshRate() if pantalla is not None else 60.0
+        self.timer_refresco.setInterval(max(1, int(1000 / (hz or 60.0))))
+        self.timer_refresco.timeout.connect(self._refrescar_pendientes)
+        self.tiempos_cuadro = deque(maxlen=120)   # ms por cuadro, últimos 120
+
         # ---------- UI ----------
         lay = QVBoxLayout(self)
 
-        btn_cargar = QPushButton("Cargar carpeta DICOM")
-        btn_cargar.clicked.connect(self.cargar_dicom)
+        self.btn_cargar = QPushButton("Cargar carpeta DICOM")
+        self.btn_cargar.clicked.connect(self.cargar_dicom)
+        self.btn_cancelar = QPushButton("Cancelar carga")
+        self.btn_cancelar.clicked.connect(self.cancelar_carga)
+        self.btn_cancelar.setEnabled(False)
+        self.barra_progreso = QProgressBar()
+        self.lbl_estado = QLabel("")
+        self.lbl_miniatura = QLabel()
+        self.lbl_miniatura.setFixedSize(64, 64)
+        self.lbl_miniatura.setAlignment(Qt.AlignCenter)
         btn_3d = QPushButton("Mostrar reconstrucción 3D")
         btn_3d.clicked.connect(self.mostrar_3d)
-        btn_nifti = QPushButton("Convertir a NIfTI")
-        btn_nifti.clicked.connect(self.convertir_a_nifti)
-        lay.addWidget(btn_cargar)
-        lay.addWidget(btn_3d)
-        lay.addWidget(btn_nifti)
-
-        # Canvas con 3 subplots para los cortes
-        self.canvas2d = Canvas(Figure(figsize=(12, 4)))
-        fig = self.canvas2d.figure
-        self.ax_axial   = fig.add_subplot(1, 3, 1)
-        self.ax_coronal = fig.add_subplot(1, 3, 2)
-        self.ax_sagital = fig.add_subplot(1, 3, 3)
-        lay.addWidget(self.canvas2d)
+        self.cmb_modo_3d = QComboBox()
+        self.cmb_modo_3d.addItems(["Superficie (marching cubes)", "Nube de puntos"])
+        self.sb_nivel_iso = QSpinBox()
+        self.sb_nivel_iso.setPrefix("Nivel iso: ")
+        self.sb_nivel_iso.setRange(1, 254)
+        self.sb_nivel_iso.setValue(50)
+        self.btn_nifti = QPushButton("Convertir a NIfTI")
+        self.btn_nifti.clicked.connect(self.convertir_a_nifti)
+        self.sb_compresion = QSpinBox()
+        self.sb_compresion.setPrefix("Compresión gzip: ")
+        self.sb_compresion.setRange(0, 9)
+        self.sb_compresion.setValue(NIVEL_COMPRESION)
+        self.sb_compresion.setToolTip("Sólo para .nii.gz; guarda como .nii para no comprimir")
+        h_carga = QHBoxLayout()
+        h_carga.addWidget(self.btn_cargar)
+        h_carga.addWidget(self.btn_cancelar)
+        h_carga.addWidget(self.lbl_miniatura)
+        lay.addLayout(h_carga)
+        lay.addWidget(self.barra_progreso)
+        lay.addWidget(self.lbl_estado)
+        h_3d = QHBoxLayout()
+        h_3d.addWidget(btn_3d)
+        h_3d.addWidget(self.cmb_modo_3d)
+        h_3d.addWidget(self.sb_nivel_iso)
+        lay.addLayout(h_3d)
+        h_nifti = QHBoxLayout()
+        h_nifti.addWidget(self.btn_nifti)
+        h_nifti.addWidget(self.sb_compresion)
+        lay.addLayout(h_nifti)
+
+        # Tres visores (QGraphicsView) para los cortes
+        h_cortes = QHBoxLayout()
+        self.visor_axial   = VisorCorte()
+        self.visor_coronal = VisorCorte()
+        self.visor_sagital = VisorCorte()
+        for titulo, visor in (("Axial", self.visor_axial),
+                              ("Coronal", self.visor_coronal),
+                              ("Sagital", self.visor_sagital)):
+            col = QVBoxLayout()
+            col.addWidget(QLabel(titulo), alignment=Qt.AlignCenter)
+            col.addWidget(visor)
+            h_cortes.addLayout(col)
+            plano = titulo.lower()
+            visor.escala_cambiada.connect(lambda _e, p=plano: self._programar_refresco(p))
+        lay.addLayout(h_cortes, stretch=1)
+        self.lbl_cuadro = QLabel("")
+        lay.addWidget(self.lbl_cuadro)
         
         # ---------- SLIDERS PARA NAVEGACIÓN ----------
         sliders_layout = QVBoxLayout()
@@ -114,15 +232,109 @@ class VistaDICOM3D(QWidget):
         carpeta = QFileDialog.getExistingDirectory(self, "Selecciona carpeta DICOM")
         if not carpeta:
             return
-        try:
-            self.ruta_dicom = carpeta
-            self.volumen = cargar_volumen_desde_dicom(carpeta)
-            QMessageBox.information(self, "Carga exitosa", "Volumen cargado.")
-            self.configurar_sliders()
-            self.mostrar_cortes()  
-        except Exception as exc:
-            QMessageBox.critical(self, "Error", str(exc))
-            import traceback; traceback.print_exc()
+        if self.hilo_carga is not None and self.hilo_carga.isRunning():
+            return
+        self.ruta_dicom = carpeta
+        self.volumen = None
+        self.metadatos = None
+        self.piramide = None
+        self._3d_pendiente = False
+        self.lbl_miniatura.clear()
+        self._corte_previo = None
+        self.t_primer_corte = None
+        self.barra_progreso.setValue(0)
+        self.lbl_estado.setText("Cargando…")
+        self.btn_cargar.setEnabled(False)
+        self.btn_cancelar.setEnabled(True)
+
+        # La consulta a SQLite se hace aquí: la conexión pertenece al hilo de la GUI
+        indice = self.controlador.indice_serie(carpeta)
+        self.hilo_carga = HiloCargaDICOM(carpeta, indice, self)
+        self.hilo_carga.corte_listo.connect(self._corte_listo)
+        self.hilo_carga.primer_corte.connect(self._primer_corte)
+        self.hilo_carga.terminado.connect(self._carga_terminada)
+        self.hilo_carga.fallo.connect(self._carga_fallida)
+        self.hilo_carga.cancelado.connect(self._carga_cancelada)
+        self.hilo_carga.finished.connect(self._fin_hilo)
+        self.hilo_carga.start()
+        self.timer_previo.start()
+
+    def cancelar_carga(self):
+        if self.hilo_carga is not None:
+            self.hilo_carga.cancelar()
+            self.btn_cancelar.setEnabled(False)
+
+    def _corte_listo(self, indice, corte, hechos, total):
+        self.barra_progreso.setRange(0, total)
+        self.barra_progreso.setValue(hechos)
+        self._corte_previo = (indice, corte)
+
+    def _primer_corte(self, segundos):
+        self.t_primer_corte = segundos
+        print(f"[VistaDICOM3D] Tiempo hasta primer corte: {segundos * 1000:.1f} ms")
+        self._pintar_previo()
+
+    def _pintar_previo(self):
+        """Muestra en el eje axial el último corte decodificado mientras dura la carga."""
+        if self._corte_previo is None:
+            return
+        indice, corte = self._corte_previo
+        self._corte_previo = None
+        self.visor_axial.mostrar(corte)
+        self.label_axial.setText(f"Axial (Z): {indice} (cargando)")
+
+    def _carga_terminada(self, volumen, metadatos, segundos):
+        self.volumen = volumen
+        self.metadatos = metadatos
+        self.barra_progreso.setValue(self.barra_progreso.maximum())
+        self._corte_previo = None
+        self.lbl_estado.setText(
+            f"Primer corte: {self.t_primer_corte * 1000:.0f} ms · "
+            f"volumen completo: {segundos:.2f} s · {volumen.shape}"
+        )
+        self.configurar_sliders()
+        self.mostrar_cortes()          # crea la pirámide y lanza sus niveles en segundo plano
+        QMessageBox.information(self, "Carga exitosa", "Volumen cargado.")
+
+    def _piramide_lista(self, piramide):
+        """Con todos los niveles listos: miniatura y posible cambio de nivel en los visores."""
+        if piramide is not self.piramide:
+            return                      # de un volumen anterior
+        mini = np.ascontiguousarray(a_uint8(self.piramide.miniatura()))
+        img = QImage(mini.data, mini.shape[1], mini.shape[0], mini.strides[0],
+                     QImage.Format_Grayscale8).copy()
+        self.lbl_miniatura.setPixmap(QPixmap.fromImage(img).scaled(
+            self.lbl_miniatura.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation))
+        for plano in ("axial", "coronal", "sagital"):
+            self._programar_refresco(plano)
+        if self._3d_pendiente:
+            self._3d_pendiente = False
+            self._pintar_3d()
+
+    def _carga_fallida(self, mensaje):
+        self.lbl_estado.setText("Error en la carga")
+        QMessageBox.critical(self, "Error", mensaje)
+
+    def _carga_cancelada(self):
+        self.lbl_estado.setText("Carga cancelada")
+        self.barra_progreso.setValue(0)
+
+    def _fin_hilo(self):
+        self.timer_previo.stop()
+        self.btn_cargar.setEnabled(True)
+        self.btn_cancelar.setEnabled(False)
+        self.hilo_carga = None
+
+    def closeEvent(self, event):
+        if self.hilo_carga is not None:
+            self.hilo_carga.cancelar()
+            self.hilo_carga.wait()
+        if self.hilo_nifti is not None:
+            self.hilo_nifti.cancelar()      # borra el archivo a medio escribir
+            self.hilo_nifti.wait()
+        if self.orto is not None:
+            self.orto.liberar()
+        super().closeEvent(event)
     
     def configurar_sliders(self):
         """Configura los rangos de los sliders según las dimensiones del volumen"""
@@ -157,7 +369,7 @@ class VistaDICOM3D(QWidget):
         if self.volumen is not None:
             z, y, x = self.volumen.shape
             self.label_axial.setText(f"Axial (Z): {valor}/{z-1}")
-            self.mostrar_cortes()
+            self._programar_refresco("axial")
     
     def actualizar_coronal(self, valor):
         """Actualiza la vista coronal cuando se mueve el slider"""
@@ -165,7 +377,7 @@ class VistaDICOM3D(QWidget):
         if self.volumen is not None:
             z, y, x = self.volumen.shape
             self.label_coronal.setText(f"Coronal (Y): {valor}/{y-1}")
-            self.mostrar_cortes()
+            self._programar_refresco("coronal")
     
     def actualizar_sagital(self, valor):
         """Actualiza la vista sagital cuando se mueve el slider"""
@@ -173,43 +385,74 @@ class VistaDICOM3D(QWidget):
         if self.volumen is not None:
             z, y, x = self.volumen.shape
             self.label_sagital.setText(f"Sagital (X): {valor}/{x-1}")
-            self.mostrar_cortes()
-        # ----------------------------- VISTAS 2D --------------------------------------
-    def mostrar_cortes(self):
-        """Muestra axial, coronal y sagital en el canvas de la interfaz usando los índices de los sliders."""
+            self._programar_refresco("sagital")
+    # ----------------------------- VISTAS 2D --------------------------------------
+    def _programar_refresco(self, plano: str):
+        """Marca el plano como pendiente; se pinta en el próximo cuadro de pantalla."""
+        self._planos_pendientes.add(plano)
+        if not self.timer_refresco.isActive():
+            self.timer_refresco.start()
+
+    def _refrescar_pendientes(self):
+        planos, self._planos_pendientes = self._planos_pendientes, set()
+        self.mostrar_cortes(planos)
+
+    def _volumen_ortogonal(self) -> VolumenOrtogonal:
+        """Envoltorio del volumen actual; las copias contiguas se arman en segundo plano."""
+        if self.orto is None or self.orto.vol is not self.volumen:
+            if self.orto is not None:
+                self.orto.liberar()
+            self.orto = VolumenOrtogonal(self.volumen)
+            self.orto.preparar_en_segundo_plano()
+        return self.orto
+
+    def _piramide(self) -> PiramideVolumen:
+        if self.piramide is None or self.piramide.base is not self.volumen:
+            piramide = self.piramide = PiramideVolumen(self.volumen)
+            piramide.construir_en_segundo_plano(lambda: self.piramide_lista.emit(piramide))
+        return self.piramide
+
+    def _mostrar_plano(self, visor: VisorCorte, eje: int, indice: int, aspecto: float):
+        """Pinta el corte con el nivel de pirámide que alcanza para la escala del visor;
+        el nivel 0 (resolución completa) sólo se usa cuando el zoom lo requiere."""
+        piramide = self._piramide()
+        k = piramide.nivel_para_escala(visor.escala())
+        if k > 0 and piramide.listo(k):
+            nivel = piramide.nivel(k)
+            factor = piramide.factor(k)
+            corte = np.take(nivel, min(indice // factor, nivel.shape[eje] - 1), axis=eje)
+            visor.mostrar(corte, aspecto, factor)
+        else:
+            visor.mostrar(self._volumen_ortogonal().corte(eje, indice), aspecto)
+
+    def _aspectos(self):
+        """Relación alto/ancho de píxel para coronal y sagital."""
+        z, y, x = self.volumen.shape
+        if self.metadatos:
+            dz, dy, dx = self.metadatos["espaciado"]
+            return dz / dx, dz / dy
+        # Sin geometría: se estira a la altura del corte axial, como antes
+        return y / z, y / z
+
+    def mostrar_cortes(self, planos=("axial", "coronal", "sagital")):
+        """Pinta los planos indicados con los índices actuales de los sliders."""
         if self.volumen is None:
             return
+        t0 = time.perf_counter()
+        asp_coronal, asp_sagital = self._aspectos()
 
-        vol = self.volumen
-        z, y, x = vol.shape
+        if "axial" in planos:
+            self._mostrar_plano(self.visor_axial, 0, self.indice_axial, 1.0)
+        if "coronal" in planos:
+            self._mostrar_plano(self.visor_coronal, 1, self.indice_coronal, asp_coronal)
+        if "sagital" in planos:
+            self._mostrar_plano(self.visor_sagital, 2, self.indice_sagital, asp_sagital)
+
+        self.tiempos_cuadro.append((time.perf_counter() - t0) * 1000)
+        media = sum(self.tiempos_cuadro) / len(self.tiempos_cuadro)
+        self.lbl_cuadro.setText(f"Tiempo por cuadro: {self.tiempos_cuadro[-1]:.2f} ms "
+                                f"(media {media:.2f} ms)")
 
-        # Usar los índices actuales de los sliders
-        img_axial   = vol[self.indice_axial, :, :]
-        img_coronal = vol[:, self.indice_coronal, :]
-        img_sagital = vol[:, :, self.indice_sagital]
-        
-        # Redimensionar para visualización uniforme
-        target_shape = (x, y)  # mismo orden que img_axial.shape: (y, x)
-        img_coronal = cv2.resize(img_coronal, target_shape, interpolation=cv2.INTER_AREA)
-        img_sagital = cv2.resize(img_sagital, target_shape, interpolation=cv2.INTER_AREA)
-
-        # mostrar imágenes
-        self.ax_axial.clear()
-        self.ax_axial.imshow(img_axial, cmap="gray")
-        self.ax_axial.set_title(f"Axial - Slice {self.indice_axial}")
-        self.ax_axial.axis("off")
-
-        self.ax_coronal.clear()
-        self.ax_coronal.imshow(img_coronal, cmap="gray")
-        self.ax_coronal.set_title(f"Coronal - Slice {self.indice_coronal}")
-        self.ax_coronal.axis("off")
-
-        self.ax_sagital.clear()
-        self.ax_sagital.imshow(img_sagital, cmap="gray")
-        self.ax_sagital.set_title(f"Sagital - Slice {self.indice_sagital}")
-        self.ax_sagital.axis("off")
-
-        self.canvas2d.draw_idle()
     # --------------------------- Reconstrucción 3D ----------------------------       
     def mostrar_3d(self):
         if self.volumen is None:
@@ -221,23 +464,86 @@ class VistaDICOM3D(QWidget):
             self.layout().addWidget(self.canvas3d)
         QTimer.singleShot(10, self._pintar_3d)
 
+    def _nivel_3d(self):
+        """(k, nivel, factor) de la pirámide para la vista 3D, o None si aún se está construyendo.
+
+        Nunca se calcula en el hilo de la GUI: pedir el nivel mientras lo arma el
+        hilo de la pirámide bloquearía la interfaz hasta que termine.
+        """
+        piramide = self._piramide()
+        k = piramide.nivel_para_voxeles(MAX_VOXELES)
+        if not piramide.listo(k):
+            return None
+        return k, piramide.nivel(k), piramide.factor(k)
+
     def _pintar_3d(self):
         if self.volumen is None:
             return
+        nivel = self._nivel_3d()
+        if nivel is None:
+            self._3d_pendiente = True   # se pinta desde _piramide_lista
+            self.lbl_estado.setText("Reconstrucción 3D: preparando niveles de la pirámide…")
+            return
 
         self.canvas3d.figure.clf()
         ax3d = self.canvas3d.figure.add_subplot(111, projection="3d")
 
-        # Umbral para descartar voxeles de fondo (aire)
-        umbral = 50
-        coords = np.column_stack(np.nonzero(self.volumen > umbral))
+        if self.cmb_modo_3d.currentIndex() == 0:
+            try:
+                x, y, z = self._pintar_superficie(ax3d, *nivel)
+            except Exception as exc:
+                QMessageBox.critical(self, "Reconstrucción 3D", str(exc))
+                return
+        else:
+            x, y, z = self._pintar_nube(ax3d, *nivel)
+
+        ax3d.set_xlabel("X")
+        ax3d.set_ylabel("Y")
+        ax3d.set_zlabel("Z")
+
+        #  proporcion de los ejes
+        ax3d.set_box_aspect([np.ptp(x), np.ptp(y), np.ptp(z)])
+
+        #  rotación inicial para una vista más clara
+        ax3d.view_init(elev=30, azim=120)
+
+        self.canvas3d.draw_idle()
+
+    def _pintar_superficie(self, ax3d, k, nivel, factor):
+        """Isosuperficie decimada al nivel elegido; la malla queda en caché por volumen/nivel."""
+        espaciado = self.metadatos["espaciado"] if self.metadatos else (1.0, 1.0, 1.0)
+        malla = extraer_superficie(nivel, self.sb_nivel_iso.value(), paso=1,
+                                   espaciado=[e * factor for e in espaciado])
+        triangulos = malla.verts[malla.caras]
+
+        # Sombreado Lambert simple con una luz fija
+        normales = np.cross(triangulos[:, 1] - triangulos[:, 0], triangulos[:, 2] - triangulos[:, 0])
+        normales /= np.linalg.norm(normales, axis=1, keepdims=True) + 1e-12
+        luz = np.array([0.4, -0.4, 0.8]) / np.linalg.norm([0.4, -0.4, 0.8])
+        brillo = 0.3 + 0.7 * np.abs(normales @ luz)
+        colores = np.column_stack([brillo * 0.95, brillo * 0.75, brillo * 0.6, np.ones_like(brillo)])
+
+        ax3d.add_collection3d(Poly3DCollection(triangulos, facecolors=colores,
+                                               edgecolors="none", linewidths=0))
+        x, y, z = malla.verts.T
+        ax3d.set_xlim(x.min(), x.max()); ax3d.set_ylim(y.min(), y.max()); ax3d.set_zlim(z.min(), z.max())
+        ax3d.set_title(f"Superficie nivel {self.sb_nivel_iso.value()} · "
+                       f"{malla.n_triangulos} triángulos · pirámide {k}")
+        self.lbl_estado.setText(f"Isosuperficie: {malla.n_triangulos} triángulos, "
+                                f"extraída en {malla.segundos * 1000:.0f} ms")
+        return x, y, z
+
+    def _pintar_nube(self, ax3d, k, nivel, factor):
+        # Umbral para descartar voxeles de fondo (aire), sobre el nivel grueso de la pirámide
+        umbral = self.sb_nivel_iso.value()
+        coords = np.column_stack(np.nonzero(nivel > umbral))
 
         if coords.shape[0] > 80_000:
-            idx = np.random.choice(coords.shape[0], 80_000, replace=False)
+            idx = np.random.default_rng(0).choice(coords.shape[0], 80_000, replace=False)
             coords = coords[idx]
 
-        z, y, x = coords.T
-        intensidades = self.volumen[z, y, x]
+        intensidades = nivel[tuple(coords.T)]
+        z, y, x = coords.T * factor          # coordenadas en vóxeles del volumen completo
         intens_norm = (intensidades - intensidades.min()) / (np.ptp(intensidades) + 1e-5)
 
         # Visualización 
@@ -248,43 +554,46 @@ class VistaDICOM3D(QWidget):
             alpha=0.25,
             s=0.7
         )
-
-        ax3d.set_title("Reconstrucción 3D")
-        ax3d.set_xlabel("X")
-        ax3d.set_ylabel("Y")
-        ax3d.set_zlabel("Z")
-
-        #  proporcion de los ejes
-        ax3d.set_box_aspect([np.ptp(x), np.ptp(y), np.ptp(z)])
-
-        #  rotación inicial para una vista más clara
-        ax3d.view_init(elev=30, azim=120)
-
-        self.canvas3d.draw_idle()
+        ax3d.set_title(f"Reconstrucción 3D · pirámide {k}")
+        return x, y, z
     # --------------------------- Conversión a NIfTI ----------------------------       
     def convertir_a_nifti(self):
         """Convierte el volumen DICOM cargado a formato NIfTI y lo guarda"""
         if self.volumen is None:
             QMessageBox.warning(self, "Sin volumen", "Carga primero un estudio DICOM.")
             return
+        if self.hilo_nifti is not None and self.hilo_nifti.isRunning():
+            return
 
-        try:
-            # Seleccionar ubicación para guardar el archivo NIfTI
-            archivo_salida, _ = QFileDialog.getSaveFileName(
-                self,
-                "Guardar como NIfTI",
-                "volumen_convertido.nii.gz",
-                "Archivos NIfTI (*.nii.gz *.nii)"
-            )
-
-            if not archivo_salida:
-                return
+        # Seleccionar ubicación para guardar el archivo NIfTI
+        archivo_salida, _ = QFileDialog.getSaveFileName(
+            self,
+            "Guardar como NIfTI",
+            "volumen_convertido.nii.gz",
+            "Archivos NIfTI (*.nii.gz *.nii)"
+        )
 
-            # Crear imagen NIfTI (transponer de (z, y, x) → (x, y, z))
-            volumen_nifti = np.transpose(self.volumen, (2, 1, 0))
-            img_nifti = nib.Nifti1Image(volumen_nifti, affine=np.eye(4))
-            nib.save(img_nifti, archivo_salida)
+        if not archivo_salida:
+            return
 
+        # El volumen se escribe corte a corte en un hilo aparte, con la afín real
+        self.btn_nifti.setEnabled(False)
+        self.lbl_estado.setText("Exportando NIfTI…")
+        self.hilo_nifti = HiloExportarNifti(self.volumen, archivo_salida, self.metadatos,
+                                            self.sb_compresion.value(), self)
+        self.hilo_nifti.progreso.connect(self._progreso_nifti)
+        self.hilo_nifti.terminado.connect(self._nifti_terminado)
+        self.hilo_nifti.fallo.connect(self._nifti_fallido)
+        self.hilo_nifti.finished.connect(lambda: self.btn_nifti.setEnabled(True))
+        self.hilo_nifti.start()
+
+    def _progreso_nifti(self, hechos, total):
+        self.barra_progreso.setRange(0, total)
+        self.barra_progreso.setValue(hechos)
+
+    def _nifti_terminado(self, archivo_salida, segundos):
+        self.lbl_estado.setText(f"NIfTI exportado en {segundos:.2f} s")
+        try:
             # Registrar en base de datos si ruta DICOM disponible
             if hasattr(self, "ruta_dicom"):
                 self.controlador.registrar_paciente_dicom(self.ruta_dicom, archivo_salida)
@@ -301,3 +610,7 @@ class VistaDICOM3D(QWidget):
         except Exception as exc:
             QMessageBox.critical(self, "Error en conversión", f"Error al convertir a NIfTI:\n{str(exc)}")
             import traceback; traceback.print_exc()
+
+    def _nifti_fallido(self, mensaje):
+        self.lbl_estado.setText("Error en la exportación")
+        QMessageBox.critical(self, "Error en conversión", f"Error al convertir a NIfTI:\n{mensaje}")
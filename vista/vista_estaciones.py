@@ -0,0 +1,158 @@
+# ====================== V I S T A   E S T A C I O N E S ==============================
+import os, time
+
+from PyQt5.QtCore import Qt, QThread, pyqtSignal
+from PyQt5.QtWidgets import (QWidget, QLabel, QPushButton, QFileDialog, QVBoxLayout, QHBoxLayout,
+                             QMessageBox, QComboBox, QListWidget, QListWidgetItem, QSpinBox,
+                             QCheckBox)
+from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as Canvas
+from matplotlib.figure import Figure
+
+from modelo.estaciones import (ESTADISTICOS, FRECUENCIAS, NOMBRES_VARIABLES, VARIABLES,
+                               AlmacenEstaciones, agregacion_por_defecto)
+
+DIR_DATOS = os.path.join(os.path.dirname(__file__), "..", "datos")
+
+
+class HiloCargaEstaciones(QThread):
+    """Lee todos los CSV de estaciones de una carpeta fuera del hilo de la GUI."""
+    terminado = pyqtSignal(object, float)   # AlmacenEstaciones, segundos
+    fallo = pyqtSignal(str)
+
+    def __init__(self, carpeta: str, parent=None):
+        super().__init__(parent)
+        self.carpeta = carpeta
+
+    def run(self):
+        t0 = time.perf_counter()
+        try:
+            almacen = AlmacenEstaciones.desde_carpeta(self.carpeta)
+            self.terminado.emit(almacen, time.perf_counter() - t0)
+        except Exception as exc:
+            import traceback; traceback.print_exc()
+            self.fallo.emit(str(exc))
+
+
+class VistaEstaciones(QWidget):
+    """Compara una variable entre estaciones, agregada por hora, día o mes."""
+    def __init__(self, controlador):
+        super().__init__()
+        from estilos import APP_STYLESHEET
+        self.setStyleSheet(APP_STYLESHEET)
+        self.controlador = controlador
+        self.setWindowTitle("Comparación de estaciones")
+        self.almacen = None
+        self.hilo_carga = None
+        self._build_ui()
+        if os.path.isdir(DIR_DATOS):
+            self.cargar_carpeta(DIR_DATOS)
+
+    def _build_ui(self):
+        v = QVBoxLayout(self)
+
+        h_top = QHBoxLayout()
+        btn_cargar = QPushButton("Cargar carpeta de estaciones")
+        btn_cargar.clicked.connect(self.elegir_carpeta)
+        self.lbl_estado = QLabel("")
+        h_top.addWidget(btn_cargar); h_top.addWidget(self.lbl_estado, 1)
+        v.addLayout(h_top)
+
+        h = QHBoxLayout()
+        self.lst_estaciones = QListWidget(); self.lst_estaciones.setMaximumWidth(160)
+        h.addWidget(self.lst_estaciones)
+
+        controles = QVBoxLayout()
+        self.cmb_variable = QComboBox()
+        for var in VARIABLES:
+            self.cmb_variable.addItem(NOMBRES_VARIABLES[var], var)
+        self.cmb_variable.currentIndexChanged.connect(self._variable_cambiada)
+        self.cmb_frecuencia = QComboBox(); self.cmb_frecuencia.addItems(list(FRECUENCIAS))
+        self.cmb_frecuencia.setCurrentText("Día")
+        self.cmb_estadistico = QComboBox(); self.cmb_estadistico.addItems(list(ESTADISTICOS))
+        self.sb_ventana = QSpinBox(); self.sb_ventana.setRange(0, 365)
+        self.sb_ventana.setPrefix("Media móvil: "); self.sb_ventana.setSuffix(" períodos")
+        self.chk_calidad = QCheckBox("Sólo mediciones con calidad válida"); self.chk_calidad.setChecked(True)
+        btn_comparar = QPushButton("Comparar"); btn_comparar.clicked.connect(self.comparar)
+        for etiqueta, w in (("Variable:", self.cmb_variable), ("Agregar por:", self.cmb_frecuencia),
+                            ("Estadístico:", self.cmb_estadistico)):
+            controles.addWidget(QLabel(etiqueta)); controles.addWidget(w)
+        controles.addWidget(self.sb_ventana)
+        controles.addWidget(self.chk_calidad)
+        controles.addWidget(btn_comparar)
+        controles.addStretch(1)
+        h.addLayout(controles)
+
+        self.fig = Figure(figsize=(8, 5)); self.canvas = Canvas(self.fig)
+        h.addWidget(self.canvas, 1)
+        v.addLayout(h)
+        self._variable_cambiada()
+
+    # ------------------------------------------------------------------
+    def elegir_carpeta(self):
+        carpeta = QFileDialog.getExistingDirectory(self, "Carpeta con CSV de estaciones", DIR_DATOS)
+        if carpeta:
+            self.cargar_carpeta(carpeta)
+
+    def cargar_carpeta(self, carpeta: str):
+        if self.hilo_carga is not None and self.hilo_carga.isRunning():
+            return
+        self.lbl_estado.setText("Cargando estaciones…")
+        self.hilo_carga = HiloCargaEstaciones(carpeta, self)
+        self.hilo_carga.terminado.connect(self._carga_terminada)
+        self.hilo_carga.fallo.connect(lambda msg: QMessageBox.critical(self, "Error", msg))
+        self.hilo_carga.start()
+
+    def _carga_terminada(self, almacen, segundos):
+        self.almacen = almacen
+        self.lst_estaciones.clear()
+        for codigo in almacen.codigos:
+            item = QListWidgetItem(f"Estación {codigo}")
+            item.setData(Qt.UserRole, codigo)
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            item.setCheckState(Qt.Checked)
+            self.lst_estaciones.addItem(item)
+        self.lbl_estado.setText(f"{len(almacen.codigos)} estaciones · {len(almacen)} registros · "
+                                f"{segundos:.2f} s")
+
+    def _variable_cambiada(self, *args):
+        """Propone el estadístico habitual (suma para precipitación, media para el resto)."""
+        por_defecto = agregacion_por_defecto(self.cmb_variable.currentData())
+        self.cmb_estadistico.setCurrentText(
+            next(k for k, v in ESTADISTICOS.items() if v == por_defecto))
+
+    def estaciones_elegidas(self):
+        return [self.lst_estaciones.item(i).data(Qt.UserRole)
+                for i in range(self.lst_estaciones.count())
+                if self.lst_estaciones.item(i).checkState() == Qt.Checked]
+
+    def comparar(self):
+        if self.almacen is None:
+            QMessageBox.warning(self, "Estaciones", "Carga una carpeta de estaciones primero")
+            return
+        codigos = self.estaciones_elegidas()
+        if not codigos:
+            QMessageBox.warning(self, "Estaciones", "Marca al menos una estación")
+            return
+        variable = self.cmb_variable.currentData()
+        almacen = self.almacen.seleccionar(codigos)
+        if self.chk_calidad.isChecked():
+            almacen = almacen.filtrar_calidad()
+        tabla = almacen.comparar(variable, FRECUENCIAS[self.cmb_frecuencia.currentText()],
+                                 ESTADISTICOS[self.cmb_estadistico.currentText()],
+                                 self.sb_ventana.value())
+
+        self.fig.clf(); ax = self.fig.add_subplot(111)
+        for codigo in tabla.columns:
+            ax.plot(tabla.index, tabla[codigo].to_numpy(), label=f"Estación {codigo}", linewidth=1.2)
+        ax.set_xlabel("Fecha"); ax.set_ylabel(NOMBRES_VARIABLES[variable])
+        ax.set_title(f"{self.cmb_estadistico.currentText()} {self.cmb_frecuencia.currentText().lower()} "
+                     f"de {NOMBRES_VARIABLES[variable]}")
+        ax.grid(True, linestyle="--", alpha=0.3)
+        ax.legend(loc="upper right", fontsize=8)
+        self.fig.autofmt_xdate()
+        self.canvas.draw()
+
+    def closeEvent(self, event):
+        if self.hilo_carga is not None:
+            self.hilo_carga.wait()
+        super().closeEvent(event)
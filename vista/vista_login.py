@@ -1,13 +1,37 @@
 from PyQt5.QtWidgets import QWidget, QLabel, QLineEdit, QPushButton, QVBoxLayout, QMessageBox
 from PyQt5.QtGui import QPixmap
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QThread, pyqtSignal
 import os
+
+class HiloLogin(QThread):
+    """Verifica la contraseña (scrypt) fuera del hilo de la GUI."""
+    terminado = pyqtSignal(object)      # {"usuario", "rol"} o None
+    fallo = pyqtSignal(str)
+
+    def __init__(self, verificar, usuario, contrasena, liberar=None, parent=None):
+        super().__init__(parent)
+        self.verificar = verificar
+        self.liberar = liberar          # cierra la conexión que el pool abrió en este hilo
+        self.usuario = usuario
+        self.contrasena = contrasena
+
+    def run(self):
+        try:
+            self.terminado.emit(self.verificar(self.usuario, self.contrasena))
+        except Exception as exc:
+            import traceback; traceback.print_exc()
+            self.fallo.emit(str(exc))
+        finally:
+            if self.liberar:
+                self.liberar()
+
 class VistaLogin(QWidget):
     def __init__(self, controlador):
         super().__init__()
         from estilos import APP_STYLESHEET  
         self.setStyleSheet(APP_STYLESHEET)
         self.controlador = controlador
+        self.hilo_login = None
         self.setWindowTitle("Ingreso al Sistema")
         self._construir_ui()
 
@@ -30,6 +54,7 @@ class VistaLogin(QWidget):
         self.txt_pass.setEchoMode(QLineEdit.Password)
         self.btn_login = QPushButton("Ingresar")
         self.btn_login.clicked.connect(self._login)
+        self.txt_pass.returnPressed.connect(self._login)
         self.btn_registro = QPushButton("Registrarse")
         self.btn_registro.clicked.connect(self.controlador.mostrar_registro)
         layout.addWidget(self.lbl_user)
@@ -46,7 +71,34 @@ class VistaLogin(QWidget):
         if not usuario or not contrasena:
             QMessageBox.warning(self, "Datos faltantes", "Completa usuario y contraseña")
             return
-        self.controlador.login(usuario, contrasena)
+        if self.hilo_login is not None:
+            return                      # ya hay una verificación en curso
+        self.btn_login.setEnabled(False)
+        self.btn_login.setText("Verificando…")
+        modelo = self.controlador.modelo_usuarios
+        self.hilo_login = HiloLogin(modelo.verificar_usuario, usuario, contrasena,
+                                    liberar=modelo.liberar_conexion, parent=self)
+        self.hilo_login.terminado.connect(self._login_terminado)
+        self.hilo_login.fallo.connect(self.mostrar_error)
+        self.hilo_login.finished.connect(self._fin_login)
+        self.hilo_login.start()
+
+    def _login_terminado(self, usuario):
+        if usuario:
+            self.controlador.iniciar_sesion(usuario)
+        else:
+            self.txt_pass.clear()
+            self.mostrar_error("Usuario o contraseña incorrectos")
+
+    def _fin_login(self):
+        self.hilo_login = None
+        self.btn_login.setEnabled(True)
+        self.btn_login.setText("Ingresar")
+
+    def closeEvent(self, event):
+        if self.hilo_login is not None:
+            self.hilo_login.wait()
+        super().closeEvent(event)
 
     def mostrar_error(self, msg):
         QMessageBox.critical(self, "Error", msg)
\ No newline at end of file
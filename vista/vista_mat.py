@@ -1,13 +1,107 @@
+from PyQt5.QtCore import QThread, QTimer, pyqtSignal
 from PyQt5.QtWidgets import (
     QWidget, QLabel, QPushButton, QFileDialog, QVBoxLayout, QHBoxLayout,
-    QSpinBox, QDoubleSpinBox, QMessageBox, QComboBox
+    QSpinBox, QDoubleSpinBox, QMessageBox, QComboBox, QCheckBox
 )
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as Canvas
 from matplotlib.figure import Figure
 import numpy as np
 from modelo.clases_señales import ArchivoMAT
+from modelo.lector_mat import VariableHDF5
+from modelo.analisis_epocas import analizar_epocas
+from modelo.errores import CargaCancelada
+from modelo.espectral import BANDAS, NPERSEG
+from modelo.filtros import ConfigFiltro
+from modelo.eventos import TIPOS
+from vista.graficos_lod import LineasLOD
+from vista.registrador_continuo import RegistradorContinuo
 import os
 
+NOTCH = {"Sin notch": None, "Notch 50 Hz": 50.0, "Notch 60 Hz": 60.0}
+REFERENCIA = {"Referencia original": "original", "Promedio común": "promedio"}
+METRICAS_EPOCA = {"Media": "media", "Varianza": "varianza", "RMS": "rms", "Pico a pico": "pico_pico"}
+COLORES_EVENTO = ("#e6a100", "#d62728", "#9400d3", "#555555")   # en el orden de TIPOS
+
+
+class HiloAnalisisEpocas(QThread):
+    """Recorre todas las épocas por bloques fuera del hilo de la GUI."""
+    progreso = pyqtSignal(int, int)
+    terminado = pyqtSignal(object)     # EstadisticasEpocas
+    fallo = pyqtSignal(str)
+
+    def __init__(self, senal, canales: slice, parent=None):
+        super().__init__(parent)
+        self.senal = senal
+        self.canales = canales
+        self._cancelar = False
+
+    def cancelar(self):
+        self._cancelar = True
+
+    def run(self):
+        try:
+            res = analizar_epocas(self.senal, self.canales, progreso=self.progreso.emit,
+                                  cancelar=lambda: self._cancelar)
+            self.terminado.emit(res)
+        except CargaCancelada:
+            pass
+        except Exception as exc:
+            import traceback; traceback.print_exc()
+            self.fallo.emit(str(exc))
+
+
+class HiloEspectral(QThread):
+    """PSD, espectrograma y bandas de un rango de canales (ArchivoMAT.analizar_espectro)."""
+    terminado = pyqtSignal(object)     # ResultadoEspectral
+    fallo = pyqtSignal(str)
+
+    def __init__(self, mat_obj, ch_ini: int, ch_fin: int, epoca: int, nperseg: int, parent=None):
+        super().__init__(parent)
+        self.mat_obj = mat_obj
+        self.args = (ch_ini, ch_fin, epoca)
+        self.nperseg = nperseg
+        self._cancelar = False
+
+    def cancelar(self):
+        self._cancelar = True
+
+    def run(self):
+        try:
+            self.terminado.emit(self.mat_obj.analizar_espectro(*self.args, nperseg=self.nperseg,
+                                                               cancelar=lambda: self._cancelar))
+        except CargaCancelada:
+            pass
+        except Exception as exc:
+            import traceback; traceback.print_exc()
+            self.fallo.emit(str(exc))
+
+
+class HiloDeteccion(QThread):
+    """Detecta eventos en todas las épocas de un rango de canales (ArchivoMAT.detectar_eventos)."""
+    progreso = pyqtSignal(int, int)
+    terminado = pyqtSignal(object)     # IndiceEventos
+    fallo = pyqtSignal(str)
+
+    def __init__(self, mat_obj, ch_ini: int, ch_fin: int, parent=None):
+        super().__init__(parent)
+        self.mat_obj = mat_obj
+        self.args = (ch_ini, ch_fin)
+        self._cancelar = False
+
+    def cancelar(self):
+        self._cancelar = True
+
+    def run(self):
+        try:
+            self.terminado.emit(self.mat_obj.detectar_eventos(*self.args, progreso=self.progreso.emit,
+                                                              cancelar=lambda: self._cancelar))
+        except CargaCancelada:
+            pass
+        except Exception as exc:
+            import traceback; traceback.print_exc()
+            self.fallo.emit(str(exc))
+
+
 class VistaMAT(QWidget):
     """Carga .mat, muestra llaves, plotea canales/intervalos y calcula promedios."""
     def __init__(self, controlador):
@@ -17,6 +111,15 @@ class VistaMAT(QWidget):
         self.controlador = controlador
         self.setWindowTitle("Exploración de Señales MAT")
         self.mat_obj = None
+        self.hilo_analisis = None
+        self.hilo_espectral = None
+        self.hilo_deteccion = None
+        self.eventos = None            # IndiceEventos de la última detección
+        self._marcas = None            # marcadores de eventos sobre el intervalo
+        self._ultimo_evento = None     # (posición, época, t_ini, t_fin) al navegar eventos
+        self._espectro = None          # último ResultadoEspectral mostrado
+        self._lineas_lod = None
+        self.registrador = None        # modo registro continuo
         self._build_ui()
 
     def _build_ui(self):
@@ -36,7 +139,8 @@ class VistaMAT(QWidget):
         self.sb_ch_fin = QSpinBox(); self.sb_ch_fin.setPrefix("Canal fin: "); self.sb_ch_fin.setRange(0, 500)
         self.sb_t_ini = QDoubleSpinBox(); self.sb_t_ini.setPrefix("t_ini: "); self.sb_t_ini.setDecimals(2); self.sb_t_ini.setRange(0, 1000)
         self.sb_t_fin = QDoubleSpinBox(); self.sb_t_fin.setPrefix("t_fin: "); self.sb_t_fin.setDecimals(2); self.sb_t_fin.setRange(0, 1000)
-        for w in (self.sb_ch_ini, self.sb_ch_fin, self.sb_t_ini, self.sb_t_fin):
+        self.sb_epoca = QSpinBox(); self.sb_epoca.setPrefix("Época: "); self.sb_epoca.setRange(0, 0)
+        for w in (self.sb_ch_ini, self.sb_ch_fin, self.sb_t_ini, self.sb_t_fin, self.sb_epoca):
             h_int.addWidget(w)
         v.addLayout(h_int)
 
@@ -48,6 +152,97 @@ class VistaMAT(QWidget):
         btn_prom.clicked.connect(self.promedio_eje1)
         h_btn.addWidget(btn_plot); h_btn.addWidget(btn_prom)
         v.addLayout(h_btn)
+
+        # ----- Filtros (se aplican a la ventana al graficar y en vivo al mover t_ini/t_fin)
+        h_fil = QHBoxLayout()
+        self.chk_filtro = QCheckBox("Filtrar")
+        self.sb_f_baja = QDoubleSpinBox(); self.sb_f_baja.setPrefix("Pasa banda: "); self.sb_f_baja.setSuffix(" Hz")
+        self.sb_f_baja.setDecimals(1); self.sb_f_baja.setRange(0, 10000); self.sb_f_baja.setValue(1)
+        self.sb_f_alta = QDoubleSpinBox(); self.sb_f_alta.setPrefix("– "); self.sb_f_alta.setSuffix(" Hz")
+        self.sb_f_alta.setDecimals(1); self.sb_f_alta.setRange(0, 10000); self.sb_f_alta.setValue(40)
+        self.sb_f_baja.setToolTip("0 = sin pasa altos"); self.sb_f_alta.setToolTip("0 = sin pasa bajos")
+        self.cmb_notch = QComboBox(); self.cmb_notch.addItems(list(NOTCH))
+        self.chk_tendencia = QCheckBox("Quitar tendencia")
+        self.cmb_referencia = QComboBox(); self.cmb_referencia.addItems(list(REFERENCIA))
+        self.chk_vivo = QCheckBox("Actualizar en vivo"); self.chk_vivo.setChecked(True)
+        for w in (self.chk_filtro, self.sb_f_baja, self.sb_f_alta, self.cmb_notch, self.chk_tendencia,
+                  self.cmb_referencia, self.chk_vivo):
+            h_fil.addWidget(w)
+        v.addLayout(h_fil)
+
+        self._timer_intervalo = QTimer(self)
+        self._timer_intervalo.setSingleShot(True); self._timer_intervalo.setInterval(30)
+        self._timer_intervalo.timeout.connect(self._actualizar_intervalo)
+        for sb in (self.sb_t_ini, self.sb_t_fin, self.sb_f_baja, self.sb_f_alta):
+            sb.valueChanged.connect(self._programar_intervalo)
+        for chk in (self.chk_filtro, self.chk_tendencia):
+            chk.toggled.connect(self._programar_intervalo)
+        for cmb in (self.cmb_notch, self.cmb_referencia):
+            cmb.currentIndexChanged.connect(self._programar_intervalo)
+
+        # ----- Análisis de todas las épocas
+        h_ep = QHBoxLayout()
+        self.cmb_metrica = QComboBox(); self.cmb_metrica.addItems(list(METRICAS_EPOCA))
+        self.btn_epocas = QPushButton("Analizar todas las épocas (ERP)")
+        self.btn_epocas.clicked.connect(self.analizar_epocas)
+        self.lbl_estado = QLabel("")
+        h_ep.addWidget(QLabel("Métrica:")); h_ep.addWidget(self.cmb_metrica)
+        h_ep.addWidget(self.btn_epocas); h_ep.addWidget(self.lbl_estado, 1)
+        v.addLayout(h_ep)
+
+        # ----- Análisis espectral (lo de "Mostrar" sólo redibuja el último resultado)
+        h_esp = QHBoxLayout()
+        self.sb_fs = QDoubleSpinBox(); self.sb_fs.setPrefix("fs: "); self.sb_fs.setSuffix(" Hz")
+        self.sb_fs.setDecimals(1); self.sb_fs.setRange(0.1, 100000); self.sb_fs.setValue(100)
+        self.sb_fs.valueChanged.connect(self._cambiar_fs)
+        self.sb_nperseg = QSpinBox(); self.sb_nperseg.setPrefix("Ventana: "); self.sb_nperseg.setRange(16, 65536)
+        self.sb_nperseg.setValue(NPERSEG)
+        self.btn_espectro = QPushButton("Calcular espectro")
+        self.btn_espectro.clicked.connect(self.calcular_espectro)
+        self.cmb_vista_esp = QComboBox(); self.cmb_vista_esp.addItems(["PSD", "Espectrograma", "Potencia por bandas"])
+        self.sb_canal_esp = QSpinBox(); self.sb_canal_esp.setPrefix("Canal: ")
+        self.sb_fmax = QDoubleSpinBox(); self.sb_fmax.setPrefix("f máx: "); self.sb_fmax.setSuffix(" Hz")
+        self.sb_fmax.setRange(1, 50000); self.sb_fmax.setValue(50)
+        for w in (self.cmb_vista_esp, self.sb_canal_esp, self.sb_fmax):
+            (w.currentIndexChanged if isinstance(w, QComboBox) else w.valueChanged).connect(self._dibujar_espectro)
+        for w in (self.sb_fs, self.sb_nperseg, self.btn_espectro):
+            h_esp.addWidget(w)
+        h_esp.addWidget(QLabel("Mostrar:"))
+        for w in (self.cmb_vista_esp, self.sb_canal_esp, self.sb_fmax):
+            h_esp.addWidget(w)
+        v.addLayout(h_esp)
+
+        # ----- Eventos (detección en todas las épocas, navegación y exportación)
+        h_evt = QHBoxLayout()
+        self.btn_detectar = QPushButton("Detectar eventos")
+        self.btn_detectar.clicked.connect(self.detectar_eventos)
+        self.cmb_tipo_evento = QComboBox(); self.cmb_tipo_evento.addItems(["Todos"] + list(TIPOS))
+        self.cmb_tipo_evento.currentIndexChanged.connect(self._programar_intervalo)
+        btn_ev_ant = QPushButton("◀ Anterior"); btn_ev_ant.clicked.connect(lambda: self.ir_a_evento(-1))
+        btn_ev_sig = QPushButton("Siguiente ▶"); btn_ev_sig.clicked.connect(lambda: self.ir_a_evento(1))
+        self.btn_exportar_eventos = QPushButton("Exportar CSV")
+        self.btn_exportar_eventos.clicked.connect(self.exportar_eventos)
+        self.lbl_eventos = QLabel("")
+        for w in (self.btn_detectar, self.cmb_tipo_evento, btn_ev_ant, btn_ev_sig, self.btn_exportar_eventos):
+            h_evt.addWidget(w)
+        h_evt.addWidget(self.lbl_eventos, 1)
+        v.addLayout(h_evt)
+
+        # ----- Registro continuo (reproduce los canales elegidos desde t_ini)
+        h_reg = QHBoxLayout()
+        self.btn_registro = QPushButton("▶ Registro continuo")
+        self.btn_registro.clicked.connect(self.alternar_registro)
+        self.sb_velocidad = QDoubleSpinBox(); self.sb_velocidad.setPrefix("Velocidad: x")
+        self.sb_velocidad.setDecimals(2); self.sb_velocidad.setRange(0.1, 50); self.sb_velocidad.setValue(1)
+        self.sb_velocidad.valueChanged.connect(self._cambiar_velocidad)
+        self.sb_ventana = QDoubleSpinBox(); self.sb_ventana.setPrefix("Ventana: "); self.sb_ventana.setSuffix(" s")
+        self.sb_ventana.setDecimals(1); self.sb_ventana.setRange(0.5, 600); self.sb_ventana.setValue(10)
+        self.lbl_registro = QLabel("")
+        for w in (self.btn_registro, self.sb_velocidad, self.sb_ventana):
+            h_reg.addWidget(w)
+        h_reg.addWidget(self.lbl_registro, 1)
+        v.addLayout(h_reg)
+
         # ----- Canvas matplotlib
         self.fig = Figure(figsize=(8, 6)); self.canvas = Canvas(self.fig)
         v.addWidget(self.canvas)
@@ -59,8 +254,22 @@ class VistaMAT(QWidget):
             return
         try:
             nombre = os.path.splitext(os.path.basename(ruta))[0]
+            self._detener_registro()        # su timer lee del archivo que se va a cerrar
+            self._cancelar_hilos()          # y los hilos también
+            if self.mat_obj:
+                self.mat_obj.cerrar()
+            # Sólo se leen los encabezados; las variables se cargan al usarlas
             self.mat_obj = ArchivoMAT(nombre, ruta)
             self.cmb_keys.clear(); self.cmb_keys.addItems(list(self.mat_obj.data.keys()))
+            self.cmb_keys.setCurrentText(self.mat_obj.llave)
+            self.sb_epoca.setRange(0, self.mat_obj.n_epocas - 1)
+            self._espectro = None
+            self.eventos = None
+            self.lbl_eventos.setText("")
+            self.lbl_estado.setText("")
+            self.sb_fs.blockSignals(True); self.sb_fs.setValue(self.mat_obj.fs); self.sb_fs.blockSignals(False)
+            self.sb_fs.setToolTip("Leída del archivo" if self.mat_obj.fs_en_archivo
+                                  else "El archivo no la trae: valor por defecto, ajústala")
             QMessageBox.information(self, "Cargado", "Archivo cargado; selecciona la llave con array")
         except Exception as e:
             QMessageBox.critical(self, "Error", str(e))
@@ -71,7 +280,7 @@ class VistaMAT(QWidget):
             QMessageBox.warning(self, "Llave", "Selecciona una llave")
             return None
         arr = self.mat_obj.data.get(key)
-        if not isinstance(arr, np.ndarray):
+        if not isinstance(arr, (np.ndarray, VariableHDF5)):
             QMessageBox.warning(self, "No es arreglo", "La llave seleccionada no contiene un array. Intenta otra.")
             return None
         return arr
@@ -95,21 +304,39 @@ class VistaMAT(QWidget):
             QMessageBox.warning(self, "Tiempo", "Intervalo de tiempo inválido")
             return
 
-        # Graficar
-        self.fig.clf(); ax = self.fig.add_subplot(111)
-        t = np.arange(idx_ini, idx_fin)/fs
-        for ch in range(ch_ini, ch_fin+1):
-            ax.plot(t, arr[ch, idx_ini:idx_fin], label=f"Canal {ch}")
-        ax.set_xlabel("Tiempo (s)"); ax.set_ylabel("Amplitud")
-        ax.set_title(f"Señales {ch_ini}-{ch_fin} | {t_ini}-{t_fin}s | llave '{self.cmb_keys.currentText()}'")
-        ax.legend(); self.canvas.draw()
-        
         try:
-            t, datos = self.mat_obj.extraer_intervalo(ch_ini, ch_fin, t_ini, t_fin)
+            self._dibujar_intervalo(ch_ini, ch_fin, t_ini, t_fin)
         except ValueError as e:
             QMessageBox.warning(self, "Error", str(e))
+
+    def _config_filtro(self):
+        if not self.chk_filtro.isChecked():
+            return None
+        return ConfigFiltro(f_baja=self.sb_f_baja.value(), f_alta=self.sb_f_alta.value(),
+                            notch=NOTCH[self.cmb_notch.currentText()],
+                            quitar_tendencia=self.chk_tendencia.isChecked(),
+                            referencia=REFERENCIA[self.cmb_referencia.currentText()])
+
+    def _dibujar_intervalo(self, ch_ini, ch_fin, t_ini, t_fin):
+        t, datos = self.mat_obj.extraer_intervalo(ch_ini, ch_fin, t_ini, t_fin,
+                                                  epoca=self.sb_epoca.value(),
+                                                  filtro=self._config_filtro())
+        titulo = (f"Canales {ch_ini}-{ch_fin} | {t_ini}–{t_fin}s | época {self.sb_epoca.value()}"
+                  + (" | filtrada" if self.chk_filtro.isChecked() else ""))
+
+        lod = self._lineas_lod
+        if (self._espectro is None and lod is not None and lod.ax in self.fig.axes
+                and len(self.fig.axes) == 1 and len(lod.lineas) == datos.shape[0]
+                and lod.lineas[0].get_label() == f"Canal {ch_ini}"):
+            # Mismos canales en pantalla: se reutilizan ejes y líneas (lo más rápido al editar t)
+            lod.cambiar_datos(t, datos)
+            lod.ax.set_title(titulo, fontsize=11)
+            self._marcar_eventos(lod.ax, t, datos, ch_ini, ch_fin)
+            self.canvas.draw_idle()
             return
 
+        self._espectro = None
+        self._detener_registro()
         self.fig.clf()
         ax = self.fig.add_subplot(111)
         ax.set_facecolor('white')
@@ -117,16 +344,49 @@ class VistaMAT(QWidget):
 
         colores = ['blue', 'green', 'orange', 'purple', 'red', 'cyan', 'magenta', 'black']
 
-        for i in range(datos.shape[0]):
-            color = colores[i % len(colores)]
-            ax.plot(t, datos[i], label=f"Canal {ch_ini + i}", linewidth=1.8, color=color)
+        # Envolvente min/max del rango visible; se recalcula al hacer zoom o desplazar
+        self._lineas_lod = LineasLOD(ax, t, datos, colores=colores, linewidth=1.8,
+                                     etiquetas=[f"Canal {ch_ini + i}" for i in range(datos.shape[0])])
 
         ax.set_xlabel("Tiempo (s)", fontsize=10)
         ax.set_ylabel("Amplitud", fontsize=10)
-        ax.set_title(f"Canales {ch_ini}-{ch_fin} | {t_ini}–{t_fin}s", fontsize=11)
+        ax.set_title(titulo, fontsize=11)
         ax.legend(loc="upper right", fontsize=8)
+        self._marcas = None
+        self._marcar_eventos(ax, t, datos, ch_ini, ch_fin)
         self.fig.tight_layout()
         self.canvas.draw()
+
+    def _marcar_eventos(self, ax, t, datos, ch_ini, ch_fin):
+        """Marca sobre la señal mostrada los eventos de la ventana (búsqueda binaria en el índice)."""
+        if self._marcas is not None and self._marcas.axes is not None:
+            self._marcas.remove()
+        self._marcas = None
+        if self.eventos is None:
+            return
+        fs = self.mat_obj.fs
+        ev = self.eventos.en_ventana(self.sb_epoca.value(), t[0], t[-1] + 1 / fs,
+                                     canales=(ch_ini, ch_fin), tipo=self._tipo_evento())
+        if not len(ev):
+            return
+        j = np.clip(ev["muestra"] - int(round(t[0] * fs)), 0, len(t) - 1)
+        self._marcas = ax.scatter(t[j], datos[ev["canal"] - ch_ini, j], marker="v", s=28, zorder=3,
+                                  c=np.asarray(COLORES_EVENTO)[ev["tipo"]])
+
+    def _programar_intervalo(self, *_):
+        if self.chk_vivo.isChecked():
+            self._timer_intervalo.start()   # agrupa cambios seguidos de los spinbox
+
+    def _actualizar_intervalo(self):
+        """Redibuja la ventana (filtrada si corresponde) sin avisos: se llama mientras se edita."""
+        if not self.mat_obj:
+            return
+        try:
+            self._dibujar_intervalo(self.sb_ch_ini.value(), self.sb_ch_fin.value(),
+                                    self.sb_t_ini.value(), self.sb_t_fin.value())
+        except ValueError as e:
+            self.lbl_estado.setText(str(e))
+
     def promedio_eje1(self):
         """Calcula promedio a lo largo del eje 1 y lo muestra como gráfico tipo stem."""
         if not self.mat_obj:
@@ -137,21 +397,20 @@ class VistaMAT(QWidget):
         if arr is None:
             return
 
-        # Convertir a 2D si es 3D tomando una época
-        if arr.ndim == 3:
-            arr = arr[:, :, 0]
-
-        if arr.ndim != 2:
-            QMessageBox.warning(self, "Dimensión", "La matriz debe ser 2D para este promedio")
+        if arr.ndim not in (2, 3):
+            QMessageBox.warning(self, "Dimensión", "La matriz debe ser 2D o 3D para este promedio")
             return
 
-        if arr.shape[0] <= arr.shape[1]:
-            prom = np.mean(arr, axis=1)
-            x = np.arange(arr.shape[0])
-        else:
-            prom = np.mean(arr, axis=0)
-            x = np.arange(arr.shape[1])
+        if arr.ndim == 3 or arr.shape[0] <= arr.shape[1]:
+            # Media por canal sobre todas las muestras (y épocas), por bloques y fuera de la GUI
+            self._lanzar_analisis(arr, slice(None), "promedio")
+            return
+        arr = np.asarray(arr)
+        self._dibujar_promedio(np.arange(arr.shape[1]), np.mean(arr, axis=0), arr.shape)
 
+    def _dibujar_promedio(self, x, prom, forma):
+        self._espectro = None
+        self._detener_registro()
         self.fig.clf()
         ax = self.fig.add_subplot(111)
         ax.stem(x, prom, basefmt=" ")
@@ -164,4 +423,318 @@ class VistaMAT(QWidget):
 
         QMessageBox.information(self, "Promedio", "Promedio eje 1 calculado y graficado.")
 
-        print("Forma de la matriz seleccionada:", arr.shape)
\ No newline at end of file
+        print("Forma de la matriz seleccionada:", forma)
+
+    def analizar_epocas(self):
+        """Estadísticos por canal y época y ERP de los canales elegidos, en segundo plano."""
+        if not self.mat_obj:
+            QMessageBox.warning(self, "Archivo", "Carga un .mat primero")
+            return
+        ch_ini, ch_fin = self.sb_ch_ini.value(), self.sb_ch_fin.value()
+        if ch_ini > ch_fin or ch_fin >= self.mat_obj.senal.shape[0]:
+            QMessageBox.warning(self, "Canales", "Rango de canales inválido")
+            return
+        self._canales_analisis = (ch_ini, ch_fin)
+        self._lanzar_analisis(self.mat_obj.senal, slice(ch_ini, ch_fin + 1), "epocas")
+
+    def _lanzar_analisis(self, senal, canales: slice, destino: str):
+        """Corre analizar_epocas en HiloAnalisisEpocas; `destino` elige cómo se muestra."""
+        if self.hilo_analisis is not None:
+            return
+        self._destino_analisis = destino
+        self._forma_analisis = tuple(senal.shape)
+        self.btn_epocas.setEnabled(False)
+        self.hilo_analisis = HiloAnalisisEpocas(senal, canales, self)
+        self.hilo_analisis.progreso.connect(
+            lambda hechas, total: self.lbl_estado.setText(f"Analizando: {100 * hechas // total}%"))
+        self.hilo_analisis.terminado.connect(self._analisis_terminado)
+        self.hilo_analisis.fallo.connect(lambda msg: QMessageBox.critical(self, "Error", msg))
+        self.hilo_analisis.finished.connect(self._fin_analisis)
+        self.hilo_analisis.start()
+
+    def _fin_analisis(self):
+        if self.sender() is not self.hilo_analisis:
+            return                      # hilo cancelado al cambiar de archivo
+        self.hilo_analisis = None
+        self.btn_epocas.setEnabled(True)
+
+    def _analisis_terminado(self, res):
+        if self.sender() is not self.hilo_analisis:
+            return
+        if self._destino_analisis == "promedio":
+            self.lbl_estado.setText("")
+            self._dibujar_promedio(np.arange(res.n_canales), res.media.mean(axis=1), self._forma_analisis)
+            return
+        ch_ini, ch_fin = self._canales_analisis
+        fs = self.mat_obj.fs
+        metrica = self.cmb_metrica.currentText()
+        valores = getattr(res, METRICAS_EPOCA[metrica])
+
+        self._espectro = None
+        self._detener_registro()
+        self.fig.clf()
+        self._lineas_lod = None
+        if res.erp is not None:
+            ax1 = self.fig.add_subplot(211)
+            t = np.arange(res.erp.shape[1]) / fs
+            colores = ['blue', 'green', 'orange', 'purple', 'red', 'cyan', 'magenta', 'black']
+            self._lineas_lod = LineasLOD(ax1, t, res.erp, colores=colores, linewidth=1.2,
+                                         etiquetas=[f"Canal {ch_ini + i}" for i in range(res.n_canales)])
+            ax1.set_title(f"ERP: promedio de {res.n_epocas} épocas", fontsize=11)
+            ax1.set_xlabel("Tiempo (s)", fontsize=9); ax1.set_ylabel("Amplitud", fontsize=9)
+            ax1.grid(True, linestyle='--', alpha=0.3)
+            if res.n_canales <= 8:
+                ax1.legend(loc="upper right", fontsize=7)
+
+        ax2 = self.fig.add_subplot(212 if res.erp is not None else 111)
+        im = ax2.imshow(valores, aspect="auto", origin="lower", interpolation="nearest",
+                        extent=(-0.5, res.n_epocas - 0.5, ch_ini - 0.5, ch_fin + 0.5))
+        self.fig.colorbar(im, ax=ax2, label=metrica)
+        ax2.set_title(f"{metrica} por canal y época", fontsize=11)
+        ax2.set_xlabel("Época", fontsize=9); ax2.set_ylabel("Canal", fontsize=9)
+        self.fig.tight_layout()
+        self.canvas.draw()
+        self.lbl_estado.setText(f"{res.n_epocas} épocas · canales {ch_ini}-{ch_fin}")
+
+    def _cambiar_fs(self, fs):
+        if self.mat_obj:
+            self.mat_obj.fs = fs
+        if self.eventos is not None:
+            self.eventos.fs = fs            # el índice guarda muestras; sólo cambian los tiempos
+
+    def calcular_espectro(self):
+        """Lanza el cálculo (o lo toma de la caché) para los canales y la época elegidos."""
+        if not self.mat_obj:
+            QMessageBox.warning(self, "Archivo", "Carga un .mat primero")
+            return
+        if self.hilo_espectral is not None:
+            return
+        ch_ini, ch_fin = self.sb_ch_ini.value(), self.sb_ch_fin.value()
+        if ch_ini > ch_fin or ch_fin >= self.mat_obj.senal.shape[0]:
+            QMessageBox.warning(self, "Canales", "Rango de canales inválido")
+            return
+        self.btn_espectro.setEnabled(False)
+        self.lbl_estado.setText("Calculando espectro…")
+        self.hilo_espectral = HiloEspectral(self.mat_obj, ch_ini, ch_fin, self.sb_epoca.value(),
+                                            self.sb_nperseg.value(), self)
+        self.hilo_espectral.terminado.connect(self._espectro_terminado)
+        self.hilo_espectral.fallo.connect(lambda msg: QMessageBox.critical(self, "Error", msg))
+        self.hilo_espectral.finished.connect(self._fin_espectro)
+        self.hilo_espectral.start()
+
+    def _fin_espectro(self):
+        if self.sender() is not self.hilo_espectral:
+            return
+        self.hilo_espectral = None
+        self.btn_espectro.setEnabled(True)
+
+    def _espectro_terminado(self, res):
+        if self.sender() is not self.hilo_espectral:
+            return
+        self._espectro = res
+        ch_ini, ch_fin = res.canales
+        self.sb_canal_esp.blockSignals(True)
+        self.sb_canal_esp.setRange(ch_ini, ch_fin)
+        self.sb_canal_esp.blockSignals(False)
+        self.sb_fmax.blockSignals(True)
+        self.sb_fmax.setValue(min(self.sb_fmax.value(), res.fs / 2))
+        self.sb_fmax.blockSignals(False)
+        self.lbl_estado.setText(f"Espectro canales {ch_ini}-{ch_fin} · fs {res.fs:g} Hz")
+        self._dibujar_espectro()
+
+    def _dibujar_espectro(self, *_):
+        """Dibuja el último resultado según lo elegido en "Mostrar" (sin recalcular)."""
+        res = self._espectro
+        if res is None:
+            return
+        ch_ini, ch_fin = res.canales
+        fmax = min(self.sb_fmax.value(), res.fs / 2)
+        vista = self.cmb_vista_esp.currentText()
+
+        self._detener_registro()
+        self.fig.clf()
+        ax = self.fig.add_subplot(111)
+        if vista == "PSD":
+            colores = ['blue', 'green', 'orange', 'purple', 'red', 'cyan', 'magenta', 'black']
+            hasta = np.searchsorted(res.f, fmax, side="right")
+            for i, pxx in enumerate(res.psd[:, :hasta]):
+                ax.semilogy(res.f[:hasta], pxx, color=colores[i % len(colores)], linewidth=1,
+                            label=f"Canal {ch_ini + i}")
+            for f0, f1 in BANDAS.values():
+                ax.axvline(f0, color="gray", linestyle=":", linewidth=0.8)
+            ax.set_xlabel("Frecuencia (Hz)", fontsize=10); ax.set_ylabel("PSD", fontsize=10)
+            ax.set_title(f"PSD de Welch (promedio de {self.mat_obj.n_epocas} épocas)", fontsize=11)
+            if res.psd.shape[0] <= 8:
+                ax.legend(loc="upper right", fontsize=8)
+        elif vista == "Espectrograma":
+            canal = self.sb_canal_esp.value()
+            sxx = res.sxx[canal - ch_ini]
+            hasta = np.searchsorted(res.f_sg, fmax, side="right")
+            im = ax.pcolormesh(res.t_sg, res.f_sg[:hasta], 10 * np.log10(sxx[:hasta] + 1e-20),
+                               shading="auto", cmap="viridis")
+            self.fig.colorbar(im, ax=ax, label="dB")
+            ax.set_xlabel("Tiempo (s)", fontsize=10); ax.set_ylabel("Frecuencia (Hz)", fontsize=10)
+            ax.set_title(f"Espectrograma • canal {canal} • época {self.sb_epoca.value()}", fontsize=11)
+        else:
+            nombres = list(BANDAS)
+            im = ax.imshow(res.relativas, aspect="auto", origin="lower", interpolation="nearest",
+                           extent=(-0.5, len(nombres) - 0.5, ch_ini - 0.5, ch_fin + 0.5), cmap="magma")
+            ax.set_xticks(range(len(nombres)))
+            ax.set_xticklabels([f"{n}\n{f0:g}–{f1:g} Hz" for n, (f0, f1) in BANDAS.items()])
+            self.fig.colorbar(im, ax=ax, label="Potencia relativa")
+            ax.set_ylabel("Canal", fontsize=10)
+            ax.set_title("Potencia por banda (relativa al total de las bandas)", fontsize=11)
+        ax.grid(True, linestyle='--', alpha=0.3)
+        self.fig.tight_layout()
+        self.canvas.draw()
+
+    def detectar_eventos(self):
+        """Detecta cruces, picos, espigas y artefactos en todas las épocas, en segundo plano."""
+        if not self.mat_obj:
+            QMessageBox.warning(self, "Archivo", "Carga un .mat primero")
+            return
+        if self.hilo_deteccion is not None:
+            return
+        ch_ini, ch_fin = self.sb_ch_ini.value(), self.sb_ch_fin.value()
+        if ch_ini > ch_fin or ch_fin >= self.mat_obj.senal.shape[0]:
+            QMessageBox.warning(self, "Canales", "Rango de canales inválido")
+            return
+        self.btn_detectar.setEnabled(False)
+        self.hilo_deteccion = HiloDeteccion(self.mat_obj, ch_ini, ch_fin, self)
+        self.hilo_deteccion.progreso.connect(
+            lambda hechas, total: self.lbl_eventos.setText(f"Detectando: {hechas}/{total} épocas"))
+        self.hilo_deteccion.terminado.connect(self._deteccion_terminada)
+        self.hilo_deteccion.fallo.connect(lambda msg: QMessageBox.critical(self, "Error", msg))
+        self.hilo_deteccion.finished.connect(self._fin_deteccion)
+        self.hilo_deteccion.start()
+
+    def _fin_deteccion(self):
+        if self.sender() is not self.hilo_deteccion:
+            return
+        self.hilo_deteccion = None
+        self.btn_detectar.setEnabled(True)
+
+    def _deteccion_terminada(self, indice):
+        if self.sender() is not self.hilo_deteccion:
+            return
+        self.eventos = indice
+        self._ultimo_evento = None
+        conteo = " · ".join(f"{n} {tipo}" for tipo, n in indice.conteo().items())
+        self.lbl_eventos.setText(f"{len(indice)} eventos ({conteo})")
+        if self._lineas_lod is not None and self._espectro is None:
+            self._actualizar_intervalo()
+
+    def _tipo_evento(self):
+        tipo = self.cmb_tipo_evento.currentText()
+        return None if tipo == "Todos" else tipo
+
+    def ir_a_evento(self, direccion: int):
+        """Centra la ventana en el evento siguiente (1) o anterior (-1) de los canales elegidos."""
+        if self.eventos is None:
+            QMessageBox.warning(self, "Eventos", "Detecta eventos primero")
+            return
+        epoca, t_ini, t_fin = self.sb_epoca.value(), self.sb_t_ini.value(), self.sb_t_fin.value()
+        if self._ultimo_evento is not None and self._ultimo_evento[1:] == (epoca, t_ini, t_fin):
+            posicion = self._ultimo_evento[0]      # la ventana pudo quedar recortada en un borde
+        else:
+            posicion = self.eventos.posicion(epoca, (t_ini + t_fin) / 2)
+        canales, tipo = (self.sb_ch_ini.value(), self.sb_ch_fin.value()), self._tipo_evento()
+        if direccion > 0:
+            ev = self.eventos.siguiente(posicion, canales, tipo)
+        else:
+            ev = self.eventos.anterior(posicion, canales, tipo)
+        if ev is None:
+            self.lbl_eventos.setText("No hay más eventos en esa dirección")
+            return
+
+        fs = self.mat_obj.fs
+        duracion = self.mat_obj.senal.shape[1] / fs
+        ancho = min(max(t_fin - t_ini, 1 / fs), duracion)
+        t_ev = ev["muestra"] / fs
+        t_ini = round(min(max(0.0, t_ev - ancho / 2), duracion - ancho), 2)
+        t_fin = round(min(duracion, t_ini + ancho), 2)
+        for sb, valor in ((self.sb_epoca, int(ev["epoca"])), (self.sb_t_ini, t_ini), (self.sb_t_fin, t_fin)):
+            sb.blockSignals(True); sb.setValue(valor); sb.blockSignals(False)
+        self._ultimo_evento = (int(ev["posicion"]), int(ev["epoca"]), self.sb_t_ini.value(), self.sb_t_fin.value())
+        self.lbl_eventos.setText(f"{TIPOS[ev['tipo']]} · canal {ev['canal']} · época {ev['epoca']} · "
+                                 f"t = {t_ev:.3f} s · amplitud {ev['amplitud']:.3g}")
+        self._actualizar_intervalo()
+
+    def exportar_eventos(self):
+        if self.eventos is None:
+            QMessageBox.warning(self, "Eventos", "Detecta eventos primero")
+            return
+        ruta, _ = QFileDialog.getSaveFileName(self, "Exportar eventos", f"{self.mat_obj.nombre}_eventos.csv",
+                                              "CSV (*.csv)")
+        if not ruta:
+            return
+        try:
+            self.eventos.exportar_csv(ruta)
+            QMessageBox.information(self, "Eventos", f"{len(self.eventos)} eventos exportados")
+        except OSError as e:
+            QMessageBox.critical(self, "Error", str(e))
+
+    def alternar_registro(self):
+        """Inicia, pausa o reanuda el registro continuo."""
+        if self.registrador is not None:
+            if self.registrador.activo:
+                self.registrador.detener(); self.btn_registro.setText("▶ Registro continuo")
+            else:
+                self.registrador.iniciar(); self.btn_registro.setText("⏸ Pausar registro")
+            return
+        if not self.mat_obj:
+            QMessageBox.warning(self, "Archivo", "Carga un .mat primero")
+            return
+        ch_ini, ch_fin = self.sb_ch_ini.value(), self.sb_ch_fin.value()
+        if ch_ini > ch_fin or ch_fin >= self.mat_obj.senal.shape[0]:
+            QMessageBox.warning(self, "Canales", "Rango de canales inválido")
+            return
+        if int(self.sb_t_ini.value() * self.mat_obj.fs) >= self.mat_obj.senal.shape[1]:
+            QMessageBox.warning(self, "Tiempo", "t_ini está después del final de la señal")
+            return
+        self._detener_registro()
+        self._espectro = None
+        self._lineas_lod = None
+        try:
+            filtro = self._config_filtro()
+            if filtro is not None:
+                filtro.sos(self.mat_obj.fs)      # valida el orden de las frecuencias
+        except ValueError as e:
+            QMessageBox.warning(self, "Filtro", str(e))
+            return
+        self.registrador = RegistradorContinuo(
+            self.canvas, self.mat_obj, ch_ini, ch_fin, epoca=self.sb_epoca.value(),
+            t_ini=self.sb_t_ini.value(), ventana=self.sb_ventana.value(),
+            velocidad=self.sb_velocidad.value(), filtro=filtro, parent=self)
+        self.registrador.cuadro.connect(
+            lambda t, fps: self.lbl_registro.setText(f"t = {t:.2f} s · {fps:.0f} fps"))
+        self.registrador.iniciar()
+        self.btn_registro.setText("⏸ Pausar registro")
+
+    def _cambiar_velocidad(self, velocidad):
+        if self.registrador is not None:
+            self.registrador.velocidad = velocidad
+
+    def _detener_registro(self):
+        if self.registrador is not None:
+            self.registrador.cerrar()
+            self.registrador = None
+            self.btn_registro.setText("▶ Registro continuo")
+
+    def _cancelar_hilos(self):
+        """Cancela y espera los cálculos en curso (leen del archivo abierto)."""
+        for hilo in (self.hilo_analisis, self.hilo_espectral, self.hilo_deteccion):
+            if hilo is not None:
+                hilo.cancelar()
+                hilo.wait()
+        # Sus señales pendientes se descartan: los slots comparan sender() con estos atributos
+        self.hilo_analisis = self.hilo_espectral = self.hilo_deteccion = None
+        for boton in (self.btn_epocas, self.btn_espectro, self.btn_detectar):
+            boton.setEnabled(True)
+
+    def closeEvent(self, event):
+        self._detener_registro()
+        self._cancelar_hilos()
+        if self.mat_obj:
+            self.mat_obj.cerrar()
+        super().closeEvent(event)
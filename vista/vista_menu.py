@@ -3,7 +3,7 @@ from PyQt5.QtGui import QPixmap
 from PyQt5.QtCore import Qt
 import os
 class VistaMenu(QWidget):
-    def __init__(self, controlador, rol):
+    def __init__(self, controlador, token):
         super().__init__()
         from estilos import APP_STYLESHEET  
         self.setStyleSheet(APP_STYLESHEET)
@@ -19,6 +19,8 @@ class VistaMenu(QWidget):
         logo.setAlignment(Qt.AlignCenter)
         layout.addWidget(logo)
 
+        # El rol sale de la sesión en memoria, no de la base
+        rol = self.controlador.rol_sesion(token)
         if rol == "imagen":
             botones = {
                 "Ver Imágenes DICOM": self.controlador.mostrar_dicom,
@@ -29,6 +31,7 @@ class VistaMenu(QWidget):
             botones = {
         "Cargar archivos CSV": self.controlador.mostrar_csv,
         "Cargar archivo .MAT": self.controlador.mostrar_mat,
+        "Comparar estaciones": self.controlador.mostrar_estaciones,
             }
         else:
             botones = {}
@@ -1,10 +1,133 @@
 # ---------------- vista/vista_tabla_pacientes.py ----------------
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QTableWidget, QTableWidgetItem
+from bisect import bisect_right
+
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTableView, QHeaderView,
+                             QLineEdit, QComboBox, QPushButton, QLabel)
+
+from modelo.modelo_pacientes import COLUMNAS, COLUMNAS_ORDEN, TAMANO_PAGINA, ModeloPacientes
+
+ENCABEZADOS = ("ID", "Patient ID", "Nombre", "Edad", "Sexo", "Fecha", "Ruta DICOM", "Ruta NIfTI")
+
+
+def _clave(valor):
+    """Clave de comparación compatible con el ORDER BY de SQLite (NULL primero)."""
+    return (valor is not None, valor if valor is not None else "")
+
+
+class ModeloTablaPacientes(QAbstractTableModel):
+    """Modelo virtual de pacientes: sólo guarda las páginas ya pedidas a SQLite.
+
+    La vista pide filas con canFetchMore/fetchMore a medida que se hace scroll
+    (paginación por clave, así que cada página cuesta lo mismo sin importar
+    cuántas haya antes) y el orden por columna se resuelve en el ORDER BY.
+    """
+
+    def __init__(self, controlador, parent=None):
+        super().__init__(parent)
+        self.controlador = controlador
+        self._filas = []            # páginas ya leídas, en el orden de la consulta
+        self._filtros = {}
+        self._orden = "id"
+        self._descendente = False
+        self._fin = False           # no quedan más páginas
+
+    # ----- API de QAbstractTableModel
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._filas)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNAS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+        valor = self._filas[index.row()][index.column()]
+        return "" if valor is None else str(valor)
+
+    def headerData(self, seccion, orientacion, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientacion == Qt.Horizontal:
+            return ENCABEZADOS[seccion]
+        return super().headerData(seccion, orientacion, role)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._fin
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._fin:
+            return
+        cursor = ModeloPacientes.cursor_de(self._filas[-1], self._orden) if self._filas else None
+        pagina = self.controlador.consultar_pacientes(
+            self._filtros, cursor, TAMANO_PAGINA, orden=self._orden, descendente=self._descendente)
+        self._fin = len(pagina) < TAMANO_PAGINA
+        if pagina:
+            inicio = len(self._filas)
+            self.beginInsertRows(QModelIndex(), inicio, inicio + len(pagina) - 1)
+            self._filas.extend(pagina)
+            self.endInsertRows()
+
+    def sort(self, columna, orden=Qt.AscendingOrder):
+        if COLUMNAS[columna] not in COLUMNAS_ORDEN:
+            return                  # las rutas no tienen índice: no se ordena por ellas
+        self._orden = COLUMNAS[columna]
+        self._descendente = orden == Qt.DescendingOrder
+        self.reiniciar()
+
+    # ----- Operaciones propias
+    @property
+    def completo(self) -> bool:
+        return self._fin
+
+    def reiniciar(self, filtros: dict | None = None):
+        """Descarta las filas leídas y pide la primera página (con nuevos filtros si se dan)."""
+        if filtros is not None:
+            self._filtros = filtros
+        self.beginResetModel()
+        self._filas = []
+        self._fin = False
+        self.endResetModel()
+        self.fetchMore()
+
+    def agregar_paciente(self, id_paciente: int) -> bool:
+        """Inserta una sola fila nueva en su posición, sin recargar la tabla.
+
+        Si el paciente no cumple los filtros, o su posición cae después de la
+        última página leída (llegará con fetchMore), no se hace nada.
+        """
+        fila = self.controlador.obtener_paciente(id_paciente, self._filtros)
+        if fila is None:
+            return False
+        col = COLUMNAS.index(self._orden)
+        clave = (_clave(fila[col]), fila[0])
+        if self._descendente:
+            pos = self._posicion_desc(clave, col)
+        else:
+            pos = bisect_right(self._filas, clave, key=lambda f: (_clave(f[col]), f[0]))
+        if pos == len(self._filas) and not self._fin:
+            return False
+        self.beginInsertRows(QModelIndex(), pos, pos)
+        self._filas.insert(pos, fila)
+        self.endInsertRows()
+        return True
+
+    def _posicion_desc(self, clave, col) -> int:
+        """Como bisect_right pero para filas en orden descendente."""
+        ini, fin = 0, len(self._filas)
+        while ini < fin:
+            medio = (ini + fin) // 2
+            f = self._filas[medio]
+            if (_clave(f[col]), f[0]) > clave:
+                ini = medio + 1
+            else:
+                fin = medio
+        return ini
+
 
 class VistaTablaPacientes(QWidget):
+    """Lista de pacientes con filtros sobre un modelo virtual paginado."""
     def __init__(self, controlador):
         super().__init__()
-        from estilos import APP_STYLESHEET  
+        from estilos import APP_STYLESHEET
         self.setStyleSheet(APP_STYLESHEET)
         self.controlador = controlador
         self.setWindowTitle("Lista de Pacientes")
@@ -12,19 +135,56 @@ class VistaTablaPacientes(QWidget):
 
     def _construir_ui(self):
         self.layout = QVBoxLayout()
-        self.tabla = QTableWidget()
+
+        # ----- Filtros
+        h_filtros = QHBoxLayout()
+        self.txt_patient_id = QLineEdit(); self.txt_patient_id.setPlaceholderText("Patient ID")
+        self.txt_nombre = QLineEdit(); self.txt_nombre.setPlaceholderText("Nombre (prefijo)")
+        self.txt_desde = QLineEdit(); self.txt_desde.setPlaceholderText("Fecha desde AAAAMMDD")
+        self.txt_hasta = QLineEdit(); self.txt_hasta.setPlaceholderText("Fecha hasta AAAAMMDD")
+        self.cmb_sexo = QComboBox(); self.cmb_sexo.addItems(["", "F", "M", "O"])
+        btn_filtrar = QPushButton("Filtrar")
+        btn_filtrar.clicked.connect(self.actualizar_tabla)
+        for w in (self.txt_patient_id, self.txt_nombre, self.txt_desde, self.txt_hasta):
+            w.returnPressed.connect(self.actualizar_tabla)
+            h_filtros.addWidget(w)
+        h_filtros.addWidget(QLabel("Sexo:")); h_filtros.addWidget(self.cmb_sexo)
+        h_filtros.addWidget(btn_filtrar)
+        self.layout.addLayout(h_filtros)
+
+        self.lbl_total = QLabel("")
+
+        # ----- Tabla (QTableView + modelo virtual; el orden lo resuelve SQL)
+        self.modelo = ModeloTablaPacientes(self.controlador, self)
+        self.modelo.rowsInserted.connect(self._actualizar_total)
+        self.modelo.modelReset.connect(self._actualizar_total)
+        self.tabla = QTableView()
+        self.tabla.setModel(self.modelo)
+        self.tabla.horizontalHeader().setSortIndicator(0, Qt.AscendingOrder)
+        self.tabla.setSortingEnabled(True)      # llama a modelo.sort -> primera página
+        self.tabla.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
+        self.tabla.verticalHeader().setDefaultSectionSize(22)   # altura fija: sin medir filas
         self.layout.addWidget(self.tabla)
+        self.layout.addWidget(self.lbl_total)
         self.setLayout(self.layout)
-        self.actualizar_tabla()
+
+    def filtros(self) -> dict:
+        return {
+            "patient_id": self.txt_patient_id.text().strip(),
+            "nombre": self.txt_nombre.text().strip(),
+            "fecha_desde": self.txt_desde.text().strip(),
+            "fecha_hasta": self.txt_hasta.text().strip(),
+            "sexo": self.cmb_sexo.currentText(),
+        }
 
     def actualizar_tabla(self):
-        pacientes = self.controlador.obtener_pacientes()
-        self.tabla.setRowCount(len(pacientes))
-        self.tabla.setColumnCount(8)
-        self.tabla.setHorizontalHeaderLabels([
-            "ID", "Patient ID", "Nombre", "Edad", "Sexo",
-            "Fecha", "Ruta DICOM", "Ruta NIfTI"
-        ])
-        for i, fila in enumerate(pacientes):
-            for j, valor in enumerate(fila):
-                self.tabla.setItem(i, j, QTableWidgetItem(str(valor)))
+        """Vuelve a la primera página con los filtros actuales."""
+        self.modelo.reiniciar(self.filtros())
+
+    def agregar_paciente(self, id_paciente: int):
+        """Muestra un paciente recién registrado sin recargar la tabla."""
+        self.modelo.agregar_paciente(id_paciente)
+
+    def _actualizar_total(self, *args):
+        self.lbl_total.setText(f"{self.modelo.rowCount()} filas cargadas"
+                               + ("" if self.modelo.completo else " (scroll para más)"))